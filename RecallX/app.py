@@ -3,22 +3,130 @@ RecallX - AI Memory Recall Assistant for Exams & Interviews
 A hackathon-winning application using spaced repetition, forgetting curves, and stress-based recall testing.
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, stream_with_context, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, literal, or_, select, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, object_session, raiseload
 from datetime import datetime, timedelta
+import base64
+import hashlib
+import hmac
 import json
 import math
 import random
 import os
-from functools import wraps
+import re
+import sqlite3
+import threading
+import time
+import click
+import multiprocessing
+import tempfile
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, wraps
+from itertools import chain, islice
+
+from PyPDF2 import PdfReader
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch curves fall back to the scalar formula
+    np = None
+
+# ==================== DATABASE CONFIGURATION ====================
+
+def database_uri():
+    """Database URI from DATABASE_URL (default: SQLite file in the instance folder)"""
+    uri = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
+    # Heroku-style URLs use the scheme SQLAlchemy dropped in 1.4
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def database_engine_options(uri):
+    """
+    SQLAlchemy engine options for the configured backend
+    
+    SQLite keeps SQLAlchemy's default pool and waits on locks for
+    SQLITE_BUSY_TIMEOUT ms; server databases get a sized QueuePool
+    (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE).
+    """
+    if uri.startswith('sqlite'):
+        return {'connect_args': {'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)) / 1000}}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),  # seconds to wait for a connection
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # seconds before reconnecting
+        'pool_pre_ping': True
+    }
+
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Readers no longer block the writer (and vice versa)
+    'synchronous': 'NORMAL',  # Safe with WAL; fsync at checkpoints instead of every commit
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # ms to wait on a locked database
+    'foreign_keys': 'ON',  # SQLite ignores REFERENCES clauses unless asked to enforce them
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),  # bytes
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),  # negative = KiB (64 MB)
+}
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = database_engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'recall-secret-key-change-in-production')
+app.config['FTI_REFRESH_INTERVAL'] = int(os.environ.get('FTI_REFRESH_INTERVAL', 3600))  # seconds, 0 disables
+app.config['FTI_REFRESH_BATCH_SIZE'] = int(os.environ.get('FTI_REFRESH_BATCH_SIZE', 100))
+app.config['FTI_REFRESH_WORKERS'] = int(os.environ.get('FTI_REFRESH_WORKERS', 2))
+app.config['FTI_REFRESH_LEASE'] = int(os.environ.get('FTI_REFRESH_LEASE', 600))  # seconds a sweep may hold its checkpoint without progress
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))  # background job threads, 0 runs jobs inline
+app.config['JOB_POLL_INTERVAL'] = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))  # seconds between queue checks
+app.config['JOB_STALE_AFTER'] = int(os.environ.get('JOB_STALE_AFTER', 1800))  # seconds before a running job is requeued
+app.config['CURVE_CACHE_SIZE'] = int(os.environ.get('CURVE_CACHE_SIZE', 1024))  # cached curve payloads
+app.config['REPORT_CACHE_SIZE'] = int(os.environ.get('REPORT_CACHE_SIZE', 1024))  # cached report pages
+app.config['REPORT_CACHE_TTL'] = int(os.environ.get('REPORT_CACHE_TTL', 300))  # seconds
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))  # logged-in identities kept by load_user
+app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 60))  # seconds
+app.config['DASHBOARD_CACHE_SIZE'] = int(os.environ.get('DASHBOARD_CACHE_SIZE', 1024))  # users with a cached dashboard
+app.config['DASHBOARD_CACHE_TTL'] = int(os.environ.get('DASHBOARD_CACHE_TTL', 3600))  # seconds, upper bound
+app.config['DASHBOARD_CACHE_PATH'] = os.environ.get('DASHBOARD_CACHE_PATH', '')  # SQLite file to persist snapshots in, '' = memory only
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 200)) * 1024 * 1024  # larger uploads get a 413
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', os.path.join(app.instance_path, 'uploads'))
+app.config['PDF_PAGES_PER_TASK'] = int(os.environ.get('PDF_PAGES_PER_TASK', 25))  # pages extracted per worker task
+app.config['PDF_WORKERS'] = int(os.environ.get('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+app.config['PDF_CHUNK_CHARS'] = int(os.environ.get('PDF_CHUNK_CHARS', 20000))  # text per stored PDF chunk
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '0') == '1'  # request/SQL/function timings at /metrics
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')  # if set, /metrics requires "Authorization: Bearer <token>"
+app.config['GRADE_THRESHOLD'] = float(os.environ.get('GRADE_THRESHOLD', 0.5))  # share of answer terms to recall
+app.config['REVIEW_RETENTION_TARGET'] = float(os.environ.get('REVIEW_RETENTION_TARGET', 50))  # % retention at which a topic is due
+app.config['QUESTION_RETENTION_TARGET'] = float(os.environ.get('QUESTION_RETENTION_TARGET', 90))  # % recall probability at which a question is due
+app.config['SEARCH_CORPUS_DIR'] = os.environ.get('SEARCH_CORPUS_DIR', os.path.join(app.instance_path, 'search_corpus'))
+app.config['SEARCH_CACHE_SIZE'] = int(os.environ.get('SEARCH_CACHE_SIZE', 1024))  # cached queries
+app.config['SEARCH_CACHE_TTL'] = int(os.environ.get('SEARCH_CACHE_TTL', 3600))  # seconds
+app.config['SEARCH_RESULT_LIMIT'] = int(os.environ.get('SEARCH_RESULT_LIMIT', 10))
 
 # Initialize SQLAlchemy
 db = SQLAlchemy(app)
@@ -52,8 +160,12 @@ class User(db.Model, UserMixin):
 
 class Topic(db.Model):
     """Topic model for storing study topics"""
+    __table_args__ = (
+        # Review queue: a user's topics in due order
+        db.Index('ix_topic_user_next_review', 'user_id', 'next_review_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     subject = db.Column(db.String(100), nullable=False)
     topic_name = db.Column(db.String(200), nullable=False)
     exam_type = db.Column(db.String(50), nullable=False)  # semester, competitive, interview
@@ -61,6 +173,7 @@ class Topic(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_revised = db.Column(db.DateTime, default=datetime.utcnow)
     strength = db.Column(db.Float, default=1.0)  # Memory strength (0-100)
+    next_review_at = db.Column(db.DateTime)  # When predicted retention falls to REVIEW_RETENTION_TARGET
     
     # FTI (Forgettable Topic Index) Components
     topic_complexity = db.Column(db.Float, default=5.0)  # 0-10 scale (abstract=high)
@@ -69,6 +182,15 @@ class Topic(db.Model):
     exam_frequency = db.Column(db.Float, default=5.0)  # 0-10 scale (common in exams)
     fti_score = db.Column(db.Float, default=5.0)  # Overall FTI (0-10)
     fti_category = db.Column(db.String(20), default='moderate')  # high, moderate, safe
+    fti_computed_at = db.Column(db.DateTime)  # When fti_score was last stored
+    
+    # Recall aggregates, maintained incrementally as recalls are recorded
+    high_stress_correct = db.Column(db.Integer, default=0)
+    high_stress_total = db.Column(db.Integer, default=0)
+    low_stress_correct = db.Column(db.Integer, default=0)
+    low_stress_total = db.Column(db.Integer, default=0)
+    total_correct = db.Column(db.Integer, default=0)
+    total_attempts = db.Column(db.Integer, default=0)
     
     internet_content = db.relationship('InternetFetchedContent', backref='topic', lazy=True, cascade='all, delete-orphan')
     pdf_content = db.relationship('PDFExtractedContent', backref='topic', lazy=True, cascade='all, delete-orphan')
@@ -79,37 +201,99 @@ class Topic(db.Model):
 class InternetFetchedContent(db.Model):
     """Store content fetched from internet search"""
     id = db.Column(db.Integer, primary_key=True)
-    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False)
+    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False, index=True)
     search_query = db.Column(db.String(300), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(db.Text, nullable=False)  # Result text, or an excerpt when blob_id is set
     source_url = db.Column(db.String(500))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    blob_id = db.Column(db.Integer, db.ForeignKey('content_blob.id'), index=True)  # Shared search results
 
 
 class PDFExtractedContent(db.Model):
-    """Store extracted content from PDFs"""
+    """
+    Store extracted content from PDFs
+    
+    Uploads reference a ContentBlob holding the extracted text (blob_id),
+    with a preview in content; rows from before the content store hold their
+    text inline.
+    """
     id = db.Column(db.Integer, primary_key=True)
-    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False)
+    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False, index=True)
     filename = db.Column(db.String(300), nullable=False)
     content = db.Column(db.Text, nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    blob_id = db.Column(db.Integer, db.ForeignKey('content_blob.id'), index=True)  # Shared extracted text
+
+
+class ContentBlob(db.Model):
+    """
+    Content-addressed extraction or search result, shared by every topic that references it
+    
+    Keyed by a SHA-256 of the PDF bytes or of the normalized search query;
+    the content itself lives in ContentChunk rows.
+    """
+    __table_args__ = (
+        db.Index('ix_content_blob_kind_hash', 'kind', 'content_hash', unique=True),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # pdf, search
+    content_hash = db.Column(db.String(64), nullable=False)  # SHA-256 hex
+    ref_count = db.Column(db.Integer, default=0)  # PDFExtractedContent / InternetFetchedContent rows using it
+    byte_size = db.Column(db.Integer)  # Size of the hashed input
+    summary = db.Column(db.Text)  # JSON summary (pages, chunks, preview / result count)
+    is_complete = db.Column(db.Boolean, default=False)  # False while its chunks are still being written
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ContentChunk(db.Model):
+    """One chunk of a ContentBlob: a range of PDF pages or one search result"""
+    __table_args__ = (
+        db.Index('ix_content_chunk_blob_chunk', 'blob_id', 'chunk_index'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    blob_id = db.Column(db.Integer, db.ForeignKey('content_blob.id'), nullable=False)
+    chunk_index = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(300))  # Search result title
+    source_url = db.Column(db.String(500))  # Search result URL
+    page_start = db.Column(db.Integer)  # PDF pages covered (1-based)
+    page_end = db.Column(db.Integer)
+    content = db.Column(db.Text, nullable=False)
 
 
 class GeneratedQuestion(db.Model):
     """AI-generated questions for studying"""
+    __table_args__ = (
+        # A topic's due questions, most overdue first
+        db.Index('ix_generated_question_topic_due', 'topic_id', 'due_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False)
+    topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False, index=True)
     question = db.Column(db.Text, nullable=False)
     answer = db.Column(db.Text, nullable=False)
+    answer_tokens = db.Column(db.Text)  # Normalized answer terms used for grading (see answer_token_string)
     question_type = db.Column(db.String(50), nullable=False)  # short-answer, viva, prompt
     difficulty = db.Column(db.String(20), default='medium')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Memory state, updated on every recall (see review_question)
+    stability = db.Column(db.Float)  # Days until recall probability falls to 90%; None = never recalled
+    recall_difficulty = db.Column(db.Float)  # 1-10, learned from the user's answers
+    last_reviewed_at = db.Column(db.DateTime)
+    due_at = db.Column(db.DateTime, default=datetime.utcnow)  # New questions are due immediately
+    
     recall_history = db.relationship('RecallHistory', backref='question', lazy=True, cascade='all, delete-orphan')
 
 
 class RecallHistory(db.Model):
     """Track user's recall performance"""
+    __table_args__ = (
+        # Covers the stress-split aggregate (join on question, count by stress/correctness)
+        db.Index('ix_recall_history_question_stress', 'question_id', 'stress_level', 'is_correct'),
+        # Per-user history in time order
+        db.Index('ix_recall_history_user_attempted', 'user_id', 'attempted_at'),
+        # Retried batch submissions must not record an answer twice
+        db.Index('ix_recall_history_user_client_answer', 'user_id', 'client_answer_id', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey('generated_question.id'), nullable=False)
@@ -119,10 +303,14 @@ class RecallHistory(db.Model):
     stress_level = db.Column(db.Integer, default=0)  # 0-100
     attempted_at = db.Column(db.DateTime, default=datetime.utcnow)
     confidence = db.Column(db.Integer, default=0)  # User confidence level 0-100
+    client_answer_id = db.Column(db.String(64))  # Client idempotency key (batched submissions)
 
 
 class ForgettingPrediction(db.Model):
     """Store forgetting curve predictions"""
+    __table_args__ = (
+        db.Index('ix_forgetting_prediction_topic_days', 'topic_id', 'days_ahead'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     topic_id = db.Column(db.Integer, db.ForeignKey('topic.id'), nullable=False)
     days_ahead = db.Column(db.Integer)
@@ -132,16 +320,536 @@ class ForgettingPrediction(db.Model):
     calculated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class RefreshCheckpoint(db.Model):
+    """Resumable progress marker for background refresh sweeps"""
+    name = db.Column(db.String(50), primary_key=True)
+    last_user_id = db.Column(db.Integer, default=0)  # Highest user id fully processed
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)  # Set once a sweep reaches the last user
+    lease_owner = db.Column(db.String(32))  # Sweep currently allowed to advance this checkpoint
+    lease_expires_at = db.Column(db.DateTime)  # Another sweep may take over after this
+
+
+class Job(db.Model):
+    """Background job (PDF extraction, topic search) queued by a request and run by a worker"""
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        db.Index('ix_job_status_created', 'status', 'created_at'),
+    )
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    kind = db.Column(db.String(50), nullable=False)  # key into JOB_HANDLERS
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    payload = db.Column(db.Text, nullable=False)  # JSON arguments for the handler
+    result = db.Column(db.Text)  # JSON result once succeeded
+    error = db.Column(db.Text)  # Error message once failed
+    progress = db.Column(db.String(200))  # Latest progress message while running
+    attempts = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+
+# ==================== CACHING ====================
+
+CACHES = {}  # name -> TTLCache, for reporting hit/miss statistics
+
+
+class TTLCache:
+    """Thread-safe LRU cache with optional per-entry TTL and hit/miss counters"""
+    
+    def __init__(self, name, maxsize=1024, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl  # seconds, None = no expiry
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        CACHES[name] = self
+    
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+    
+    def peek(self, key, default=None):
+        """Like get(), but without touching recency or the hit/miss counters"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                return entry[1]
+            return default
+    
+    def set(self, key, value, ttl=None):
+        """Store value under key (expiring after ttl seconds, default self.ttl), evicting the LRU entry if full"""
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        """Drop key from the cache; returns True if it was present"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+    
+    def invalidate_matching(self, predicate):
+        """Drop every key for which predicate(key) is true; returns the count dropped"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Forgetting-curve payloads depend only on strength and the current UTC date
+forgetting_curve_cache = TTLCache('forgetting_curve', maxsize=app.config['CURVE_CACHE_SIZE'], ttl=24 * 3600)
+
+# Report responses, keyed by (user_id, UTC date, format, limit, after) and stored with the user's
+# dashboard generation, so a change recorded by any process sharing DASHBOARD_CACHE_PATH retires them
+report_cache = TTLCache('report', maxsize=app.config['REPORT_CACHE_SIZE'], ttl=app.config['REPORT_CACHE_TTL'])
+
+
+USER_DATA_LISTENERS = []  # listener(user_id, reason), called when a user's topics or recalls change
+
+
+def on_user_data_changed(listener):
+    """Register a listener for user_data_changed() events (usable as a decorator)"""
+    USER_DATA_LISTENERS.append(listener)
+    return listener
+
+
+def user_data_changed(user_id, reason):
+    """
+    Tell every cache holding a view of a user's data that it is out of date
+    
+    Args:
+        user_id: The user whose data changed, or None for every user
+        reason: Short label for what changed (counted in /metrics)
+    """
+    if metrics.enabled:
+        metrics.inc('recallx_user_data_events_total', reason=reason)
+    for listener in USER_DATA_LISTENERS:
+        listener(user_id, reason)
+
+
+@on_user_data_changed
+def invalidate_user_report(user_id, reason=None):
+    """Drop all cached reports for a user (every user when user_id is None)"""
+    if user_id is None:
+        report_cache.clear()
+    else:
+        report_cache.invalidate_matching(lambda key: key[0] == user_id)
+
+
+class SnapshotFileStore:
+    """
+    JSON snapshots in a local SQLite file, shared by every process that opens it
+    
+    Entries carry a wall-clock expiry. Each key also has a generation that
+    invalidate() bumps (clear() bumps a global one), so a process can check
+    whether the copy it holds in memory is still current, and a snapshot
+    built before an invalidation is never written. Exposes the same stats()
+    keys as TTLCache for the cache metrics.
+    """
+    
+    ALL_KEYS = '*'  # generation row bumped by clear()
+    GENERATION_SQL = 'SELECT COALESCE(SUM(value), 0) FROM generation WHERE key IN (?, ?)'
+    
+    def __init__(self, name, path):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(snapshot)')]
+        if columns and 'generation' not in columns:
+            self._conn.execute('DROP TABLE snapshot')  # Written before generations existed; it is only a cache
+        self._conn.execute('CREATE TABLE IF NOT EXISTS snapshot (key TEXT PRIMARY KEY, generation INTEGER NOT NULL, '
+                           'expires_at REAL NOT NULL, payload TEXT NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS generation (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        CACHES[name] = self
+    
+    def generation(self, key):
+        """Current generation of key; changes whenever key is invalidated or the store is cleared"""
+        with self._lock:
+            return self._conn.execute(self.GENERATION_SQL, (str(key), self.ALL_KEYS)).fetchone()[0]
+    
+    def get(self, key):
+        """Return (value, remaining seconds, generation), or (None, 0, None) on a miss or expiry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT expires_at, payload, generation FROM snapshot '
+                                     'WHERE key = ? AND expires_at > ?', (str(key), now)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, 0, None
+            self.hits += 1
+        return json.loads(row[1]), row[0] - now, row[2]
+    
+    def set(self, key, value, ttl, generation):
+        """Store value if key is still at generation; returns whether it was stored"""
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            return self._conn.execute(
+                'INSERT OR REPLACE INTO snapshot (key, generation, expires_at, payload) '
+                f'SELECT ?, ?, ?, ? WHERE ({self.GENERATION_SQL}) = ?',
+                (str(key), generation, time.time() + ttl, payload, str(key), self.ALL_KEYS, generation)
+            ).rowcount > 0
+    
+    def _bump_generation(self, key, delete_sql, delete_args):
+        """Advance key's generation and delete the snapshots it covers, atomically"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('INSERT INTO generation (key, value) VALUES (?, 1) '
+                                   'ON CONFLICT (key) DO UPDATE SET value = value + 1', (key,))
+                self._conn.execute(delete_sql, delete_args)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+    
+    def invalidate(self, key):
+        self._bump_generation(str(key), 'DELETE FROM snapshot WHERE key = ?', (str(key),))
+    
+    def clear(self):
+        self._bump_generation(self.ALL_KEYS, 'DELETE FROM snapshot', ())
+    
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute('SELECT COUNT(*) FROM snapshot WHERE expires_at > ?', (time.time(),)).fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'size': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': 0,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class SnapshotCache:
+    """
+    Per-user view snapshots: an in-memory LRU in front of an optional SnapshotFileStore
+    
+    build() returns (snapshot, seconds it stays valid); the snapshot is kept
+    for the shorter of that and ttl. Invalidation bumps a per-user generation
+    so a snapshot built from data read before the invalidation is not stored.
+    With a file store the generations live in the file and every memory hit
+    is checked against it, so an invalidation made by any process sharing
+    the file applies in all of them.
+    """
+    
+    def __init__(self, name, maxsize=1024, ttl=3600, path=None):
+        self.ttl = ttl
+        self.memory = TTLCache(name, maxsize=maxsize, ttl=ttl)  # user_id -> (generation, snapshot)
+        self.store = SnapshotFileStore(f'{name}_file', path) if path else None
+        self._generations = {}  # user_id -> invalidation count, when there is no file store
+        self._lock = threading.Lock()
+    
+    def generation(self, user_id):
+        if self.store is not None:
+            return self.store.generation(user_id)
+        return self._generations.get(user_id, 0)
+    
+    def get(self, user_id, build):
+        generation = self.generation(user_id)
+        entry = self.memory.get(user_id)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+        
+        if self.store is not None:
+            snapshot, remaining, stored_generation = self.store.get(user_id)
+            if snapshot is not None:
+                self.memory.set(user_id, (stored_generation, snapshot), ttl=remaining)
+                return snapshot
+        
+        snapshot, valid_for = build()
+        ttl = max(1, min(self.ttl, valid_for))
+        with self._lock:
+            if self.store is not None:
+                is_current = self.store.set(user_id, snapshot, ttl, generation)
+            else:
+                is_current = self._generations.get(user_id, 0) == generation
+            if is_current:
+                self.memory.set(user_id, (generation, snapshot), ttl=ttl)
+        return snapshot
+    
+    def invalidate(self, user_id):
+        with self._lock:
+            if self.store is not None:
+                self.store.invalidate(user_id)
+            else:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.memory.invalidate(user_id)
+    
+    def clear(self):
+        with self._lock:
+            if self.store is not None:
+                self.store.clear()
+            else:
+                self._generations = {user_id: generation + 1 for user_id, generation in self._generations.items()}
+            self.memory.clear()
+
+
+# Dashboard view models (ranked topics and alerts), keyed by user_id
+dashboard_snapshots = SnapshotCache('dashboard', maxsize=app.config['DASHBOARD_CACHE_SIZE'],
+                                    ttl=app.config['DASHBOARD_CACHE_TTL'], path=app.config['DASHBOARD_CACHE_PATH'])
+
+
+@on_user_data_changed
+def invalidate_user_dashboard(user_id, reason=None):
+    if user_id is None:
+        dashboard_snapshots.clear()
+    else:
+        dashboard_snapshots.invalidate(user_id)
+
+
+# ==================== METRICS ====================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+SQL_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)  # statements per request
+
+
+class Histogram:
+    """Prometheus-style histogram: per-bucket counts plus running sum and count"""
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled counters and histograms, rendered in the
+    Prometheus text exposition format
+    
+    When disabled, nothing is hooked into Flask or SQLAlchemy and timed()
+    functions only pay for one attribute check.
+    """
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._definitions = {}  # name -> (type, help, buckets)
+        self._series = {}  # name -> {label tuple: Histogram or float}
+        self._lock = threading.Lock()
+    
+    def counter(self, name, help_text):
+        self._definitions[name] = ('counter', help_text, None)
+        self._series[name] = {}
+    
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._definitions[name] = ('histogram', help_text, buckets)
+        self._series[name] = {}
+    
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + amount
+    
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._definitions[name][2])
+            histogram.observe(value)
+    
+    def reset(self):
+        with self._lock:
+            for series in self._series.values():
+                series.clear()
+    
+    def render(self):
+        """All series in Prometheus text format"""
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text, buckets) in self._definitions.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for key, value in self._series[name].items():
+                    if metric_type == 'counter':
+                        lines.append(f'{name}{format_labels(key)} {value}')
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets + ('+Inf',), value.bucket_counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{format_labels(key + (("le", bound),))} {cumulative}')
+                    lines.append(f'{name}_sum{format_labels(key)} {value.sum}')
+                    lines.append(f'{name}_count{format_labels(key)} {value.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(key):
+    """Render a label tuple as {a="x",b="y"}"""
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in key) + '}'
+
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def cache_metrics_text():
+    """Hit/miss/eviction counters and sizes for every TTLCache, in Prometheus text format"""
+    lines = []
+    for stat, metric_type, help_text in [
+        ('hits', 'counter', 'Cache lookups that found a live entry'),
+        ('misses', 'counter', 'Cache lookups that found nothing or an expired entry'),
+        ('evictions', 'counter', 'Entries evicted to stay within maxsize'),
+        ('size', 'gauge', 'Entries currently cached'),
+    ]:
+        name = f'recallx_cache_{stat}' + ('_total' if metric_type == 'counter' else '')
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for cache_name, cache in CACHES.items():
+            lines.append(f'{name}{format_labels((("cache", cache_name),))} {cache.stats()[stat]}')
+    return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry(enabled=app.config['METRICS_ENABLED'])
+metrics.counter('recallx_requests_total', 'HTTP requests by route, method and status')
+metrics.histogram('recallx_request_duration_seconds', 'HTTP request latency by route')
+metrics.histogram('recallx_request_sql_statements', 'SQL statements executed per request', SQL_COUNT_BUCKETS)
+metrics.histogram('recallx_sql_duration_seconds', 'SQL statement latency by route ("background" outside requests)')
+metrics.histogram('recallx_function_duration_seconds', 'Latency of instrumented functions')
+metrics.counter('recallx_user_data_events_total', 'Cache invalidation events by reason')
+
+
+def timed(name=None):
+    """Decorator recording a function's wall time under recallx_function_duration_seconds"""
+    def decorator(func):
+        label = name or func.__name__
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe('recallx_function_duration_seconds', time.perf_counter() - start, function=label)
+        return wrapper
+    return decorator
+
+
+def current_route():
+    """Low-cardinality route label: the matched URL rule, not the raw path"""
+    if not has_request_context():
+        return 'background'
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def start_request_metrics():
+    g.metrics_started_at = time.perf_counter()
+    g.sql_statements = 0
+
+
+def record_request_metrics(response):
+    started_at = g.pop('metrics_started_at', None)
+    if started_at is None:
+        return response
+    # Streamed responses are timed up to the first byte; their body runs later
+    route = current_route()
+    metrics.inc('recallx_requests_total', route=route, method=request.method, status=response.status_code)
+    metrics.observe('recallx_request_duration_seconds', time.perf_counter() - started_at,
+                    route=route, method=request.method)
+    metrics.observe('recallx_request_sql_statements', g.pop('sql_statements', 0), route=route)
+    return response
+
+
+def before_sql_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def after_sql_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+    metrics.observe('recallx_sql_duration_seconds', elapsed, route=current_route())
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+
+
+def discard_sql_timer(exception_context):
+    """A failed statement never reaches after_cursor_execute; drop its start time"""
+    if exception_context.connection is not None:
+        starts = exception_context.connection.info.get('metrics_query_start')
+        if starts:
+            starts.pop()
+
+
+def init_metrics(flask_app):
+    """Hook request and SQL instrumentation into the app, if metrics are enabled"""
+    if not metrics.enabled:
+        return
+    flask_app.before_request(start_request_metrics)
+    flask_app.after_request(record_request_metrics)
+    event.listen(Engine, 'before_cursor_execute', before_sql_execute)
+    event.listen(Engine, 'after_cursor_execute', after_sql_execute)
+    event.listen(Engine, 'handle_error', discard_sql_timer)
+
+
+init_metrics(app)
+
+
 # ==================== HELPER FUNCTIONS ====================
 
-def get_or_create_default_user():
-    """Get or create a default user for demo purposes"""
-    user = User.query.filter_by(username='demo_user').first()
-    if not user:
-        user = User(username='demo_user', email='demo@recallx.app')
-        db.session.add(user)
-        db.session.commit()
-    return user
+HIGH_STRESS_THRESHOLD = 70  # stress_level above this counts as a high-stress recall
+PREDICTION_HORIZONS = [1, 3, 7, 14, 30]  # Days ahead for revision dates and forgetting predictions
+
+def get_user_topic(topic_id, *options):
+    """
+    Load one of the current user's topics, or None
+    
+    Relationships raise instead of lazy loading; pass loader options
+    (e.g. selectinload(Topic.questions)) for the ones a caller needs.
+    """
+    return Topic.query.options(*options, raiseload('*')) \
+        .filter_by(id=topic_id, user_id=request_user().id).first()
 
 
 def calculate_ebbinghaus_forgetting_curve(days_since_learning, strength=1.0):
@@ -165,6 +873,80 @@ def calculate_ebbinghaus_forgetting_curve(days_since_learning, strength=1.0):
     return max(0, min(100, retention * 100))
 
 
+@timed()
+def batch_forgetting_curve(days_since, strengths, horizons=(0,), use_numpy=None):
+    """
+    Vectorized Ebbinghaus retention for many topics and horizons in one call
+    
+    Args:
+        days_since: Per-topic days since learning (length n)
+        strengths: Per-topic memory strength factors (length n)
+        horizons: Day offsets evaluated for every topic (length m)
+        use_numpy: Force NumPy on/off (default: use it when installed)
+    
+    Returns:
+        n x m nested list of retention percentages (0-100), where cell [i][j]
+        equals calculate_ebbinghaus_forgetting_curve(days_since[i] + horizons[j], strengths[i])
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    
+    if use_numpy:
+        days = np.asarray(days_since, dtype=float).reshape(-1, 1) + np.asarray(horizons, dtype=float)
+        decay = np.asarray(strengths, dtype=float).reshape(-1, 1) * 2.5
+        retention = np.clip(np.exp(-np.maximum(days, 0) / decay) * 100, 0, 100)
+        return retention.tolist()
+    
+    # Without NumPy there is nothing to vectorize; evaluate cell by cell
+    return [[calculate_ebbinghaus_forgetting_curve(d + h, s) for h in horizons]
+            for d, s in zip(days_since, strengths)]
+
+
+def forgetting_curve_cache_key(strength, today=None):
+    """Cache key for a curve payload: (strength rounded to 4 places, UTC date)"""
+    return round(strength, 4), (today or datetime.utcnow().date()).isoformat()
+
+
+def get_forgetting_curve_payload(strength, today=None):
+    """
+    Get the 30-day curve and optimal revision dates for a strength, cached
+    
+    Returns:
+        {'curve_data': [...], 'optimal_dates': [...]} (shared; do not mutate)
+    """
+    today = today or datetime.utcnow().date()
+    key = forgetting_curve_cache_key(strength, today)
+    payload = forgetting_curve_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    # Curve for the next 30 days, evaluated in one batch (optimal dates are a subset)
+    curve_days = list(range(0, 31))
+    retentions = batch_forgetting_curve([0], [key[0]], curve_days)[0]
+    
+    curve_data = []
+    for day, retention in zip(curve_days, retentions):
+        curve_data.append({
+            'day': day,
+            'retention': round(retention, 2),
+            'forget_probability': round(100 - retention, 2)
+        })
+    
+    # Find optimal revision dates
+    optimal_dates = []
+    for day in PREDICTION_HORIZONS:
+        optimal_dates.append({
+            'day': day,
+            'date': (today + timedelta(days=day)).strftime('%Y-%m-%d'),
+            'retention': round(retentions[day], 2)
+        })
+    
+    payload = {'curve_data': curve_data, 'optimal_dates': optimal_dates}
+    forgetting_curve_cache.set(key, payload)
+    return payload
+
+
+@timed()
 def generate_questions_for_topic(topic_name, exam_type, count=5):
     """
     Generate AI questions based on topic (mock implementation with templates)
@@ -218,65 +1000,228 @@ def generate_questions_for_topic(topic_name, exam_type, count=5):
     return questions
 
 
-def mock_internet_search(query):
+def bulk_insert_questions(question_rows):
+    """
+    Insert many GeneratedQuestion rows with one executemany INSERT ... RETURNING
+    
+    Args:
+        question_rows: Iterable of dicts with topic_id, question, answer,
+            question_type and difficulty (new questions are due now)
+    
+    Returns:
+        The input rows (in order) with their new 'id' filled in; the caller commits
     """
-    Mock internet search function (simulates API like SerpAPI)
-    In production, would use BeautifulSoup + Requests or actual API
+    rows = list(question_rows)
+    if not rows:
+        return []
+    
+    # Grading terms are computed once here rather than on every submission
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault('answer_tokens', answer_token_string(row['answer']))
+        row.setdefault('due_at', now)
+    
+    statement = insert(GeneratedQuestion).returning(GeneratedQuestion.id, sort_by_parameter_order=True)
+    for row, question_id in zip(rows, db.session.scalars(statement, rows)):
+        row['id'] = question_id
+    return rows
+
+
+def generate_questions_for_topics(topics, count=5):
     """
-    mock_results = {
-        'Stack Exchange': "Stack Exchange is a network of question-and-answer websites. Common questions include implementation details, best practices, and edge cases.",
-        'Data Structures': "Data structures are specialized formats for organizing data. Key types: Arrays, Linked Lists, Trees, Graphs, Hash Tables. Important for algorithm efficiency.",
-        'Machine Learning': "Machine learning involves algorithms learning from data without explicit programming. Types: Supervised, Unsupervised, Reinforcement. Common applications: classification, regression, clustering.",
-        'Web Development': "Modern web development uses HTML for structure, CSS for styling, JavaScript for interactivity. Frameworks: React, Vue, Angular. Backend: Node.js, Python, Java.",
-        'Database Design': "Relational databases use tables and relationships. Key concepts: normalization, ACID properties, indexing. SQL: SELECT, INSERT, UPDATE, DELETE operations.",
-        'API Design': "RESTful APIs use HTTP methods (GET, POST, PUT, DELETE). Design principles: statelessness, resource-based URLs, proper status codes. Common formats: JSON, XML.",
-    }
+    Generate and bulk-insert questions for many topics in one call
+    (e.g. a whole syllabus import)
+    
+    Args:
+        topics: Topics (or objects with id, topic_name and exam_type)
+        count: Questions to generate per topic
     
-    # Simple keyword matching
-    found_results = []
-    for key, value in mock_results.items():
-        if any(word.lower() in query.lower() for word in key.split()):
-            found_results.append({
-                'title': key,
-                'snippet': value,
-                'url': f'https://example.com/{key.replace(" ", "-").lower()}'
+    Returns:
+        Created question rows as returned by bulk_insert_questions(); the caller commits
+    """
+    rows = []
+    for topic in topics:
+        for q in generate_questions_for_topic(topic.topic_name, topic.exam_type, count):
+            rows.append({
+                'topic_id': topic.id,
+                'question': q['question'],
+                'answer': q['answer'],
+                'question_type': q['type'],
+                'difficulty': q['difficulty']
             })
+    return bulk_insert_questions(rows)
+
+
+def spool_upload(file_storage, folder=None, block_size=1024 * 1024):
+    """
+    Copy an uploaded file to a temporary file on disk in fixed-size blocks,
+    hashing it on the way
     
-    # Return at least one result
-    if not found_results:
-        found_results = [{
-            'title': 'General Information',
-            'snippet': f'Information about {query}: This is a comprehensive topic covering multiple aspects and applications.',
-            'url': 'https://example.com/general'
-        }]
+    Returns:
+        (path of the spooled file, SHA-256 hex of its bytes, size in bytes); the caller deletes the file
+    """
+    folder = folder or app.config['UPLOAD_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix='.pdf', dir=folder)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for block in iter(lambda: file_storage.stream.read(block_size), b''):
+                digest.update(block)
+                out.write(block)
+                size += len(block)
+    except Exception:
+        os.remove(path)  # A partial copy (disk full, client gone) is never queued
+        raise
+    return path, digest.hexdigest(), size
+
+
+def extract_pdf_page_range(path, start, stop):
+    """Extract the text of pages [start, stop) (0-based); runs in a worker process"""
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or '' for i in range(start, stop)]
+
+
+_pdf_pool = None  # (pid, ProcessPoolExecutor), created by the first multi-range extraction
+_pdf_pool_lock = threading.Lock()
+
+
+def get_pdf_pool():
+    """
+    The process's shared PDF extraction pool of PDF_WORKERS processes
+    
+    Spawning interpreters costs far more than extracting a short document,
+    so the pool is created once and reused by every upload. A process forked
+    after the pool was created makes its own, since pool workers belong to
+    the parent.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None or _pdf_pool[0] != os.getpid():
+            # Spawned (not forked) workers: the parent may have DB connections and a refresher thread
+            _pdf_pool = (os.getpid(), ProcessPoolExecutor(max_workers=app.config['PDF_WORKERS'],
+                                                          mp_context=multiprocessing.get_context('spawn')))
+        return _pdf_pool[1]
+
+
+def discard_pdf_pool(pool):
+    """Forget a broken pool (a worker died) so the next extraction starts a new one"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None and _pdf_pool[1] is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_pdf_pages(path, pages_per_task=None, max_workers=None):
+    """
+    Lazily extract a PDF's text page by page
+    
+    Page ranges are extracted in the shared pool (get_pdf_pool()), with at
+    most two ranges per worker in flight, so memory stays bounded whatever
+    the page count. Documents that fit in one range are extracted inline.
+    
+    Yields:
+        (page_number, text) in page order, page_number starting at 1
+    """
+    pages_per_task = pages_per_task or app.config['PDF_PAGES_PER_TASK']
+    max_workers = max_workers or app.config['PDF_WORKERS']
+    page_count = len(PdfReader(path).pages)
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+    
+    if len(ranges) <= 1 or max_workers <= 1:
+        for start, stop in ranges:
+            for offset, text in enumerate(extract_pdf_page_range(path, start, stop)):
+                yield start + offset + 1, text
+        return
     
-    return found_results
+    pool = get_pdf_pool()
+    pending = deque()
+    remaining = iter(ranges)
+    try:
+        for start, stop in islice(remaining, max_workers * 2):
+            pending.append((start, pool.submit(extract_pdf_page_range, path, start, stop)))
+        while pending:
+            start, future = pending.popleft()
+            texts = future.result()
+            for next_start, next_stop in islice(remaining, 1):
+                pending.append((next_start, pool.submit(extract_pdf_page_range, path, next_start, next_stop)))
+            for offset, text in enumerate(texts):
+                yield start + offset + 1, text
+    except BrokenProcessPool:
+        discard_pdf_pool(pool)
+        raise
+    finally:
+        # Abandoned early (a failed job): don't leave this document's ranges queued in the shared pool
+        for _, future in pending:
+            future.cancel()
 
 
-def extract_text_from_pdf(file_path):
+def chunk_pdf_pages(pages, chunk_chars=None):
+    """
+    Group consecutive pages into chunks of roughly chunk_chars characters
+    
+    Yields:
+        (page_start, page_end, text) per chunk
     """
-    Extract text from PDF file
-    In production, would use PyPDF2
-    For demo, returns mock content
+    chunk_chars = chunk_chars or app.config['PDF_CHUNK_CHARS']
+    texts = []
+    size = 0
+    page_start = None
+    for page_number, text in pages:
+        if page_start is None:
+            page_start = page_number
+        texts.append(text)
+        size += len(text)
+        if size >= chunk_chars:
+            yield page_start, page_number, '\n'.join(texts)
+            texts, size, page_start = [], 0, None
+    if texts:
+        yield page_start, page_number, '\n'.join(texts)
+
+
+@timed()
+def store_pdf_chunks(blob_id, path, batch_size=50, progress=None):
     """
-    return """
-    Chapter 1: Introduction
-    - Core concepts and definitions
-    - Historical background
-    - Key terminologies
+    Extract a spooled PDF into ContentChunk rows of the given blob
     
-    Chapter 2: Main Topics
-    - Fundamental principles
-    - Practical applications
-    - Common use cases
+    Rows are inserted and committed in batches as pages stream in, so a long
+    document never holds the database write lock for the whole extraction.
+    If given, progress(pages_done) is called after each batch.
     
-    Chapter 3: Advanced Concepts
-    - Deep dives into theory
-    - Complex scenarios
+    Returns:
+        Summary dict with pages, chunks and a preview of the first text
     """
+    rows = []
+    summary = {'pages': 0, 'chunks': 0, 'preview': ''}
+    
+    for chunk_index, (page_start, page_end, text) in enumerate(chunk_pdf_pages(iter_pdf_pages(path))):
+        if chunk_index == 0:
+            summary['preview'] = text.strip()[:200]
+        rows.append({
+            'blob_id': blob_id,
+            'chunk_index': chunk_index,
+            'page_start': page_start,
+            'page_end': page_end,
+            'content': text
+        })
+        summary['pages'] = page_end
+        summary['chunks'] += 1
+        if len(rows) >= batch_size:
+            db.session.execute(insert(ContentChunk), rows)
+            db.session.commit()
+            rows = []
+            if progress:
+                progress(page_end)
+    
+    if rows:
+        db.session.execute(insert(ContentChunk), rows)
+    return summary
 
 
-def calculate_forgettable_topic_index(topic):
+@timed()
+def calculate_forgettable_topic_index(topic, now=None):
     """
     Calculate Forgettable Topic Index (FTI) for a topic
     
@@ -288,10 +1233,15 @@ def calculate_forgettable_topic_index(topic):
     - Stress-based performance drop (0-10): Larger drops score higher
     - Exam frequency (0-10): More common in exams score higher
     
+    Args:
+        topic: Topic (or any object with the FTI and recall aggregate columns)
+        now: Reference time for the time-decay component (defaults to utcnow)
+    
     Returns:
         fti_score (0-10): Higher = more forgettable
         category: 'high' (>7), 'moderate' (4-7), 'safe' (<4)
     """
+    now = now or datetime.utcnow()
     
     # Component 1: Topic Complexity (already in DB)
     complexity_weight = topic.topic_complexity * 0.15  # 15% weight
@@ -300,7 +1250,7 @@ def calculate_forgettable_topic_index(topic):
     length_weight = topic.topic_length * 0.15  # 15% weight
     
     # Component 3: Time since last revision (0-10 scale)
-    days_since_revised = (datetime.utcnow() - topic.last_revised).days
+    days_since_revised = (now - topic.last_revised).days
     time_decay = min(10, days_since_revised / 3)  # Max 10 at 30 days
     time_weight = time_decay * 0.20  # 20% weight
     
@@ -309,24 +1259,11 @@ def calculate_forgettable_topic_index(topic):
     failure_weight = min(10, failed_recalls * 1.5) * 0.20  # 20% weight
     
     # Component 5: Stress-based performance drop
-    # Calculate from recall history if available
-    all_recalls = RecallHistory.query.filter(
-        RecallHistory.question_id.in_(
-            [q.id for q in topic.questions]
-        )
-    ).all()
-    
     stress_drop = 0
-    if all_recalls:
-        high_stress_correct = sum(1 for r in all_recalls if r.stress_level > 70 and r.is_correct)
-        high_stress_total = sum(1 for r in all_recalls if r.stress_level > 70)
-        low_stress_correct = sum(1 for r in all_recalls if r.stress_level <= 70 and r.is_correct)
-        low_stress_total = sum(1 for r in all_recalls if r.stress_level <= 70)
-        
-        if low_stress_total > 0 and high_stress_total > 0:
-            low_stress_accuracy = low_stress_correct / low_stress_total
-            high_stress_accuracy = high_stress_correct / high_stress_total
-            stress_drop = (low_stress_accuracy - high_stress_accuracy) * 10
+    if topic.low_stress_total and topic.high_stress_total:
+        low_stress_accuracy = topic.low_stress_correct / topic.low_stress_total
+        high_stress_accuracy = topic.high_stress_correct / topic.high_stress_total
+        stress_drop = (low_stress_accuracy - high_stress_accuracy) * 10
     
     stress_weight = max(0, min(10, stress_drop)) * 0.15  # 15% weight
     
@@ -350,24 +1287,1523 @@ def calculate_forgettable_topic_index(topic):
     return fti_score, category
 
 
-def update_topic_fti(topic):
-    """Update a topic's FTI score and category"""
-    fti_score, category = calculate_forgettable_topic_index(topic)
-    topic.fti_score = fti_score
-    topic.fti_category = category
-    db.session.commit()
-    return fti_score, category
+def stress_recall_counts_query(user_id=None, topic_id=None):
+    """Build the GROUP BY query behind get_stress_recall_counts()"""
+    high_stress = RecallHistory.stress_level > HIGH_STRESS_THRESHOLD
+    low_stress = RecallHistory.stress_level <= HIGH_STRESS_THRESHOLD
+    
+    query = db.session.query(
+        GeneratedQuestion.topic_id,
+        func.sum(case((and_(high_stress, RecallHistory.is_correct), 1), else_=0)),
+        func.sum(case((high_stress, 1), else_=0)),
+        func.sum(case((and_(low_stress, RecallHistory.is_correct), 1), else_=0)),
+        func.sum(case((low_stress, 1), else_=0)),
+    ).join(RecallHistory, RecallHistory.question_id == GeneratedQuestion.id)
+    
+    if user_id is not None:
+        query = query.join(Topic, Topic.id == GeneratedQuestion.topic_id).filter(Topic.user_id == user_id)
+    if topic_id is not None:
+        query = query.filter(GeneratedQuestion.topic_id == topic_id)
+    
+    return query.group_by(GeneratedQuestion.topic_id)
 
 
-# ==================== FLASK-LOGIN SETUP ====================
+def get_stress_recall_counts(user_id=None, topic_id=None):
+    """
+    Aggregate stress-split recall counts per topic in a single GROUP BY query
+    
+    Args:
+        user_id: Restrict to topics owned by this user
+        topic_id: Restrict to a single topic
+    
+    Returns:
+        Dict of topic_id -> (high_correct, high_total, low_correct, low_total)
+    """
+    return {row[0]: tuple(int(value or 0) for value in row[1:])
+            for row in stress_recall_counts_query(user_id, topic_id)}
 
-@login_manager.user_loader
-def load_user(user_id):
-    """Load user from database"""
-    return User.query.get(int(user_id))
 
+def apply_topic_fti(topic, now=None):
+    """Recompute and store a topic's FTI (the caller commits)"""
+    now = now or datetime.utcnow()
+    topic.fti_score, topic.fti_category = calculate_forgettable_topic_index(topic, now)
+    topic.fti_computed_at = now
+    return topic.fti_score, topic.fti_category
 
-# ==================== AUTHENTICATION ROUTES ====================
+
+def update_topic_fti(topic):
+    """Update a topic's FTI score and category"""
+    fti_score, category = apply_topic_fti(topic)
+    db.session.commit()
+    return fti_score, category
+
+
+def fti_is_stale(topic, now=None):
+    """
+    Check whether a topic's stored FTI is out of date
+    
+    Stored scores are rewritten whenever their inputs change (a recall is
+    recorded or the topic is created), so the only thing that ages them is
+    the time-decay term, which moves each time another whole day passes
+    since the last revision.
+    """
+    computed_at = topic.fti_computed_at
+    if computed_at is None or computed_at < topic.last_revised:
+        return True
+    now = now or datetime.utcnow()
+    return (now - topic.last_revised).days != (computed_at - topic.last_revised).days
+
+
+def current_topic_fti(topic, now=None):
+    """
+    Get a topic's FTI without writing to the database
+    
+    Returns the stored score while it is fresh, otherwise scores the topic
+    in memory and leaves persisting it to the background refresher.
+    """
+    if not fti_is_stale(topic, now):
+        return topic.fti_score, topic.fti_category
+    return calculate_forgettable_topic_index(topic, now)
+
+
+def get_ranked_topics(user_id, now=None):
+    """
+    Build a read-only view of a user's topics ranked by FTI
+    
+    Returns:
+        List of topic dicts, most forgettable first
+    """
+    now = now or datetime.utcnow()
+    ranked = []
+    for topic in Topic.query.options(raiseload('*')).filter_by(user_id=user_id):
+        fti_score, category = current_topic_fti(topic, now)
+        ranked.append({
+            'id': topic.id,
+            'topic_name': topic.topic_name,
+            'subject': topic.subject,
+            'exam_type': topic.exam_type,
+            'topic_complexity': topic.topic_complexity,
+            'topic_length': topic.topic_length,
+            'exam_frequency': topic.exam_frequency,
+            'past_failures': topic.past_failures,
+            'last_revised': topic.last_revised,
+            'created_at': topic.created_at,
+            'fti_score': fti_score,
+            'fti_category': category
+        })
+    
+    ranked.sort(key=lambda t: t['fti_score'], reverse=True)
+    return ranked
+
+
+def stale_fti_updates(topics, now):
+    """Score the stale topics in memory and return bulk UPDATE parameter rows"""
+    updates = []
+    for topic in topics:
+        if not fti_is_stale(topic, now):
+            continue
+        fti_score, category = calculate_forgettable_topic_index(topic, now)
+        updates.append({'id': topic.id, 'fti_score': fti_score, 'fti_category': category,
+                        'fti_computed_at': now})
+    return updates
+
+
+def count_recalls_by_stress(recalls):
+    """
+    Fold (stress_level, is_correct) pairs into stress-split counts
+    
+    Returns:
+        (high_correct, high_total, low_correct, low_total), the same shape as
+        get_stress_recall_counts() values
+    """
+    high_correct = high_total = low_correct = low_total = 0
+    for stress_level, is_correct in recalls:
+        if (stress_level or 0) > HIGH_STRESS_THRESHOLD:
+            high_total += 1
+            high_correct += bool(is_correct)
+        else:
+            low_total += 1
+            low_correct += bool(is_correct)
+    return high_correct, high_total, low_correct, low_total
+
+
+def record_recall_aggregates(topic, stress_counts):
+    """
+    Fold new recalls into a topic's stored aggregates
+    
+    Increments are issued as SQL expressions (col = col + n) so concurrent
+    submissions don't lose updates; they are flushed with the caller's
+    transaction.
+    
+    Args:
+        topic: Topic the recalled questions belong to
+        stress_counts: (high_correct, high_total, low_correct, low_total) for the new recalls
+    """
+    high_correct, high_total, low_correct, low_total = stress_counts
+    
+    if high_total:
+        topic.high_stress_correct = Topic.high_stress_correct + high_correct
+        topic.high_stress_total = Topic.high_stress_total + high_total
+    if low_total:
+        topic.low_stress_correct = Topic.low_stress_correct + low_correct
+        topic.low_stress_total = Topic.low_stress_total + low_total
+    topic.total_correct = Topic.total_correct + high_correct + low_correct
+    topic.total_attempts = Topic.total_attempts + high_total + low_total
+
+
+def apply_recalls_to_topic(topic, recalls, now=None):
+    """
+    Fold a sequence of recalls into one update of a topic's strength,
+    revision time and recall aggregates (the caller flushes and commits)
+    
+    Args:
+        topic: Topic the recalled questions belong to
+        recalls: (stress_level, is_correct) pairs in the order they were answered
+        now: Revision time to record
+    """
+    recalls = list(recalls)
+    strength = topic.strength
+    for stress_level, is_correct in recalls:
+        # Boost strength if correct, reduce if wrong
+        factor = 0.95 if is_correct else 1.05
+        strength = min(5.0, max(0.5, strength * factor))
+    
+    topic.strength = strength
+    topic.last_revised = now or datetime.utcnow()
+    schedule_topic_review(topic)
+    record_recall_aggregates(topic, count_recalls_by_stress(recalls))
+
+
+# ==================== REVIEW QUEUE ====================
+
+def review_interval_days(strength, target=None):
+    """
+    Days until a topic's predicted retention falls to the review target
+    
+    Inverts the Ebbinghaus model used above: R = exp(-t / (strength * 2.5)),
+    so t = -ln(R) * strength * 2.5.
+    
+    Args:
+        strength: Memory strength factor
+        target: Retention percentage (0-100) at which the topic is due
+    """
+    target = target or app.config['REVIEW_RETENTION_TARGET']
+    return -math.log(target / 100) * strength * 2.5
+
+
+def next_review_time(last_revised, strength, target=None):
+    return last_revised + timedelta(days=review_interval_days(strength, target))
+
+
+def schedule_topic_review(topic):
+    """Store when a topic is next due from its strength and last revision (the caller commits)"""
+    topic.next_review_at = next_review_time(topic.last_revised or datetime.utcnow(), topic.strength or 1.0)
+
+
+def review_queue_statement(user_id, due_before, limit):
+    """
+    A user's topics due by due_before, most overdue first
+    
+    Served by ix_topic_user_next_review as a range scan that stops after
+    limit rows, so the cost does not grow with the number of topics.
+    """
+    return (select(Topic.id, Topic.subject, Topic.topic_name, Topic.exam_type, Topic.strength,
+                   Topic.last_revised, Topic.next_review_at, Topic.fti_score, Topic.fti_category)
+            .where(Topic.user_id == user_id, Topic.next_review_at <= due_before)
+            .order_by(Topic.next_review_at, Topic.id)
+            .limit(limit))
+
+
+# Per-question memory model (FSRS-style): recall probability decays as
+# R = 0.9 ** (t / stability); each recall updates stability and difficulty
+INITIAL_DIFFICULTY = {'easy': 3.0, 'medium': 5.0, 'hard': 7.0}  # recall_difficulty before any answers
+INITIAL_STABILITY = {True: 2.0, False: 0.25}  # days, after a question's first recall
+MIN_STABILITY = 0.05  # days
+MAX_STABILITY = 3650.0
+
+
+def question_retrievability(stability, elapsed_days):
+    """Predicted probability (0-1) of recalling a question elapsed_days after its last review"""
+    return 0.9 ** (max(elapsed_days, 0) / stability)
+
+
+def question_interval_days(stability, target=None):
+    """Days until recall probability falls to the target percentage"""
+    target = target or app.config['QUESTION_RETENTION_TARGET']
+    return stability * math.log(target / 100) / math.log(0.9)
+
+
+def question_memory_state(question):
+    """Memory fields of a GeneratedQuestion (or a row selecting them) as a dict"""
+    return {'difficulty': question.difficulty, 'stability': question.stability,
+            'recall_difficulty': question.recall_difficulty, 'last_reviewed_at': question.last_reviewed_at}
+
+
+def review_question(state, is_correct, now):
+    """
+    Fold one recall into a question's memory state
+    
+    A correct answer grows stability more when the question was closer to
+    being forgotten and when it is easy; answering a question just seen
+    barely moves it. A wrong answer shrinks stability and raises difficulty.
+    
+    Args:
+        state: Dict from question_memory_state()
+        is_correct: Whether the recall was graded correct
+        now: Time of the recall
+    
+    Returns:
+        Dict of the new stability, recall_difficulty, last_reviewed_at and due_at
+    """
+    initial_difficulty = INITIAL_DIFFICULTY.get(state['difficulty'], 5.0)
+    difficulty = state['recall_difficulty'] or initial_difficulty
+    stability = state['stability']
+    
+    if stability is None:
+        stability = INITIAL_STABILITY[is_correct]
+    else:
+        elapsed = (now - state['last_reviewed_at']).total_seconds() / 86400 if state['last_reviewed_at'] else 0
+        retrievability = question_retrievability(stability, elapsed)
+        if is_correct:
+            stability *= 1 + math.exp(1.5) * (11 - difficulty) * stability ** -0.1 * (math.exp(1 - retrievability) - 1)
+        else:
+            stability = min(stability, 2.0 * difficulty ** -0.2 * ((stability + 1) ** 0.3 - 1)
+                            * math.exp(2.0 * (1 - retrievability)))
+    stability = min(MAX_STABILITY, max(MIN_STABILITY, stability))
+    
+    # Drift towards the starting difficulty so one bad day is not permanent
+    difficulty += -0.3 if is_correct else 1.5
+    difficulty = min(10.0, max(1.0, 0.9 * difficulty + 0.1 * initial_difficulty))
+    
+    return {
+        'stability': stability,
+        'recall_difficulty': difficulty,
+        'last_reviewed_at': now,
+        'due_at': now + timedelta(days=question_interval_days(stability))
+    }
+
+
+def due_questions_statement(topic_id, now):
+    """A topic's questions due by now; order with keyset_query on (due_at, id), served by ix_generated_question_topic_due"""
+    return select(
+        GeneratedQuestion.id, GeneratedQuestion.question, GeneratedQuestion.answer,
+        GeneratedQuestion.question_type, GeneratedQuestion.difficulty, GeneratedQuestion.due_at
+    ).where(GeneratedQuestion.topic_id == topic_id, GeneratedQuestion.due_at <= now)
+
+
+# ==================== ANSWER GRADING ====================
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor not of
+off on once only or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your
+""".split())
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Longest suffixes first; a stem must keep at least three characters
+STEM_SUFFIXES = ('ational', 'ization', 'fulness', 'iveness', 'ement', 'ments', 'ation', 'ness',
+                 'ment', 'ings', 'ally', 'ing', 'ies', 'ied', 'ity', 'ers', 'ed', 'es', 'er', 'ly', 's')
+
+
+def stem_token(token):
+    """Light suffix-stripping stemmer so inflected forms grade the same"""
+    stem = token
+    for suffix in STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            stem = token[:-len(suffix)]
+            if suffix in ('ies', 'ied'):
+                stem += 'y'
+            elif suffix == 'es' and not stem.endswith(('x', 'z', 'ch', 'sh', 'ss')):
+                stem = token[:-1]  # trees -> tree, but indexes -> index
+            elif suffix == 's' and stem[-1] in 'siu':
+                stem = token  # class, analysis and status are not plurals
+            elif suffix in ('ing', 'ed', 'er', 'ers') and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                stem = stem[:-1]  # running -> run
+            break
+    # A final e is dropped so compare, compared and comparing meet at compar
+    if stem.endswith('e') and len(stem) > 3:
+        stem = stem[:-1]
+    return stem
+
+
+MAX_CACHED_ANSWER_LENGTH = 200  # characters; longer answers are tokenized without caching
+
+
+def tokenize_answer(text):
+    """Lowercase, split on non-alphanumerics, drop stop-words and stem (uncached)"""
+    return frozenset(stem_token(token) for token in TOKEN_PATTERN.findall(text.lower())
+                     if token not in STOP_WORDS)
+
+
+cached_answer_tokens = lru_cache(maxsize=8192)(tokenize_answer)
+
+
+def normalize_answer_tokens(text):
+    """
+    Normalize free text into the set of terms used for grading
+    
+    Short answers repeat ("no idea", a one-word term) and are cached. Longer
+    ones are free text that rarely recurs, so they bypass the cache and
+    cannot fill it with up to 8192 arbitrarily large strings.
+    
+    Returns:
+        frozenset of terms
+    """
+    text = text or ''
+    if len(text) > MAX_CACHED_ANSWER_LENGTH:
+        return tokenize_answer(text)
+    return cached_answer_tokens(text)
+
+
+def answer_token_string(answer):
+    """Stored form of an answer's grading terms (GeneratedQuestion.answer_tokens)"""
+    return ' '.join(sorted(normalize_answer_tokens(answer)))
+
+
+def reference_tokens(answer, answer_tokens=None):
+    """Grading terms for a stored answer, tokenizing on the fly for rows without answer_tokens"""
+    if answer_tokens is None:
+        return normalize_answer_tokens(answer)
+    return frozenset(answer_tokens.split())
+
+
+@timed()
+def grade_many(submissions, threshold=None):
+    """
+    Grade many answers against precomputed reference terms
+    
+    The score is the share of the reference answer's terms that appear in
+    the user's answer; an answer is correct when the score reaches the
+    threshold.
+    
+    Args:
+        submissions: Iterable of (user_answer, reference_terms) pairs, where
+            reference_terms comes from reference_tokens()
+        threshold: Minimum score to count as correct (default: GRADE_THRESHOLD)
+    
+    Returns:
+        List of (is_correct, score) tuples, in input order
+    """
+    if threshold is None:
+        threshold = app.config['GRADE_THRESHOLD']
+    
+    grades = []
+    for user_answer, reference in submissions:
+        if reference:
+            score = len(reference & normalize_answer_tokens(user_answer)) / len(reference)
+        else:
+            # Nothing but stop-words to match against
+            score = 1.0 if not normalize_answer_tokens(user_answer) else 0.0
+        grades.append((score >= threshold, round(score, 3)))
+    return grades
+
+
+def grade_answer(user_answer, question):
+    """Grade a single answer against a GeneratedQuestion"""
+    (is_correct, _), = grade_many([(user_answer, reference_tokens(question.answer, question.answer_tokens))])
+    return is_correct
+
+
+# ==================== SEARCH PROVIDERS ====================
+
+# Stand-in corpus used when SEARCH_CORPUS_DIR does not exist (title -> text)
+BUILTIN_SEARCH_DOCUMENTS = {
+    'Stack Exchange': "Stack Exchange is a network of question-and-answer websites. Common questions include implementation details, best practices, and edge cases.",
+    'Data Structures': "Data structures are specialized formats for organizing data. Key types: Arrays, Linked Lists, Trees, Graphs, Hash Tables. Important for algorithm efficiency.",
+    'Machine Learning': "Machine learning involves algorithms learning from data without explicit programming. Types: Supervised, Unsupervised, Reinforcement. Common applications: classification, regression, clustering.",
+    'Web Development': "Modern web development uses HTML for structure, CSS for styling, JavaScript for interactivity. Frameworks: React, Vue, Angular. Backend: Node.js, Python, Java.",
+    'Database Design': "Relational databases use tables and relationships. Key concepts: normalization, ACID properties, indexing. SQL: SELECT, INSERT, UPDATE, DELETE operations.",
+    'API Design': "RESTful APIs use HTTP methods (GET, POST, PUT, DELETE). Design principles: statelessness, resource-based URLs, proper status codes. Common formats: JSON, XML.",
+}
+SEARCH_CORPUS_EXTENSIONS = ('.txt', '.md')
+SEARCH_SNIPPET_CHARS = 300
+TITLE_TERM_WEIGHT = 3  # a title term counts as this many body occurrences
+
+metrics.histogram('recallx_search_duration_seconds', 'Search latency by provider and cache outcome')
+
+
+def search_terms(text):
+    """Lowercased, stemmed, stop-word-free terms of text, in order (repeats kept for term frequency)"""
+    return [stem_token(token) for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+class SearchProvider:
+    """
+    Interface for search backends
+    
+    search() returns a list of {'title', 'snippet', 'url'} dicts, best match
+    first. Implementations must be safe to call from several threads.
+    """
+    
+    name = 'base'
+    
+    def search(self, query, limit=10):
+        raise NotImplementedError
+    
+    def stats(self):
+        return {'provider': self.name}
+
+
+class InvertedIndexSearchProvider(SearchProvider):
+    """
+    Local search over an in-memory inverted index, built once from a list of documents
+    
+    Documents are ranked by the sum of (1 + log tf) * idf over the query
+    terms they contain, with title terms weighted TITLE_TERM_WEIGHT times.
+    The index is read-only after construction, so lookups need no lock.
+    """
+    
+    name = 'inverted-index'
+    
+    def __init__(self, documents):
+        """
+        Args:
+            documents: Iterable of {'title', 'content', 'url'} dicts
+        """
+        self.documents = []
+        self.postings = {}  # term -> [(document index, weighted term frequency)]
+        for doc_id, document in enumerate(documents):
+            frequencies = {}
+            for term in search_terms(document['title']):
+                frequencies[term] = frequencies.get(term, 0) + TITLE_TERM_WEIGHT
+            for term in search_terms(document['content']):
+                frequencies[term] = frequencies.get(term, 0) + 1
+            for term, frequency in frequencies.items():
+                self.postings.setdefault(term, []).append((doc_id, frequency))
+            self.documents.append({
+                'title': document['title'],
+                'snippet': ' '.join(document['content'].split())[:SEARCH_SNIPPET_CHARS],
+                'url': document['url']
+            })
+        count = len(self.documents)
+        self.idf = {term: math.log(1 + count / len(postings)) for term, postings in self.postings.items()}
+    
+    @classmethod
+    def from_directory(cls, path):
+        """
+        Index every .txt/.md file under path
+        
+        The first non-empty line (without leading '#') is the title; the
+        rest of the file is the content.
+        """
+        documents = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                if not filename.lower().endswith(SEARCH_CORPUS_EXTENSIONS):
+                    continue
+                file_path = os.path.join(root, filename)
+                with open(file_path, encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+                title, _, content = text.strip().partition('\n')
+                documents.append({
+                    'title': title.lstrip('#').strip() or os.path.splitext(filename)[0],
+                    'content': content.strip() or title,
+                    'url': 'file://' + os.path.abspath(file_path)
+                })
+        return cls(documents)
+    
+    @classmethod
+    def from_builtin(cls):
+        return cls({'title': title, 'content': text,
+                    'url': f'https://example.com/{title.replace(" ", "-").lower()}'}
+                   for title, text in BUILTIN_SEARCH_DOCUMENTS.items())
+    
+    def search(self, query, limit=10):
+        scores = {}
+        for term in set(search_terms(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self.postings[term]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + (1 + math.log(frequency)) * idf
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [dict(self.documents[doc_id]) for doc_id, _ in ranked]
+    
+    def stats(self):
+        return {'provider': self.name, 'documents': len(self.documents), 'terms': len(self.postings)}
+
+
+class CachedSearchProvider(SearchProvider):
+    """
+    TTL/LRU cache of normalized query -> results in front of another provider
+    
+    Concurrent misses for the same query wait for a single call to the
+    wrapped provider instead of each calling it ('coalesced'). Latency is
+    recorded per cache outcome so a slow backend shows up in stats() and
+    /metrics.
+    """
+    
+    def __init__(self, provider, maxsize=1024, ttl=3600):
+        self.provider = provider
+        self.name = provider.name
+        self.cache = TTLCache('search', maxsize=maxsize, ttl=ttl)
+        self._inflight = {}  # key -> Lock held by the thread calling the provider
+        self._lock = threading.Lock()
+        self._latency = {'hit': [0, 0.0], 'coalesced': [0, 0.0], 'miss': [0, 0.0]}  # outcome -> [count, total seconds]
+    
+    def _record(self, outcome, elapsed):
+        with self._lock:
+            entry = self._latency[outcome]
+            entry[0] += 1
+            entry[1] += elapsed
+        if metrics.enabled:
+            metrics.observe('recallx_search_duration_seconds', elapsed, provider=self.name, cache=outcome)
+    
+    def search(self, query, limit=10):
+        start = time.perf_counter()
+        key = (normalize_search_query(query), limit)
+        results = self.cache.get(key)
+        outcome = 'hit'
+        if results is None:
+            with self._lock:
+                key_lock = self._inflight.setdefault(key, threading.Lock())
+            with key_lock:
+                results = self.cache.peek(key)  # Filled by another thread while we waited
+                outcome = 'coalesced'
+                if results is None:
+                    try:
+                        results = self.provider.search(query, limit)
+                        self.cache.set(key, results)
+                    finally:
+                        with self._lock:
+                            self._inflight.pop(key, None)
+                    outcome = 'miss'
+        self._record(outcome, time.perf_counter() - start)
+        return [dict(result) for result in results]
+    
+    def stats(self):
+        with self._lock:
+            latency = {outcome: {'count': count, 'mean_ms': round(total / count * 1000, 3) if count else 0.0}
+                       for outcome, (count, total) in self._latency.items()}
+        return dict(self.provider.stats(), cache=self.cache.stats(), latency=latency)
+
+
+def build_search_provider():
+    """The configured search backend, wrapped in the query cache"""
+    corpus_dir = app.config['SEARCH_CORPUS_DIR']
+    if corpus_dir and os.path.isdir(corpus_dir):
+        provider = InvertedIndexSearchProvider.from_directory(corpus_dir)
+    else:
+        provider = InvertedIndexSearchProvider.from_builtin()
+    return CachedSearchProvider(provider, app.config['SEARCH_CACHE_SIZE'], app.config['SEARCH_CACHE_TTL'])
+
+
+search_provider = build_search_provider()
+
+
+@timed()
+def internet_search(query):
+    """
+    Search the configured provider for a topic
+    
+    Returns:
+        List of {'title', 'snippet', 'url'} results; a generic result when nothing matches
+    """
+    results = search_provider.search(query, app.config['SEARCH_RESULT_LIMIT'])
+    
+    # Return at least one result
+    if not results:
+        results = [{
+            'title': 'General Information',
+            'snippet': f'Information about {query}: This is a comprehensive topic covering multiple aspects and applications.',
+            'url': 'https://example.com/general'
+        }]
+    
+    return results
+
+
+# ==================== CONTENT STORE ====================
+
+def normalize_search_query(query):
+    """Case- and whitespace-insensitive form of a search query, used as its content key"""
+    return ' '.join(query.lower().split())
+
+
+def search_query_hash(query):
+    return hashlib.sha256(normalize_search_query(query).encode()).hexdigest()
+
+
+def claim_content_blob(kind, content_hash, byte_size=None):
+    """
+    Find the blob for (kind, content_hash), or insert an incomplete one to fill
+    
+    The new blob is committed right away so concurrent workers see it and
+    wait for it instead of extracting the same content again.
+    
+    Returns:
+        (blob, created)
+    """
+    blob = ContentBlob.query.filter_by(kind=kind, content_hash=content_hash).first()
+    if blob is not None:
+        return blob, False
+    try:
+        blob = ContentBlob(kind=kind, content_hash=content_hash, byte_size=byte_size, is_complete=False)
+        db.session.add(blob)
+        db.session.commit()
+        return blob, True
+    except IntegrityError:
+        # Another worker claimed the same content first
+        db.session.rollback()
+        return ContentBlob.query.filter_by(kind=kind, content_hash=content_hash).one(), False
+
+
+def discard_content_blob(blob_id):
+    """Delete a blob and its chunks (the caller commits)"""
+    db.session.execute(delete(ContentChunk).where(ContentChunk.blob_id == blob_id))
+    db.session.execute(delete(ContentBlob).where(ContentBlob.id == blob_id))
+
+
+def discard_stale_content_blob(blob, stale_after=None):
+    """
+    Delete an incomplete blob claimed more than stale_after seconds ago
+    (default JOB_STALE_AFTER), whose builder presumably crashed, and commit
+    
+    Returns:
+        True if this call discarded it (concurrent waiters race; one wins)
+    """
+    stale_after = stale_after or app.config['JOB_STALE_AFTER']
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    if blob.is_complete or blob.created_at >= cutoff:
+        return False
+    
+    blob_id = blob.id
+    is_stale = and_(ContentBlob.id == blob_id, ContentBlob.is_complete.is_(False), ContentBlob.created_at < cutoff)
+    db.session.execute(delete(ContentChunk).where(ContentChunk.blob_id == blob_id,
+                                                  select(ContentBlob.id).where(is_stale).exists()))
+    discarded = db.session.execute(delete(ContentBlob).where(is_stale)).rowcount
+    db.session.commit()
+    return bool(discarded)
+
+
+def get_content_blob(kind, content_hash, build, byte_size=None, timeout=None, poll_interval=0.5):
+    """
+    Return the complete blob for (kind, content_hash), building it at most once
+    
+    build(blob_id) writes the blob's ContentChunk rows and returns its summary
+    dict. If another worker is already building the same blob, this waits
+    for it (up to timeout seconds, default JOB_STALE_AFTER). A claim older
+    than JOB_STALE_AFTER was left by a crashed worker (the same rule that
+    requeues its job); it is discarded and the blob is claimed and built
+    again.
+    
+    The claim, the chunks and the completed blob are committed here, not by
+    the caller; a failed build is discarded before the error is re-raised.
+    Commits and rollbacks here also apply to anything already pending in
+    the session, so call this before making other writes.
+    
+    Returns:
+        (blob, created)
+    """
+    timeout = timeout or app.config['JOB_STALE_AFTER']
+    deadline = time.monotonic() + timeout
+    while True:
+        blob, created = claim_content_blob(kind, content_hash, byte_size)
+        if created:
+            try:
+                blob.summary = json.dumps(build(blob.id))
+                blob.is_complete = True
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                discard_content_blob(blob.id)
+                db.session.commit()
+                raise
+            return blob, True
+        if blob.is_complete:
+            return blob, False
+        if discard_stale_content_blob(blob):
+            continue
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'Timed out waiting for {kind} content {content_hash[:12]} to be extracted')
+        # End the read transaction so the next look sees the builder's commits
+        db.session.rollback()
+        time.sleep(poll_interval)
+
+
+def acquire_content_blob(blob_id):
+    """Count one more reference to a blob (the caller commits)"""
+    db.session.execute(update(ContentBlob).where(ContentBlob.id == blob_id)
+                       .values(ref_count=ContentBlob.ref_count + 1).execution_options(synchronize_session=False))
+
+
+def release_content_blob(blob_id, connection=None):
+    """
+    Drop one reference to a blob, deleting it once unreferenced (the caller commits)
+    
+    Args:
+        blob_id: The blob a removed PDFExtractedContent / InternetFetchedContent row used
+        connection: Connection to run on (default: db.session), e.g. from a flush event
+    """
+    execute = (connection or db.session).execute
+    execute(update(ContentBlob).where(ContentBlob.id == blob_id)
+            .values(ref_count=ContentBlob.ref_count - 1).execution_options(synchronize_session=False))
+    execute(delete(ContentChunk).where(
+        ContentChunk.blob_id == blob_id,
+        select(ContentBlob.ref_count).where(ContentBlob.id == blob_id).scalar_subquery() <= 0
+    ))
+    execute(delete(ContentBlob).where(ContentBlob.id == blob_id, ContentBlob.ref_count <= 0))
+
+
+@event.listens_for(PDFExtractedContent, 'after_delete')
+@event.listens_for(InternetFetchedContent, 'after_delete')
+def release_deleted_content_reference(mapper, connection, target):
+    """
+    Release a deleted content row's blob in the same flush
+    
+    Covers session.delete() of the row itself and the cascades from topic
+    and user deletion. Bulk delete() statements skip ORM events; run
+    `gc-content` after those.
+    """
+    if target.blob_id is not None:
+        release_content_blob(target.blob_id, connection)
+
+
+def blob_chunks(blob_id):
+    """A blob's chunks in order"""
+    return ContentChunk.query.filter_by(blob_id=blob_id).order_by(ContentChunk.chunk_index).all()
+
+
+def store_pdf_upload(topic_id, filename, path, content_hash, byte_size=None, progress=None):
+    """
+    Attach an uploaded PDF to a topic, extracting it only if its bytes are new
+    
+    Returns:
+        Summary dict (pages, chunks, preview, deduplicated); the caller commits
+    """
+    blob, created = get_content_blob('pdf', content_hash,
+                                     lambda blob_id: store_pdf_chunks(blob_id, path, progress=progress), byte_size)
+    summary = json.loads(blob.summary)
+    
+    existing = PDFExtractedContent.query.filter_by(topic_id=topic_id, blob_id=blob.id).first()
+    if existing is None:
+        db.session.add(PDFExtractedContent(topic_id=topic_id, filename=filename, content=summary['preview'],
+                                           blob_id=blob.id))
+        acquire_content_blob(blob.id)
+    return dict(summary, deduplicated=not created)
+
+
+def cached_internet_search(topic_id, search_query):
+    """
+    Search for a topic and link the results to it, reusing stored results for the same query
+    
+    Returns:
+        (search results, deduplicated); the caller commits
+    """
+    def build(blob_id):
+        results = internet_search(search_query)
+        db.session.execute(insert(ContentChunk), [{
+            'blob_id': blob_id,
+            'chunk_index': i,
+            'title': result['title'],
+            'source_url': result['url'],
+            'content': result['snippet']
+        } for i, result in enumerate(results)])
+        return {'query': normalize_search_query(search_query), 'results': len(results)}
+    
+    blob, created = get_content_blob('search', search_query_hash(search_query), build)
+    results = [{'title': chunk.title, 'snippet': chunk.content, 'url': chunk.source_url}
+               for chunk in blob_chunks(blob.id)]
+    
+    if not InternetFetchedContent.query.filter_by(topic_id=topic_id, blob_id=blob.id).first():
+        db.session.add(InternetFetchedContent(
+            topic_id=topic_id, search_query=search_query, content=results[0]['snippet'][:200] if results else '',
+            source_url=results[0]['url'] if results else None, blob_id=blob.id
+        ))
+        acquire_content_blob(blob.id)
+    return results, not created
+
+
+def collect_content_blobs(stale_after=None):
+    """
+    Recount blob references and delete unreferenced blobs
+    
+    Incomplete blobs older than stale_after seconds (default JOB_STALE_AFTER)
+    were left by a crashed extraction and are deleted too.
+    
+    Returns:
+        (blobs recounted, blobs deleted)
+    """
+    stale_after = stale_after or app.config['JOB_STALE_AFTER']
+    references = {}
+    for model in (PDFExtractedContent, InternetFetchedContent):
+        for blob_id, count in db.session.query(model.blob_id, func.count()) \
+                .filter(model.blob_id.isnot(None)).group_by(model.blob_id):
+            references[blob_id] = references.get(blob_id, 0) + count
+    
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    updates = []
+    doomed = []
+    for blob_id, ref_count, is_complete, created_at in db.session.query(
+            ContentBlob.id, ContentBlob.ref_count, ContentBlob.is_complete, ContentBlob.created_at):
+        count = references.get(blob_id, 0)
+        if (is_complete and count == 0) or (not is_complete and created_at < cutoff):
+            doomed.append(blob_id)
+        elif count != ref_count:
+            updates.append({'id': blob_id, 'ref_count': count})
+    
+    if updates:
+        db.session.execute(update(ContentBlob), updates)
+    for blob_id in doomed:
+        discard_content_blob(blob_id)
+    db.session.commit()
+    return len(updates), len(doomed)
+
+
+# ==================== BACKGROUND REFRESH ====================
+
+def write_forgetting_predictions(topics, now=None):
+    """
+    Replace the stored forgetting predictions for the given topics
+    
+    One row is written per topic and horizon in PREDICTION_HORIZONS, giving
+    the retention expected on that date if the topic is not revised before
+    then. The caller commits.
+    
+    Returns:
+        Number of prediction rows written
+    """
+    now = now or datetime.utcnow()
+    topics = list(topics)
+    if not topics:
+        return 0
+    
+    db.session.execute(
+        delete(ForgettingPrediction).where(ForgettingPrediction.topic_id.in_([t.id for t in topics]))
+    )
+    
+    retention_matrix = batch_forgetting_curve(
+        [max(0, (now - topic.last_revised).days) for topic in topics],
+        [topic.strength for topic in topics],
+        PREDICTION_HORIZONS
+    )
+    
+    rows = []
+    for topic, retentions in zip(topics, retention_matrix):
+        for days_ahead, retention in zip(PREDICTION_HORIZONS, retentions):
+            rows.append({
+                'topic_id': topic.id,
+                'days_ahead': days_ahead,
+                'retention_percentage': round(retention, 2),
+                'forget_probability': round(1 - retention / 100, 4),
+                'optimal_revision_date': now + timedelta(days=days_ahead),
+                'calculated_at': now
+            })
+    
+    db.session.execute(insert(ForgettingPrediction), rows)
+    return len(rows)
+
+
+@timed()
+def refresh_users(user_ids, now=None):
+    """Refresh stale FTI scores and forgetting predictions for a batch of users in one commit"""
+    now = now or datetime.utcnow()
+    topics = Topic.query.options(raiseload('*')).filter(Topic.user_id.in_(user_ids)).all()
+    
+    updates = stale_fti_updates(topics, now)
+    if updates:
+        db.session.execute(update(Topic), updates)
+    write_forgetting_predictions(topics, now)
+    
+    db.session.commit()
+    # Only rescored topics change cached views; predictions are not cached
+    topic_users = {topic.id: topic.user_id for topic in topics}
+    for user_id in sorted({topic_users[row['id']] for row in updates}):
+        user_data_changed(user_id, 'fti-refresh')
+    return len(updates)
+
+
+def _refresh_users_in_context(user_ids, now):
+    """Worker-thread entry point: each batch runs in its own app context and session"""
+    with app.app_context():
+        return refresh_users(user_ids, now)
+
+
+def claim_refresh_checkpoint(name, owner, lease_seconds):
+    """
+    Take the lease on a refresh checkpoint so only one sweep advances it
+    
+    Every serving process runs its own refresher, so sweeps compete for the
+    same checkpoint. Like claim_next_job(), the claim is a conditional UPDATE:
+    it succeeds only if the lease is free, already ours, or has expired
+    because its holder stopped making progress.
+    
+    Returns:
+        True if owner now holds the lease
+    """
+    if db.session.get(RefreshCheckpoint, name) is None:
+        db.session.add(RefreshCheckpoint(name=name))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another process created it first
+    
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        update(RefreshCheckpoint)
+        .where(RefreshCheckpoint.name == name,
+               or_(RefreshCheckpoint.lease_owner.is_(None), RefreshCheckpoint.lease_owner == owner,
+                   RefreshCheckpoint.lease_expires_at < now))
+        .values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+
+def advance_refresh_checkpoint(name, owner, lease_seconds, **values):
+    """
+    Record sweep progress and renew the lease, if owner still holds it
+    
+    Returns:
+        False if the lease was lost, in which case nothing is written
+    """
+    values.setdefault('lease_expires_at', datetime.utcnow() + timedelta(seconds=lease_seconds))
+    advanced = db.session.execute(
+        update(RefreshCheckpoint)
+        .where(RefreshCheckpoint.name == name, RefreshCheckpoint.lease_owner == owner)
+        .values(updated_at=datetime.utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return bool(advanced)
+
+
+def run_refresh_sweep(batch_size=100, max_workers=2, restart=False, name='fti-refresh', lease_seconds=None):
+    """
+    Walk all users in id order, refreshing FTI and forgetting predictions
+    
+    Users are processed in batches of batch_size with at most max_workers
+    batches in flight. Progress is checkpointed after each wave of batches,
+    so an interrupted sweep resumes after the last completed wave.
+    
+    A sweep first takes the checkpoint's lease (claim_refresh_checkpoint());
+    while another process holds it this returns without doing anything, so
+    concurrent refreshers never rewrite the same users' predictions. The
+    lease is renewed with every checkpoint and released when the sweep ends.
+    
+    Args:
+        batch_size: Users per batch
+        max_workers: Maximum number of batches processed concurrently
+        restart: Ignore any unfinished sweep and start from the first user
+        name: Checkpoint name (separate names keep independent progress)
+        lease_seconds: How long the lease survives without progress
+            (default FTI_REFRESH_LEASE)
+    
+    Returns:
+        Number of users processed by this call
+    """
+    lease_seconds = lease_seconds or app.config['FTI_REFRESH_LEASE']
+    owner = uuid.uuid4().hex
+    if not claim_refresh_checkpoint(name, owner, lease_seconds):
+        return 0
+    
+    try:
+        now = datetime.utcnow()
+        checkpoint = db.session.get(RefreshCheckpoint, name)
+        last_user_id = checkpoint.last_user_id or 0
+        if restart or checkpoint.completed_at is not None or not checkpoint.started_at:
+            last_user_id = 0
+            advance_refresh_checkpoint(name, owner, lease_seconds,
+                                       last_user_id=0, started_at=now, completed_at=None)
+        
+        processed = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                wave = []
+                for _ in range(max_workers):
+                    user_ids = [user_id for (user_id,) in db.session.query(User.id)
+                                .filter(User.id > last_user_id).order_by(User.id).limit(batch_size)]
+                    if not user_ids:
+                        break
+                    wave.append(user_ids)
+                    last_user_id = user_ids[-1]
+                
+                if not wave:
+                    break
+                
+                futures = [executor.submit(_refresh_users_in_context, user_ids, now) for user_ids in wave]
+                for future in futures:
+                    future.result()
+                
+                processed += sum(len(user_ids) for user_ids in wave)
+                if not advance_refresh_checkpoint(name, owner, lease_seconds, last_user_id=last_user_id):
+                    app.logger.warning('Refresh sweep %s lost its lease; stopping', name)
+                    return processed
+    except Exception:
+        db.session.rollback()
+        advance_refresh_checkpoint(name, owner, lease_seconds, lease_owner=None, lease_expires_at=None)
+        raise
+    
+    advance_refresh_checkpoint(name, owner, lease_seconds, completed_at=datetime.utcnow(),
+                               lease_owner=None, lease_expires_at=None)
+    return processed
+
+
+class BackgroundRefresher:
+    """Daemon thread that runs a refresh sweep every `interval` seconds"""
+    
+    def __init__(self, interval, batch_size=100, max_workers=2):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._stop_event = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+    
+    def start(self):
+        """Start the worker thread (no-op if already running)"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='recallx-refresher', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=None):
+        """Signal the worker to stop and wait for the current sweep to finish"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                with app.app_context():
+                    run_refresh_sweep(self.batch_size, self.max_workers)
+            except Exception:
+                app.logger.exception('Background refresh sweep failed')
+            self._stop_event.wait(self.interval)
+
+
+background_refresher = BackgroundRefresher(app.config['FTI_REFRESH_INTERVAL'], app.config['FTI_REFRESH_BATCH_SIZE'],
+                                           app.config['FTI_REFRESH_WORKERS'])
+
+
+def start_background_refresher():
+    """
+    Start this process's refresher if FTI_REFRESH_INTERVAL is enabled
+    
+    Runs before every request, so each serving process (the dev server's
+    reloader child or a WSGI worker) starts its thread on its first request.
+    Processes that never serve, such as the reloader parent or CLI commands,
+    never start one. A worker forked after the thread started gets a new one,
+    because threads do not survive fork.
+    """
+    if background_refresher.interval > 0:
+        background_refresher.start()
+
+
+app.before_request(start_background_refresher)
+
+
+# ==================== BACKGROUND JOBS ====================
+
+JOB_HANDLERS = {}  # kind -> handler(job, payload), returning a JSON-serializable result (see run_job)
+
+
+def job_handler(kind):
+    """Register a function as the handler for jobs of the given kind"""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def report_job_progress(job_id, message):
+    """
+    Record a progress message on a running job (shown by /api/jobs/<id>)
+    
+    The message is stored on the Job row, so every process serving the
+    status endpoint sees it, whichever process runs the job. Storing it
+    commits the session: handlers report progress before making their own
+    writes or right after a commit, as store_pdf_chunks() calls its
+    progress callback once per committed batch of pages.
+    """
+    db.session.execute(update(Job).where(Job.id == job_id).values(progress=message)
+                       .execution_options(synchronize_session=False))
+    db.session.commit()
+
+
+def enqueue_job(kind, user_id, payload):
+    """
+    Queue a job and wake a worker
+    
+    With JOB_WORKERS = 0 the job runs inline before this returns.
+    
+    Returns:
+        The committed Job
+    """
+    job = Job(id=uuid.uuid4().hex, user_id=user_id, kind=kind, payload=json.dumps(payload))
+    db.session.add(job)
+    db.session.commit()
+    
+    if app.config['JOB_WORKERS'] <= 0:
+        run_job(job.id)
+    else:
+        job_workers.start()
+        job_workers.notify()
+    return job
+
+
+def claim_next_job():
+    """
+    Move the oldest queued job to 'running'
+    
+    The status check in the UPDATE makes the claim atomic across worker
+    threads and processes; a lost race just moves on to the next candidate.
+    
+    Returns:
+        The claimed job's id, or None if the queue is empty
+    """
+    while True:
+        job_id = db.session.query(Job.id).filter_by(status='queued') \
+            .order_by(Job.created_at).limit(1).scalar()
+        if job_id is None:
+            return None
+        claimed = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued')
+            .values(status='running', started_at=datetime.utcnow(), attempts=Job.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+
+
+def run_job(job_id):
+    """
+    Run a claimed (or inline) job and record its outcome
+    
+    The handler's writes and the 'succeeded' status are committed together,
+    then caches of the user's data are invalidated; on failure the writes
+    are rolled back and only the error is stored.
+    
+    Content-store writes are the exception: get_content_blob() commits the
+    shared blob and its chunks while building them, so other workers can
+    wait on the blob and a long PDF never holds the write lock for the whole
+    extraction. A failed build is deleted by discard_content_blob() before
+    the error propagates, and a blob left by a crashed worker is rebuilt by
+    the next job that needs it or removed by `gc-content`. Those commits also flush anything pending in the session,
+    so handlers call get_content_blob() before making their own writes.
+    """
+    job = db.session.get(Job, job_id)
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'Unknown job kind: {job.kind}')
+        result = handler(job, json.loads(job.payload))
+        job.status = 'succeeded'
+        job.result = json.dumps(result)
+    except Exception as e:
+        app.logger.exception('Job %s (%s) failed', job_id, job.kind)
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.status = 'failed'
+        job.error = str(e)
+    
+    job.progress = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    if job.status == 'succeeded':
+        user_data_changed(job.user_id, job.kind)  # Search and upload jobs add content to a topic
+    return job
+
+
+def requeue_stale_jobs(stale_after=None):
+    """Requeue jobs left 'running' longer than stale_after seconds (e.g. by a crashed worker)"""
+    stale_after = stale_after or app.config['JOB_STALE_AFTER']
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    requeued = db.session.execute(
+        update(Job).where(Job.status == 'running', Job.started_at < cutoff)
+        .values(status='queued').execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return requeued
+
+
+def drain_jobs():
+    """Run queued jobs in the current thread until the queue is empty; returns the number run"""
+    count = 0
+    while True:
+        job_id = claim_next_job()
+        if job_id is None:
+            return count
+        run_job(job_id)
+        count += 1
+
+
+def job_to_dict(job):
+    """JSON shape of a job for /api/jobs/<id>"""
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+class JobWorkerPool:
+    """Daemon threads that claim and run queued jobs, at most `workers` at a time"""
+    
+    def __init__(self, workers, poll_interval=1.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wake = threading.Condition()
+        self._stop_event = threading.Event()
+        self._start_lock = threading.Lock()
+        self._threads = []
+    
+    def start(self):
+        """Start the worker threads (no-op if already running)"""
+        with self._start_lock:
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            with app.app_context():
+                requeue_stale_jobs()
+            self._stop_event.clear()
+            self._threads = [threading.Thread(target=self._run, name=f'recallx-job-worker-{i}', daemon=True)
+                             for i in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+    
+    def notify(self):
+        """Wake one idle worker to check the queue now"""
+        with self._wake:
+            self._wake.notify()
+    
+    def stop(self, timeout=None):
+        """Signal the workers to stop and wait for their current jobs to finish"""
+        self._stop_event.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            job_id = None
+            try:
+                with app.app_context():
+                    job_id = claim_next_job()
+                    if job_id is not None:
+                        run_job(job_id)
+            except Exception:
+                app.logger.exception('Job worker iteration failed')
+            if job_id is None:
+                # Jobs queued by other processes are picked up on the next poll
+                with self._wake:
+                    self._wake.wait(self.poll_interval)
+
+
+job_workers = JobWorkerPool(app.config['JOB_WORKERS'], app.config['JOB_POLL_INTERVAL'])
+
+
+@job_handler('search-topic')
+def run_search_topic_job(job, payload):
+    """Search for a topic, store the results and generate questions from them"""
+    topic_id = payload['topic_id']
+    search_query = payload['search_query']
+    
+    report_job_progress(job.id, 'Searching the internet')
+    search_results, deduplicated = cached_internet_search(topic_id, search_query)
+    
+    # No progress report from here on: it would commit the links written above before the questions
+    topic = db.session.get(Topic, topic_id, options=[raiseload('*')])
+    questions = generate_questions_for_topics([topic])
+    
+    return {'topic_id': topic_id, 'search_results': search_results, 'questions_generated': len(questions),
+            'deduplicated': deduplicated}
+
+
+@job_handler('upload-pdf')
+def run_upload_pdf_job(job, payload):
+    """Attach a spooled PDF to its topic (extracting it unless already stored), then delete the spool file"""
+    report_job_progress(job.id, 'Extracting text')
+    try:
+        summary = store_pdf_upload(payload['topic_id'], payload['filename'], payload['path'],
+                                   payload['content_hash'], payload.get('byte_size'),
+                                   progress=lambda pages: report_job_progress(job.id, f'{pages} pages extracted'))
+    finally:
+        if os.path.exists(payload['path']):
+            os.remove(payload['path'])
+    return summary
+
+
+# ==================== PAGINATION & STREAMING ====================
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_TOPICS = 100  # topic_ids accepted by one bulk question generation request
+MAX_BATCH_ANSWERS = 500  # answers accepted by one stress-test batch (the client flushes every 5)
+STREAM_BATCH_SIZE = 500  # Rows fetched per round trip when streaming
+
+
+def encode_cursor(*values):
+    """Encode the sort key of a page's last row as an opaque 'after' cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode an 'after' cursor into its sort key values (None if absent)"""
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError('Invalid cursor')
+
+
+def wants_ndjson():
+    """Whether the client asked for a streamed NDJSON response"""
+    return (request.args.get('format') == 'ndjson' or
+            request.accept_mimetypes.best == 'application/x-ndjson')
+
+
+def get_page_args(streaming=False):
+    """
+    Read the limit/after query parameters
+    
+    Pages default to DEFAULT_PAGE_SIZE rows; streamed responses are unlimited
+    unless a limit is given.
+    
+    Returns:
+        (limit or None, cursor values or None)
+    """
+    limit = request.args.get('limit', type=int)
+    if limit is None and not streaming:
+        limit = DEFAULT_PAGE_SIZE
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return limit, decode_cursor(request.args.get('after'))
+
+
+def key_columns(key_column):
+    return key_column if isinstance(key_column, tuple) else (key_column,)
+
+
+def keyset_query(statement, key_column, after=None, limit=None):
+    """
+    Order a select by key_column and resume after the cursor (keyset pagination)
+    
+    key_column may be a tuple of columns (ending in a unique one); the cursor
+    then holds one value per column and is compared as a row value.
+    """
+    columns = key_columns(key_column)
+    if after:
+        if len(columns) == 1:
+            statement = statement.where(columns[0] > after[0])
+        else:
+            statement = statement.where(tuple_(*columns) > tuple_(*after))
+    statement = statement.order_by(*columns)
+    return statement.limit(limit) if limit else statement
+
+
+def fetch_page(statement, key_column, limit, after=None):
+    """
+    Fetch one keyset page
+    
+    Returns:
+        (row mappings, next_cursor or None)
+    """
+    rows = db.session.execute(keyset_query(statement, key_column, after, limit + 1)).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*(rows[-1][column.key] for column in key_columns(key_column)))
+    return rows, next_cursor
+
+
+def stream_rows(statement, key_column, limit=None, after=None):
+    """Yield row mappings from a server-side cursor, STREAM_BATCH_SIZE at a time"""
+    statement = keyset_query(statement, key_column, after, limit)
+    yield from db.session.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE)).mappings()
+
+
+def ndjson_response(rows):
+    """Stream an iterable of dicts as newline-delimited JSON"""
+    def generate():
+        for row in rows:
+            yield json.dumps(row) + '\n'
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# ==================== FLASK-LOGIN SETUP ====================
+
+class SessionUser(UserMixin):
+    """
+    The logged-in user's identity as cached by load_user
+    
+    Holds only what request handling needs (the id for scoping queries and
+    the username for templates); it is not an ORM object, so it can be
+    shared across requests and threads.
+    """
+    
+    def __init__(self, id, username):
+        self.id = id
+        self.username = username
+
+
+# user_id -> SessionUser, so authenticated requests skip the User lookup; entries
+# are dropped when the user row changes (see invalidate_cached_user)
+user_cache = TTLCache('users', maxsize=app.config['USER_CACHE_SIZE'], ttl=app.config['USER_CACHE_TTL'])
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    """
+    Drop a changed or deleted user (password, username, ...) from user_cache
+    
+    The entry is dropped at flush and again once the transaction commits,
+    so a request that reloads it in between cannot keep the old identity.
+    """
+    user_cache.invalidate(target.id)
+    object_session(target).info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_committed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def forget_rolled_back_users(session):
+    session.info.pop('changed_user_ids', None)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Load the session's user identity, from user_cache when possible"""
+    user_id = int(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.session.query(User.id, User.username).filter_by(id=user_id).first()
+        if row is None:
+            return None
+        user = SessionUser(row.id, row.username)
+        user_cache.set(user_id, user)
+    return user
+
+
+def request_user():
+    """The authenticated user for this request, resolved once and kept on g"""
+    if 'request_user' not in g:
+        g.request_user = current_user._get_current_object()
+    return g.request_user
+
+
+# ==================== AUTHENTICATION ROUTES ====================
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -460,37 +2896,56 @@ def index():
 @login_required
 def dashboard():
     """Dashboard showing topics ranked by Forgettable Topic Index"""
-    user = current_user
-    topics = Topic.query.filter_by(user_id=user.id).all()
+    user = request_user()
+    snapshot = dashboard_snapshots.get(user.id, lambda: build_dashboard_snapshot(user.id))
+    return render_template('dashboard.html', topics=snapshot['topics'], alerts=snapshot['alerts'])
+
+
+def build_dashboard_snapshot(user_id, now=None):
+    """
+    Build the dashboard view model: topics ranked by FTI and the alert list
     
-    # Update FTI scores for all topics
-    for topic in topics:
-        update_topic_fti(topic)
+    FTI only moves when another whole day passes since a topic's last
+    revision, so the snapshot is valid until the earliest such boundary
+    (or until an invalidation event).
+    
+    Returns:
+        ({'topics': [...], 'alerts': [...]}, seconds the snapshot stays valid)
+    """
+    now = now or datetime.utcnow()
+    
+    # Topics with current FTI scores, sorted most forgettable first
+    topics_by_fti = get_ranked_topics(user_id, now)
     
-    # Sort by FTI (most forgettable first)
-    topics_by_fti = sorted(topics, key=lambda t: t.fti_score, reverse=True)
+    valid_until = now + timedelta(days=1)
+    for topic in topics_by_fti:
+        rollover = topic['last_revised'] + timedelta(days=max(0, (now - topic['last_revised']).days) + 1)
+        valid_until = min(valid_until, rollover)
+        # Snapshots may be persisted as JSON
+        topic['last_revised'] = topic['last_revised'].isoformat()
+        topic['created_at'] = topic['created_at'].isoformat() if topic['created_at'] else None
     
     # Create alerts for high-FTI topics
     alerts = []
     for topic in topics_by_fti:
-        if topic.fti_category == 'high':
+        if topic['fti_category'] == 'high':
             alerts.append({
-                'topic': topic.topic_name,
-                'message': f'⚠️ {topic.topic_name} has HIGH forgettability! Focus on stress training.',
+                'topic': topic['topic_name'],
+                'message': f'⚠️ {topic["topic_name"]} has HIGH forgettability! Focus on stress training.',
                 'severity': 'high',
-                'fti_score': topic.fti_score
+                'fti_score': topic['fti_score']
             })
-        elif topic.fti_category == 'moderate':
+        elif topic['fti_category'] == 'moderate':
             # Add one sample moderate alert
             if len([a for a in alerts if a['severity'] == 'medium']) == 0:
                 alerts.append({
-                    'topic': topic.topic_name,
-                    'message': f'📌 {topic.topic_name} has MODERATE forgettability. Regular practice needed.',
+                    'topic': topic['topic_name'],
+                    'message': f'📌 {topic["topic_name"]} has MODERATE forgettability. Regular practice needed.',
                     'severity': 'medium',
-                    'fti_score': topic.fti_score
+                    'fti_score': topic['fti_score']
                 })
     
-    return render_template('dashboard.html', topics=topics_by_fti, alerts=alerts)
+    return {'topics': topics_by_fti, 'alerts': alerts}, (valid_until - now).total_seconds()
 
 
 @app.route('/add-topic')
@@ -511,8 +2966,8 @@ def upload_page():
 @login_required
 def forgetting_curve_page(topic_id):
     """Forgetting curve visualization page"""
-    topic = Topic.query.get(topic_id)
-    if not topic or topic.user_id != current_user.id:
+    topic = get_user_topic(topic_id)
+    if not topic:
         return "Unauthorized", 403
     return render_template('forgetting_curve.html', topic=topic)
 
@@ -521,8 +2976,8 @@ def forgetting_curve_page(topic_id):
 @login_required
 def stress_test_page(topic_id):
     """Stress recall test page"""
-    topic = Topic.query.get(topic_id)
-    if not topic or topic.user_id != current_user.id:
+    topic = get_user_topic(topic_id)
+    if not topic:
         return "Unauthorized", 403
     return render_template('stress_test.html', topic=topic)
 
@@ -541,7 +2996,7 @@ def report_page():
 def api_add_topic():
     """API: Add a new topic"""
     try:
-        user = current_user
+        user = request_user()
         data = request.json
         
         topic = Topic(
@@ -554,7 +3009,11 @@ def api_add_topic():
         )
         
         db.session.add(topic)
+        db.session.flush()
+        apply_topic_fti(topic)
+        schedule_topic_review(topic)
         db.session.commit()
+        user_data_changed(user.id, 'add-topic')
         
         return jsonify({
             'success': True,
@@ -572,48 +3031,25 @@ def api_add_topic():
 def api_search_topic():
     """API: Search for topic information on the internet"""
     try:
-        user = current_user
+        user = request_user()
         data = request.json
         topic_id = data.get('topic_id')
         search_query = data.get('search_query', data.get('topic_name', ''))
         
-        topic = Topic.query.get(topic_id)
-        if not topic or topic.user_id != current_user.id:
+        topic = get_user_topic(topic_id)
+        if not topic:
             return jsonify({'success': False, 'error': 'Topic not found'}), 404
         
-        # Mock internet search
-        search_results = mock_internet_search(search_query)
-        
-        # Store search results
-        for result in search_results:
-            internet_content = InternetFetchedContent(
-                topic_id=topic_id,
-                search_query=search_query,
-                content=result['snippet'],
-                source_url=result['url']
-            )
-            db.session.add(internet_content)
-        
-        # Generate questions based on search
-        questions = generate_questions_for_topic(topic.topic_name, topic.exam_type)
-        for q in questions:
-            generated_q = GeneratedQuestion(
-                topic_id=topic_id,
-                question=q['question'],
-                answer=q['answer'],
-                question_type=q['type'],
-                difficulty=q['difficulty']
-            )
-            db.session.add(generated_q)
-        
-        db.session.commit()
+        # Search and question generation run in a background job
+        job = enqueue_job('search-topic', user.id, {'topic_id': topic.id, 'search_query': search_query})
         
         return jsonify({
             'success': True,
-            'message': 'Topic researched and questions generated',
-            'search_results': search_results,
-            'questions_generated': len(questions)
-        }), 200
+            'message': 'Topic search queued',
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('api_get_job', job_id=job.id)
+        }), 202
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -624,10 +3060,8 @@ def api_search_topic():
 def api_upload_pdf():
     """API: Upload and parse PDF"""
     try:
-        user = get_or_create_default_user()
-        topic_id = request.form.get('topic_id')
-        
-        topic = Topic.query.get(topic_id)
+        user = request_user()
+        topic = get_user_topic(request.form.get('topic_id'))
         if not topic:
             return jsonify({'success': False, 'error': 'Topic not found'}), 404
         
@@ -638,23 +3072,26 @@ def api_upload_pdf():
         if file.filename == '':
             return jsonify({'success': False, 'error': 'No file selected'}), 400
         
-        # Mock PDF extraction
-        extracted_text = extract_text_from_pdf(file.filename)
-        
-        pdf_content = PDFExtractedContent(
-            topic_id=topic_id,
-            filename=file.filename,
-            content=extracted_text
-        )
-        
-        db.session.add(pdf_content)
-        db.session.commit()
+        # Spool to disk now; extraction runs page by page in a background job
+        path, content_hash, byte_size = spool_upload(file)
+        try:
+            job = enqueue_job('upload-pdf', user.id, {
+                'topic_id': topic.id, 'filename': file.filename, 'path': path,
+                'content_hash': content_hash, 'byte_size': byte_size
+            })
+        except Exception:
+            # Not queued, so no job will ever delete the spool file
+            if os.path.exists(path):
+                os.remove(path)
+            raise
         
         return jsonify({
             'success': True,
-            'message': 'PDF processed successfully',
-            'extracted_text_preview': extracted_text[:200] + '...'
-        }), 201
+            'message': 'PDF uploaded; extraction queued',
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('api_get_job', job_id=job.id)
+        }), 202
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
@@ -663,82 +3100,179 @@ def api_upload_pdf():
 @app.route('/api/generate-questions/<int:topic_id>', methods=['GET'])
 @login_required
 def api_generate_questions(topic_id):
-    """API: Generate questions for a topic"""
+    """
+    API: Generate questions for a topic
+    
+    Returns only the questions due for review, most overdue first, paged by
+    a (due_at, id) cursor; ?all=1 returns every question in id order.
+    """
     try:
-        topic = Topic.query.get(topic_id)
-        if not topic or topic.user_id != current_user.id:
+        topic = get_user_topic(topic_id)
+        if not topic:
             return jsonify({'success': False, 'error': 'Topic not found'}), 404
         
+        streaming = wants_ndjson()
+        limit, after = get_page_args(streaming)
+        due_only = request.args.get('all') != '1'
+        
+        def serialize(q):
+            return {
+                'id': q['id'],
+                'question': q['question'],
+                'answer': q['answer'],
+                'type': q['question_type'],
+                'difficulty': q['difficulty'],
+                'due_at': q['due_at'].isoformat() if q['due_at'] else None
+            }
+        
         # Get existing or generate new questions
-        questions = GeneratedQuestion.query.filter_by(topic_id=topic_id).all()
-        
-        if not questions:
-            # Generate if none exist
-            q_data = generate_questions_for_topic(topic.topic_name, topic.exam_type, count=10)
-            for q in q_data:
-                generated_q = GeneratedQuestion(
-                    topic_id=topic_id,
-                    question=q['question'],
-                    answer=q['answer'],
-                    question_type=q['type'],
-                    difficulty=q['difficulty']
-                )
-                db.session.add(generated_q)
+        has_questions = db.session.query(GeneratedQuestion.id).filter_by(topic_id=topic_id).first()
+        
+        if has_questions:
+            if due_only:
+                statement = due_questions_statement(topic_id, datetime.utcnow())
+                key_column = (GeneratedQuestion.due_at, GeneratedQuestion.id)
+                if after:
+                    after = (datetime.fromisoformat(after[0]), after[1])
+            else:
+                statement = select(
+                    GeneratedQuestion.id, GeneratedQuestion.question, GeneratedQuestion.answer,
+                    GeneratedQuestion.question_type, GeneratedQuestion.difficulty, GeneratedQuestion.due_at
+                ).where(GeneratedQuestion.topic_id == topic_id)
+                key_column = GeneratedQuestion.id
+            
+            if streaming:
+                return ndjson_response(serialize(q) for q in stream_rows(statement, key_column, limit, after))
+            questions, next_cursor = fetch_page(statement, key_column, limit, after)
+        else:
+            # Generate if none exist; the insert returns the new ids, so no re-query
+            questions = generate_questions_for_topics([topic], count=10)
             db.session.commit()
-            questions = GeneratedQuestion.query.filter_by(topic_id=topic_id).all()
+            
+            if streaming:
+                return ndjson_response(serialize(q) for q in questions[:limit])
+            if len(questions) > limit:
+                last = questions[limit - 1]
+                next_cursor = encode_cursor(last['due_at'], last['id']) if due_only else encode_cursor(last['id'])
+            else:
+                next_cursor = None
+            questions = questions[:limit]
+        
+        questions_data = [serialize(q) for q in questions]
+        
+        return jsonify({
+            'success': True,
+            'questions': questions_data,
+            'count': len(questions_data),
+            'next_cursor': next_cursor
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+@app.route('/api/generate-questions', methods=['POST'])
+@login_required
+def api_generate_questions_bulk():
+    """API: Generate questions for many topics at once (e.g. a syllabus import)"""
+    try:
+        data = request.json
+        topic_ids = data.get('topic_ids', [])
+        if not isinstance(topic_ids, list) or not all(type(topic_id) is int for topic_id in topic_ids):
+            return jsonify({'success': False, 'error': 'topic_ids must be a list of integers'}), 400
+        if len(topic_ids) > MAX_BULK_TOPICS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BULK_TOPICS} topic_ids per request'}), 400
+        # Every created question is echoed back, so one request stays within a page
+        count = max(1, min(int(data.get('count', 5)), MAX_PAGE_SIZE // max(1, len(set(topic_ids)))))
+        
+        topics = Topic.query.options(raiseload('*')) \
+            .filter(Topic.id.in_(topic_ids), Topic.user_id == request_user().id).all()
+        if len(topics) != len(set(topic_ids)):
+            return jsonify({'success': False, 'error': 'Topic not found'}), 404
+        
+        created = generate_questions_for_topics(topics, count=count)
+        db.session.commit()
         
         questions_data = [{
-            'id': q.id,
-            'question': q.question,
-            'answer': q.answer,
-            'type': q.question_type,
-            'difficulty': q.difficulty
-        } for q in questions]
+            'id': q['id'],
+            'topic_id': q['topic_id'],
+            'question': q['question'],
+            'answer': q['answer'],
+            'type': q['question_type'],
+            'difficulty': q['difficulty']
+        } for q in created]
+        
+        return jsonify({
+            'success': True,
+            'questions': questions_data,
+            'count': len(questions_data)
+        }), 201
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+@app.route('/api/forgetting-curve/<int:topic_id>', methods=['GET'])
+@login_required
+def api_forgetting_curve(topic_id):
+    """API: Get forgetting curve data for visualization"""
+    try:
+        topic = get_user_topic(topic_id)
+        if not topic:
+            return jsonify({'success': False, 'error': 'Topic not found'}), 404
+        
+        # The response only changes with the topic's name/strength and the date,
+        # so revisits can be answered with a 304 before building anything
+        today = datetime.utcnow().date()
+        etag = hashlib.sha1(
+            f'{topic.id}|{topic.topic_name}|{topic.strength!r}|{topic.next_review_at}|{today.isoformat()}'.encode()
+        ).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            payload = get_forgetting_curve_payload(topic.strength, today)
+            response = jsonify({
+                'success': True,
+                'topic_name': topic.topic_name,
+                'topic_strength': topic.strength,
+                'curve_data': payload['curve_data'],
+                'optimal_dates': payload['optimal_dates'],
+                'next_review_at': topic.next_review_at.isoformat() if topic.next_review_at else None
+            })
         
-        return jsonify({
-            'success': True,
-            'questions': questions_data,
-            'count': len(questions_data)
-        }), 200
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
-@app.route('/api/forgetting-curve/<int:topic_id>', methods=['GET'])
+@app.route('/api/forgetting-predictions/<int:topic_id>', methods=['GET'])
 @login_required
-def api_forgetting_curve(topic_id):
-    """API: Get forgetting curve data for visualization"""
+def api_forgetting_predictions(topic_id):
+    """API: Get the precomputed forgetting predictions for a topic"""
     try:
-        topic = Topic.query.get(topic_id)
-        if not topic or topic.user_id != current_user.id:
+        topic = get_user_topic(topic_id)
+        if not topic:
             return jsonify({'success': False, 'error': 'Topic not found'}), 404
         
-        # Generate curve data for next 30 days
-        curve_data = []
-        for day in range(0, 31):
-            retention = calculate_ebbinghaus_forgetting_curve(day, topic.strength)
-            curve_data.append({
-                'day': day,
-                'retention': round(retention, 2),
-                'forget_probability': round(100 - retention, 2)
-            })
+        predictions = ForgettingPrediction.query.filter_by(topic_id=topic_id) \
+            .order_by(ForgettingPrediction.days_ahead).all()
         
-        # Find optimal revision dates
-        optimal_dates = []
-        for day in [1, 3, 7, 14, 30]:
-            optimal_dates.append({
-                'day': day,
-                'date': (datetime.utcnow() + timedelta(days=day)).strftime('%Y-%m-%d'),
-                'retention': round(calculate_ebbinghaus_forgetting_curve(day, topic.strength), 2)
-            })
+        predictions_data = [{
+            'days_ahead': p.days_ahead,
+            'retention': p.retention_percentage,
+            'forget_probability': p.forget_probability,
+            'date': p.optimal_revision_date.strftime('%Y-%m-%d'),
+            'calculated_at': p.calculated_at.strftime('%Y-%m-%d %H:%M')
+        } for p in predictions]
         
         return jsonify({
             'success': True,
             'topic_name': topic.topic_name,
-            'topic_strength': topic.strength,
-            'curve_data': curve_data,
-            'optimal_dates': optimal_dates
+            'predictions': predictions_data,
+            'count': len(predictions_data)
         }), 200
     
     except Exception as e:
@@ -750,7 +3284,7 @@ def api_forgetting_curve(topic_id):
 def api_stress_test():
     """API: Submit stress test results"""
     try:
-        user = current_user
+        user = request_user()
         data = request.json
         
         question_id = data.get('question_id')
@@ -758,10 +3292,14 @@ def api_stress_test():
         response_time = data.get('response_time')
         stress_level = data.get('stress_level', 0)
         confidence = data.get('confidence', 0)
-        correct_answer = data.get('correct_answer', '')
         
-        # Simple answer checking (keyword matching)
-        is_correct = any(word in user_answer.lower() for word in correct_answer.lower().split())
+        # Grade against the stored answer, not one supplied by the client;
+        # the topic is needed for the strength update, so load it in the same query
+        question = db.session.get(GeneratedQuestion, question_id,
+                                  options=[joinedload(GeneratedQuestion.topic).raiseload('*')])
+        if question is None or question.topic.user_id != user.id:
+            return jsonify({'success': False, 'error': 'Question not found'}), 404
+        is_correct = grade_answer(user_answer or '', question)
         
         recall = RecallHistory(
             user_id=user.id,
@@ -774,17 +3312,21 @@ def api_stress_test():
         )
         
         db.session.add(recall)
-        db.session.commit()
         
-        # Update topic strength based on performance
-        question = GeneratedQuestion.query.get(question_id)
-        if question:
-            topic = question.topic
-            # Boost strength if correct, reduce if wrong
-            factor = 0.95 if is_correct else 1.05
-            topic.strength = min(5.0, max(0.5, topic.strength * factor))
-            topic.last_revised = datetime.utcnow()
-            db.session.commit()
+        # Reschedule the question from its updated memory state
+        for field, value in review_question(question_memory_state(question), is_correct, datetime.utcnow()).items():
+            setattr(question, field, value)
+        
+        # Update topic strength and recall aggregates based on performance
+        topic = question.topic
+        apply_recalls_to_topic(topic, [(stress_level, is_correct)])
+        
+        # Inputs to the FTI changed, so store a fresh score
+        db.session.flush()
+        apply_topic_fti(topic)
+        
+        db.session.commit()
+        user_data_changed(user.id, 'stress-test')
         
         return jsonify({
             'success': True,
@@ -797,75 +3339,301 @@ def api_stress_test():
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
+@app.route('/api/stress-test/batch', methods=['POST'])
+@login_required
+def api_stress_test_batch():
+    """
+    API: Submit a whole stress-test session's answers in one request
+    
+    Each answer carries a client-generated 'client_id'; answers already
+    recorded under that id are reported back instead of being counted again,
+    so a client can safely retry a flush after a network failure.
+    """
+    try:
+        user = request_user()
+        answers = request.json.get('answers', [])
+        now = datetime.utcnow()
+        
+        if not isinstance(answers, list) or not all(isinstance(answer, dict) for answer in answers):
+            return jsonify({'success': False, 'error': 'answers must be a list of objects'}), 400
+        if len(answers) > MAX_BATCH_ANSWERS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_ANSWERS} answers per request'}), 400
+        if any(not answer.get('client_id') for answer in answers):
+            return jsonify({'success': False, 'error': 'Every answer needs a client_id'}), 400
+        
+        # Answers recorded by an earlier attempt of this flush
+        client_ids = [str(answer['client_id']) for answer in answers]
+        recorded = dict(db.session.query(RecallHistory.client_answer_id, RecallHistory.is_correct).filter(
+            RecallHistory.user_id == user.id,
+            RecallHistory.client_answer_id.in_(client_ids)
+        ))
+        
+        # Questions answered in this batch, restricted to the user's own topics
+        question_ids = {answer.get('question_id') for answer in answers}
+        questions = {q.id: q for q in db.session.query(
+            GeneratedQuestion.id, GeneratedQuestion.topic_id, GeneratedQuestion.answer, GeneratedQuestion.answer_tokens,
+            GeneratedQuestion.difficulty, GeneratedQuestion.stability, GeneratedQuestion.recall_difficulty,
+            GeneratedQuestion.last_reviewed_at
+        ).join(Topic).filter(GeneratedQuestion.id.in_(question_ids), Topic.user_id == user.id)}
+        
+        # New answers, graded together against the stored answer terms
+        pending = []
+        seen = set(recorded)
+        for answer, client_id in zip(answers, client_ids):
+            question = questions.get(int(answer.get('question_id') or 0))
+            if client_id not in seen and question is not None:
+                seen.add(client_id)  # Repeats within the batch count once
+                pending.append((answer, client_id, question))
+        grades = grade_many((answer.get('user_answer') or '', reference_tokens(question.answer, question.answer_tokens))
+                            for answer, _, question in pending)
+        graded = {client_id: (answer, question, is_correct)
+                  for (answer, client_id, question), (is_correct, _) in zip(pending, grades)}
+        
+        results = []
+        rows = []
+        topic_recalls = {}
+        question_states = {}
+        for client_id in client_ids:
+            if client_id in recorded:
+                results.append({'client_id': client_id, 'is_correct': recorded[client_id], 'duplicate': True})
+                continue
+            if client_id not in graded:
+                results.append({'client_id': client_id, 'error': 'Question not found'})
+                continue
+            
+            answer, question, is_correct = graded[client_id]
+            stress_level = answer.get('stress_level', 0)
+            recorded[client_id] = is_correct
+            rows.append({
+                'user_id': user.id,
+                'question_id': question.id,
+                'user_answer': answer.get('user_answer'),
+                'is_correct': is_correct,
+                'response_time': answer.get('response_time'),
+                'stress_level': stress_level,
+                'confidence': answer.get('confidence', 0),
+                'attempted_at': now,
+                'client_answer_id': client_id
+            })
+            topic_recalls.setdefault(question.topic_id, []).append((stress_level, is_correct))
+            state = question_states.get(question.id) or question_memory_state(question)
+            question_states[question.id] = dict(state, **review_question(state, is_correct, now))
+            results.append({'client_id': client_id, 'is_correct': is_correct, 'duplicate': False})
+        
+        if rows:
+            db.session.execute(insert(RecallHistory), rows)
+            db.session.execute(update(GeneratedQuestion), [
+                {'id': question_id, 'stability': state['stability'], 'recall_difficulty': state['recall_difficulty'],
+                 'last_reviewed_at': state['last_reviewed_at'], 'due_at': state['due_at']}
+                for question_id, state in question_states.items()
+            ])
+            
+            # One strength/aggregate update per affected topic
+            topics = Topic.query.options(raiseload('*')).filter(Topic.id.in_(topic_recalls)).all()
+            for topic in topics:
+                apply_recalls_to_topic(topic, topic_recalls[topic.id], now)
+            
+            # Inputs to the FTI changed, so store fresh scores
+            db.session.flush()
+            for topic in topics:
+                apply_topic_fti(topic, now)
+            
+            db.session.commit()
+            user_data_changed(user.id, 'stress-test')
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'recorded': len(rows),
+            'duplicates': sum(1 for r in results if r.get('duplicate'))
+        }), 200
+    
+    except IntegrityError:
+        # A concurrent retry recorded some of these answers first; retrying reports them as duplicates
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Answers are already being recorded, retry'}), 409
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
 @app.route('/api/report', methods=['GET'])
 @login_required
 def api_report():
     """API: Get comprehensive performance report"""
     try:
-        user = get_or_create_default_user()
-        topics = Topic.query.filter_by(user_id=user.id).all()
-        
-        report_data = {
-            'total_topics': len(topics),
-            'total_strength': 0,
-            'average_accuracy': 0,
-            'topics': [],
-            'alerts': []
+        user = request_user()
+        streaming = wants_ndjson()
+        limit, after = get_page_args(streaming)
+        
+        cache_key = (user.id, datetime.utcnow().date().isoformat(), 'ndjson' if streaming else 'json',
+                     limit, request.args.get('after'))
+        # Dashboard generations advance on every user_data_changed() event, in every
+        # process sharing DASHBOARD_CACHE_PATH, so an entry tagged with an older one is stale
+        generation = dashboard_snapshots.generation(user.id)
+        cached = report_cache.get(cache_key)
+        if cached is not None and cached[0] == generation:
+            if streaming:
+                return ndjson_response(cached[1])
+            return jsonify(cached[1]), 200
+        
+        statement, key_column = report_rows_statement(user.id)
+        
+        if streaming:
+            def generate():
+                events = []  # Kept for the cache unless the report outgrows MAX_PAGE_SIZE topics
+                topic_count = 0
+                for event in report_events(statement, key_column, limit, after, user.id):
+                    yield event
+                    if events is not None:
+                        events.append(event)
+                        topic_count += event['type'] == 'topic'
+                        if topic_count > MAX_PAGE_SIZE:
+                            events = None
+                if events is not None:
+                    report_cache.set(cache_key, (generation, events))
+            return ndjson_response(generate())
+        
+        report_data, next_cursor = build_report_page(statement, key_column, limit, after, user.id)
+        
+        response_data = {
+            'success': True,
+            'report': report_data,
+            'next_cursor': next_cursor
         }
+        report_cache.set(cache_key, (generation, response_data))
+        return jsonify(response_data), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+def report_events(statement, key_column, limit, after, user_id):
+    """Yield the streamed report: a summary event, then topic events each followed by its alert, if any"""
+    rows = stream_rows(statement, key_column, limit, after)
+    first = next(rows, None)
+    yield {'type': 'summary', **build_report_summary(first, user_id)}
+    if first is None:
+        return
+    for topic_data, alert in build_report_topics(chain([first], rows)):
+        yield {'type': 'topic', **topic_data}
+        if alert:
+            yield {'type': 'alert', **alert}
+
+
+def report_rows_statement(user_id):
+    """
+    Build the single report query for a user
+    
+    Each row carries the topic's columns and stored attempt/correct counts,
+    plus the user-wide totals as window aggregates, so one query yields both
+    the per-topic rows and the headline numbers.
+    
+    Returns:
+        (select statement, key column for keyset pagination)
+    """
+    rows = select(
+        Topic.id, Topic.topic_name, Topic.subject, Topic.exam_type, Topic.strength,
+        Topic.last_revised, Topic.total_correct, Topic.total_attempts,
+        func.count().over().label('report_topics'),
+        func.avg(Topic.strength).over().label('report_strength'),
+        func.sum(Topic.total_correct).over().label('report_correct'),
+        func.sum(Topic.total_attempts).over().label('report_attempts')
+    ).where(Topic.user_id == user_id).subquery()
+    return select(rows), rows.c.id
+
+
+@timed()
+def build_report_page(statement, key_column, limit, after, user_id):
+    """
+    Fetch one page of report rows and assemble the summary, topics and alerts
+    
+    Returns:
+        (report dict, next_cursor)
+    """
+    rows, next_cursor = fetch_page(statement, key_column, limit, after)
+    report_data = dict(build_report_summary(rows[0] if rows else None, user_id), topics=[], alerts=[])
+    for topic_data, alert in build_report_topics(rows):
+        report_data['topics'].append(topic_data)
+        if alert:
+            report_data['alerts'].append(alert)
+    return report_data, next_cursor
+
+
+def build_report_summary(row, user_id):
+    """
+    Derive the headline report numbers from the window totals on a report row
+    
+    An empty page (no topics, or a cursor past the end) has no row to read
+    them from, so the totals are aggregated directly instead.
+    """
+    if row is not None:
+        totals = (row['report_topics'], row['report_strength'], row['report_correct'], row['report_attempts'])
+    else:
+        totals = db.session.query(
+            func.count(Topic.id),
+            func.avg(Topic.strength),
+            func.sum(Topic.total_correct),
+            func.sum(Topic.total_attempts)
+        ).filter(Topic.user_id == user_id).one()
+    total_topics, avg_strength, total_correct, total_attempts = totals
+    
+    summary = {
+        'total_topics': total_topics,
+        'total_strength': round(avg_strength or 0, 2),
+        'average_accuracy': round(total_correct / total_attempts * 100, 1) if total_attempts else 0
+    }
+    
+    # Calculate readiness score
+    readiness_score = min(100, summary['average_accuracy'] * summary['total_strength'])
+    summary['readiness_score'] = round(readiness_score, 1)
+    summary['readiness_status'] = 'Ready!' if readiness_score >= 75 else 'Needs Practice' if readiness_score >= 50 else 'Not Ready'
+    return summary
+
+
+def build_report_topics(rows):
+    """
+    Turn report topic rows into (topic_data, alert or None) pairs
+    
+    Rows are consumed in STREAM_BATCH_SIZE chunks so retention is computed
+    one vectorized batch at a time without materializing the whole result.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, STREAM_BATCH_SIZE))
+        if not chunk:
+            return
         
-        total_correct = 0
-        total_attempts = 0
+        now = datetime.utcnow()
+        retentions = batch_forgetting_curve(
+            [(now - topic['last_revised']).days for topic in chunk],
+            [topic['strength'] for topic in chunk]
+        )
         
-        for topic in topics:
-            days_since = (datetime.utcnow() - topic.last_revised).days
-            retention = calculate_ebbinghaus_forgetting_curve(days_since, topic.strength)
-            
-            # Get performance for this topic
-            recalls = RecallHistory.query.filter(
-                RecallHistory.question_id.in_(
-                    db.session.query(GeneratedQuestion.id).filter_by(topic_id=topic.id)
-                )
-            ).all()
-            
-            correct = sum(1 for r in recalls if r.is_correct)
-            total_correct += correct
-            total_attempts += len(recalls)
-            
+        for topic, (retention,) in zip(chunk, retentions):
+            correct = topic['total_correct'] or 0
+            attempts = topic['total_attempts'] or 0
             topic_data = {
-                'topic_name': topic.topic_name,
-                'subject': topic.subject,
-                'exam_type': topic.exam_type,
-                'strength': round(topic.strength, 2),
+                'id': topic['id'],
+                'topic_name': topic['topic_name'],
+                'subject': topic['subject'],
+                'exam_type': topic['exam_type'],
+                'strength': round(topic['strength'], 2),
                 'retention': round(retention, 2),
-                'accuracy': round(correct / len(recalls) * 100, 1) if recalls else 0,
-                'attempts': len(recalls),
-                'last_revised': topic.last_revised.strftime('%Y-%m-%d %H:%M')
+                'accuracy': round(correct / attempts * 100, 1) if attempts else 0,
+                'attempts': attempts,
+                'last_revised': topic['last_revised'].strftime('%Y-%m-%d %H:%M')
             }
-            report_data['topics'].append(topic_data)
             
             # Add to alerts if weak
+            alert = None
             if retention < 50:
-                report_data['alerts'].append({
-                    'topic': topic.topic_name,
+                alert = {
+                    'topic': topic['topic_name'],
                     'message': f'Weak recall strength: {retention:.0f}% retention',
                     'action': 'Schedule revision immediately'
-                })
-        
-        report_data['total_strength'] = round(sum(t['strength'] for t in report_data['topics']) / len(topics) if topics else 0, 2)
-        report_data['average_accuracy'] = round(total_correct / total_attempts * 100, 1) if total_attempts > 0 else 0
-        
-        # Calculate readiness score
-        readiness_score = min(100, report_data['average_accuracy'] * report_data['total_strength'])
-        report_data['readiness_score'] = round(readiness_score, 1)
-        report_data['readiness_status'] = 'Ready!' if readiness_score >= 75 else 'Needs Practice' if readiness_score >= 50 else 'Not Ready'
-        
-        return jsonify({
-            'success': True,
-            'report': report_data
-        }), 200
-    
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 400
+                }
+            yield topic_data, alert
 
 
 @app.route('/api/topics', methods=['GET'])
@@ -873,22 +3641,35 @@ def api_report():
 def api_get_topics():
     """API: Get all topics for current user"""
     try:
-        user = get_or_create_default_user()
-        topics = Topic.query.filter_by(user_id=user.id).all()
+        user = request_user()
+        streaming = wants_ndjson()
+        limit, after = get_page_args(streaming)
         
-        topics_data = [{
-            'id': t.id,
-            'subject': t.subject,
-            'topic_name': t.topic_name,
-            'exam_type': t.exam_type,
-            'strength': t.strength,
-            'created_at': t.created_at.strftime('%Y-%m-%d')
-        } for t in topics]
+        statement = select(
+            Topic.id, Topic.subject, Topic.topic_name, Topic.exam_type, Topic.strength, Topic.created_at
+        ).where(Topic.user_id == user.id)
+        
+        def serialize(t):
+            return {
+                'id': t['id'],
+                'subject': t['subject'],
+                'topic_name': t['topic_name'],
+                'exam_type': t['exam_type'],
+                'strength': t['strength'],
+                'created_at': t['created_at'].strftime('%Y-%m-%d')
+            }
+        
+        if streaming:
+            return ndjson_response(serialize(t) for t in stream_rows(statement, Topic.id, limit, after))
+        
+        topics, next_cursor = fetch_page(statement, Topic.id, limit, after)
+        topics_data = [serialize(t) for t in topics]
         
         return jsonify({
             'success': True,
             'topics': topics_data,
-            'count': len(topics_data)
+            'count': len(topics_data),
+            'next_cursor': next_cursor
         }), 200
     
     except Exception as e:
@@ -900,35 +3681,31 @@ def api_get_topics():
 def api_get_forgettable_topics():
     """API: Get topics ranked by Forgettable Topic Index (FTI)"""
     try:
-        user = get_or_create_default_user()
-        topics = Topic.query.filter_by(user_id=user.id).all()
-        
-        # Update FTI scores for all topics
-        for topic in topics:
-            update_topic_fti(topic)
+        user = request_user()
+        now = datetime.utcnow()
         
-        # Sort by FTI score (descending)
-        sorted_topics = sorted(topics, key=lambda t: t.fti_score, reverse=True)
+        # Current FTI scores, sorted by FTI score (descending)
+        sorted_topics = get_ranked_topics(user.id, now)
         
         topics_data = [{
-            'id': t.id,
-            'topic_name': t.topic_name,
-            'subject': t.subject,
-            'exam_type': t.exam_type,
-            'fti_score': round(t.fti_score, 2),
-            'fti_category': t.fti_category,
-            'complexity': round(t.topic_complexity, 2),
-            'length': round(t.topic_length, 2),
-            'exam_frequency': round(t.exam_frequency, 2),
-            'past_failures': t.past_failures,
-            'days_since_revised': (datetime.utcnow() - t.last_revised).days,
-            'created_at': t.created_at.strftime('%Y-%m-%d')
+            'id': t['id'],
+            'topic_name': t['topic_name'],
+            'subject': t['subject'],
+            'exam_type': t['exam_type'],
+            'fti_score': round(t['fti_score'], 2),
+            'fti_category': t['fti_category'],
+            'complexity': round(t['topic_complexity'], 2),
+            'length': round(t['topic_length'], 2),
+            'exam_frequency': round(t['exam_frequency'], 2),
+            'past_failures': t['past_failures'],
+            'days_since_revised': (now - t['last_revised']).days,
+            'created_at': t['created_at'].strftime('%Y-%m-%d')
         } for t in sorted_topics]
         
         # Count by category
-        high_count = sum(1 for t in sorted_topics if t.fti_category == 'high')
-        moderate_count = sum(1 for t in sorted_topics if t.fti_category == 'moderate')
-        safe_count = sum(1 for t in sorted_topics if t.fti_category == 'safe')
+        high_count = sum(1 for t in sorted_topics if t['fti_category'] == 'high')
+        moderate_count = sum(1 for t in sorted_topics if t['fti_category'] == 'moderate')
+        safe_count = sum(1 for t in sorted_topics if t['fti_category'] == 'safe')
         
         return jsonify({
             'success': True,
@@ -945,13 +3722,531 @@ def api_get_forgettable_topics():
         return jsonify({'success': False, 'error': str(e)}), 400
 
 
+@app.route('/api/review-queue', methods=['GET'])
+@login_required
+def api_review_queue():
+    """API: The user's topics due for review, most overdue first (?limit=N, ?within_days=D)"""
+    try:
+        now = datetime.utcnow()
+        limit = max(1, min(request.args.get('limit', 20, type=int), MAX_PAGE_SIZE))
+        within_days = max(0.0, request.args.get('within_days', 0.0, type=float))
+        
+        rows = db.session.execute(
+            review_queue_statement(request_user().id, now + timedelta(days=within_days), limit)
+        ).mappings().all()
+        
+        items = []
+        for t in rows:
+            days_since = (now - t['last_revised']).total_seconds() / 86400
+            items.append({
+                'topic_id': t['id'],
+                'subject': t['subject'],
+                'topic_name': t['topic_name'],
+                'exam_type': t['exam_type'],
+                'strength': round(t['strength'], 2),
+                'fti_score': t['fti_score'],
+                'fti_category': t['fti_category'],
+                'next_review_at': t['next_review_at'].isoformat(),
+                'overdue_hours': round((now - t['next_review_at']).total_seconds() / 3600, 1),
+                'retention': round(calculate_ebbinghaus_forgetting_curve(days_since, t['strength']), 2)
+            })
+        
+        return jsonify({'success': True, 'items': items, 'count': len(items), 'as_of': now.isoformat()}), 200
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@login_required
+def api_get_job(job_id):
+    """API: Status, progress and result of a background job"""
+    job = db.session.get(Job, job_id)
+    if not job or job.user_id != request_user().id:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job_to_dict(job)}), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Request, SQL, function and cache metrics in Prometheus text format"""
+    if not metrics.enabled:
+        return 'Metrics are disabled (set METRICS_ENABLED=1)\n', 404, {'Content-Type': 'text/plain'}
+    token = app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return 'Unauthorized\n', 401, {'Content-Type': 'text/plain', 'WWW-Authenticate': 'Bearer'}
+    return metrics.render() + cache_metrics_text(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
+
 # ==================== DATABASE INITIALIZATION ====================
 
+# Indexes and columns removed from the models, dropped from existing databases
+RETIRED_INDEXES = {'pdf_extracted_content': ['ix_pdf_extracted_content_upload_chunk']}
+RETIRED_COLUMNS = {'pdf_extracted_content': ['upload_id', 'chunk_index', 'page_start', 'page_end']}
+
+
+def upgrade_database_schema():
+    """
+    Bring an existing database up to date with the models
+    
+    db.create_all() only creates missing tables, so columns added to existing
+    models are applied here with ALTER TABLE ... ADD COLUMN, and indexes
+    declared on existing models are created if missing. Indexes and columns
+    listed in RETIRED_INDEXES / RETIRED_COLUMNS are dropped.
+    
+    Returns:
+        List of 'table.column' and index names that were added or dropped
+    """
+    inspector = inspect(db.engine)
+    dialect = db.engine.dialect
+    preparer = dialect.identifier_preparer
+    changes = []
+    
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for name in RETIRED_INDEXES.get(table.name, []):
+                if name in existing_indexes:
+                    conn.exec_driver_sql(f'DROP INDEX {preparer.quote(name)}')
+                    changes.append(name)
+            
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for name in RETIRED_COLUMNS.get(table.name, []):
+                if name in existing:
+                    conn.exec_driver_sql(f'ALTER TABLE {preparer.format_table(table)} DROP COLUMN {preparer.quote(name)}')
+                    changes.append(f'{table.name}.{name}')
+            
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = (f'ALTER TABLE {preparer.format_table(table)} '
+                       f'ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=dialect)}')
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+                    ddl += f' DEFAULT {default}'
+                conn.exec_driver_sql(ddl)
+                changes.append(f'{table.name}.{column.name}')
+            
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(bind=conn)
+                    changes.append(index.name)
+    
+    return changes
+
+
+def hot_query_plans(user_id=1, topic_id=1):
+    """
+    Run EXPLAIN QUERY PLAN (SQLite) over the queries read endpoints run
+    
+    Paginated queries are planned as fetch_page() issues them, for a first
+    page of DEFAULT_PAGE_SIZE rows.
+    
+    Returns:
+        List of (name, [plan detail lines]) tuples
+    """
+    now = datetime.utcnow()
+    page = DEFAULT_PAGE_SIZE + 1
+    topics_statement = select(
+        Topic.id, Topic.subject, Topic.topic_name, Topic.exam_type, Topic.strength, Topic.created_at
+    ).where(Topic.user_id == user_id)
+    questions_statement = select(
+        GeneratedQuestion.id, GeneratedQuestion.question, GeneratedQuestion.answer,
+        GeneratedQuestion.question_type, GeneratedQuestion.difficulty, GeneratedQuestion.due_at
+    ).where(GeneratedQuestion.topic_id == topic_id)
+    
+    hot_queries = [
+        ('topics page by user', keyset_query(topics_statement, Topic.id, limit=page)),
+        ('report page by user', keyset_query(*report_rows_statement(user_id), limit=page)),
+        ('review queue by user', review_queue_statement(user_id, now, 20)),
+        ('question lookup by topic', db.session.query(GeneratedQuestion.id).filter_by(topic_id=topic_id).limit(1)),
+        ('questions page by topic', keyset_query(questions_statement, GeneratedQuestion.id, limit=page)),
+        ('due questions by topic', keyset_query(due_questions_statement(topic_id, now),
+                                                (GeneratedQuestion.due_at, GeneratedQuestion.id),
+                                                (now, 0), page)),
+        ('predictions by topic', ForgettingPrediction.query.filter_by(topic_id=topic_id)
+            .order_by(ForgettingPrediction.days_ahead)),
+    ]
+    
+    plans = []
+    for name, query in hot_queries:
+        statement = getattr(query, 'statement', query)  # Query or Select
+        statement = statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+        rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {statement}')).all()
+        plans.append((name, [row[-1] for row in rows]))
+    return plans
+
+
+def is_full_table_scan(detail):
+    """
+    True for a query plan step that reads a whole table without an index
+    
+    Scans of a subquery's result (the report's window totals) only read the
+    rows that subquery already found through an index, so they do not count.
+    """
+    words = detail.split()
+    return len(words) > 1 and words[0] == 'SCAN' and 'INDEX' not in detail and words[1] in db.metadata.tables
+
+
+class QueryCounter:
+    """
+    Count the SQL statements executed on an engine
+    
+    Usage:
+        with QueryCounter() as counter:
+            client.get('/api/topics')
+        print(counter.count, counter.statements)
+    """
+    
+    def __init__(self, engine=None):
+        self.engine = engine or db.engine
+        self.statements = []
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+    
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+    
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+# Statement budgets for read endpoints ({topic_id} is one of the user's topics).
+# Each budget is independent of how many topics/questions the user has, so an
+# N+1 lazy load shows up as soon as the user has more than a handful of rows.
+QUERY_BUDGETS = [
+    ('/dashboard', 2),
+    ('/forgetting-curve/{topic_id}', 2),
+    ('/stress-test/{topic_id}', 2),
+    ('/api/topics', 2),
+    ('/api/forgettable-topics', 2),
+    ('/api/report', 2),
+    ('/api/generate-questions/{topic_id}', 4),
+    ('/api/forgetting-curve/{topic_id}', 2),
+    ('/api/forgetting-predictions/{topic_id}', 3),
+    ('/api/review-queue', 2),
+]
+
+
+def endpoint_query_counts(user_id):
+    """
+    Request each QUERY_BUDGETS endpoint as the given user and count its SQL statements
+    
+    Returns:
+        List of (path, status code, [SQL statements], budget) tuples
+    """
+    topic_id = db.session.query(Topic.id).filter_by(user_id=user_id).order_by(Topic.id).limit(1).scalar()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    report_cache.clear()
+    dashboard_snapshots.clear()
+    
+    counts = []
+    for path, budget in QUERY_BUDGETS:
+        if '{topic_id}' in path and topic_id is None:
+            continue
+        path = path.format(topic_id=topic_id)
+        # A fresh app context per request, so nothing (g, the session's
+        # identity map) carries over from the caller or the previous request;
+        # the user cache is emptied so every count includes the auth lookup
+        user_cache.clear()
+        with app.app_context(), QueryCounter() as counter:
+            response = client.get(path)
+            response.get_data()  # Drain streamed responses inside the counter
+        counts.append((path, response.status_code, counter.statements, budget))
+    return counts
+
+
+def rebuild_recall_aggregates(user_id=None):
+    """
+    Rebuild the stored per-topic recall aggregates from RecallHistory
+    
+    Args:
+        user_id: Only rebuild this user's topics (default: all topics)
+    
+    Returns:
+        Number of topics rebuilt
+    """
+    stress_counts = get_stress_recall_counts(user_id=user_id)
+    query = db.session.query(Topic.id)
+    if user_id is not None:
+        query = query.filter(Topic.user_id == user_id)
+    
+    updates = []
+    for (topic_id,) in query:
+        high_correct, high_total, low_correct, low_total = stress_counts.get(topic_id, (0, 0, 0, 0))
+        updates.append({
+            'id': topic_id,
+            'high_stress_correct': high_correct,
+            'high_stress_total': high_total,
+            'low_stress_correct': low_correct,
+            'low_stress_total': low_total,
+            'total_correct': high_correct + low_correct,
+            'total_attempts': high_total + low_total
+        })
+    
+    if updates:
+        db.session.execute(update(Topic), updates)
+        db.session.commit()
+        user_data_changed(user_id, 'rebuild-aggregates')
+    
+    return len(updates)
+
+
+def rebuild_review_schedule(user_id=None):
+    """
+    Recompute every topic's next_review_at, e.g. after changing REVIEW_RETENTION_TARGET
+    
+    Args:
+        user_id: Only reschedule this user's topics (default: all topics)
+    
+    Returns:
+        Number of topics rescheduled
+    """
+    query = db.session.query(Topic.id, Topic.last_revised, Topic.strength)
+    if user_id is not None:
+        query = query.filter(Topic.user_id == user_id)
+    
+    now = datetime.utcnow()
+    updates = [{'id': topic_id, 'next_review_at': next_review_time(last_revised or now, strength or 1.0)}
+               for topic_id, last_revised, strength in query]
+    
+    if updates:
+        db.session.execute(update(Topic), updates)
+        db.session.commit()
+    
+    return len(updates)
+
+
+def rebuild_question_schedule(user_id=None, batch_size=1000):
+    """
+    Recompute every question's memory state by replaying its recall history
+    
+    Args:
+        user_id: Only rebuild questions in this user's topics (default: all questions)
+        batch_size: Questions updated per statement
+    
+    Returns:
+        Number of questions rescheduled
+    """
+    questions = db.session.query(GeneratedQuestion.id, GeneratedQuestion.difficulty, GeneratedQuestion.created_at)
+    recalls = db.session.query(RecallHistory.question_id, RecallHistory.is_correct, RecallHistory.attempted_at)
+    if user_id is not None:
+        questions = questions.join(Topic).filter(Topic.user_id == user_id)
+        recalls = recalls.filter(RecallHistory.user_id == user_id)
+    
+    # Never-recalled questions are due from when they were created
+    states = {question_id: {'difficulty': difficulty, 'stability': None, 'recall_difficulty': None,
+                            'last_reviewed_at': None, 'due_at': created_at or datetime.utcnow()}
+              for question_id, difficulty, created_at in questions}
+    
+    for question_id, is_correct, attempted_at in iter(recalls.order_by(
+            RecallHistory.question_id, RecallHistory.attempted_at, RecallHistory.id).yield_per(batch_size)):
+        state = states.get(question_id)
+        if state is not None:
+            state.update(review_question(state, is_correct, attempted_at))
+    
+    updates = [{'id': question_id, 'stability': state['stability'], 'recall_difficulty': state['recall_difficulty'],
+                'last_reviewed_at': state['last_reviewed_at'], 'due_at': state['due_at']}
+               for question_id, state in states.items()]
+    for start in range(0, len(updates), batch_size):
+        db.session.execute(update(GeneratedQuestion), updates[start:start + batch_size])
+    db.session.commit()
+    
+    return len(updates)
+
+
+def backfill_answer_tokens(retokenize=False, batch_size=1000):
+    """
+    Store grading terms for questions created before answer_tokens existed
+    
+    Args:
+        retokenize: Recompute every question (e.g. after changing the stemmer or stop-words)
+        batch_size: Questions updated per statement
+    
+    Returns:
+        Number of questions updated
+    """
+    query = db.session.query(GeneratedQuestion.id, GeneratedQuestion.answer)
+    if not retokenize:
+        query = query.filter(GeneratedQuestion.answer_tokens.is_(None))
+    
+    updates = [{'id': question_id, 'answer_tokens': answer_token_string(answer)} for question_id, answer in query]
+    for start in range(0, len(updates), batch_size):
+        db.session.execute(update(GeneratedQuestion), updates[start:start + batch_size])
+    db.session.commit()
+    return len(updates)
+
+
+def regrade_recall_history(user_id=None, batch_size=1000):
+    """
+    Re-grade recorded answers with grade_many() and fix up is_correct
+    
+    Topic recall aggregates are rebuilt afterwards; topic strength is left
+    as-is since it was folded in at answer time.
+    
+    Args:
+        user_id: Only re-grade this user's answers (default: all users)
+        batch_size: Answers graded per batch
+    
+    Returns:
+        (answers checked, answers whose grade changed)
+    """
+    query = db.session.query(
+        RecallHistory.id, RecallHistory.user_answer, RecallHistory.is_correct,
+        GeneratedQuestion.answer, GeneratedQuestion.answer_tokens
+    ).join(GeneratedQuestion, RecallHistory.question_id == GeneratedQuestion.id).order_by(RecallHistory.id)
+    if user_id is not None:
+        query = query.filter(RecallHistory.user_id == user_id)
+    
+    checked = 0
+    changes = []
+    rows = iter(query.yield_per(batch_size))
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        grades = grade_many((row.user_answer or '', reference_tokens(row.answer, row.answer_tokens)) for row in batch)
+        changes.extend({'id': row.id, 'is_correct': is_correct}
+                       for row, (is_correct, _) in zip(batch, grades) if is_correct != row.is_correct)
+        checked += len(batch)
+    
+    for start in range(0, len(changes), batch_size):
+        db.session.execute(update(RecallHistory), changes[start:start + batch_size])
+    db.session.commit()
+    
+    if changes:
+        rebuild_recall_aggregates(user_id)  # Also invalidates cached reports and dashboards
+    return checked, len(changes)
+
+
+@app.cli.command('refresh-fti')
+@click.option('--batch-size', type=int, default=None, help='Users per batch.')
+@click.option('--workers', type=int, default=None, help='Maximum batches processed concurrently.')
+@click.option('--restart', is_flag=True, help='Discard an unfinished sweep and start over.')
+def refresh_fti_command(batch_size, workers, restart):
+    """Refresh stale FTI scores and forgetting predictions for all users."""
+    processed = run_refresh_sweep(batch_size or app.config['FTI_REFRESH_BATCH_SIZE'],
+                                  workers or app.config['FTI_REFRESH_WORKERS'], restart)
+    click.echo(f'Refreshed FTI and forgetting predictions for {processed} users')
+
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if a hot query falls back to a full table scan (SQLite)."""
+    full_scans = 0
+    for name, details in hot_query_plans():
+        click.echo(name)
+        for detail in details:
+            is_full_scan = is_full_table_scan(detail)
+            full_scans += is_full_scan
+            click.echo(f'  {"!!" if is_full_scan else "  "} {detail}')
+    if full_scans:
+        raise click.ClickException(f'{full_scans} full table scan(s) in hot queries')
+    click.echo('All hot queries use indexes')
+
+
+@app.cli.command('check-query-counts')
+@click.option('--user-id', type=int, default=None, help='User to request pages as (default: demo_user).')
+@click.option('--verbose', is_flag=True, help='Print every statement executed.')
+def check_query_counts_command(user_id, verbose):
+    """Fail if a read endpoint runs more SQL statements than its budget."""
+    if user_id is None:
+        user_id = db.session.query(User.id).filter_by(username='demo_user').scalar()
+    if user_id is None:
+        raise click.ClickException('No user to check with; pass --user-id')
+    
+    over_budget = 0
+    for path, status, statements, budget in endpoint_query_counts(user_id):
+        is_over = len(statements) > budget or status >= 400
+        over_budget += is_over
+        click.echo(f'{"!!" if is_over else "  "} {len(statements):3d}/{budget:<3d} {status} {path}')
+        if verbose:
+            for statement in statements:
+                click.echo('        ' + ' '.join(statement.split()))
+    if over_budget:
+        raise click.ClickException(f'{over_budget} endpoint(s) over their query budget or failing')
+    click.echo('All endpoints within their query budgets')
+
+
+@app.cli.command('run-jobs')
+@click.option('--once', is_flag=True, help='Run queued jobs until the queue is empty, then exit.')
+@click.option('--workers', type=int, default=None, help='Worker threads (default: JOB_WORKERS).')
+def run_jobs_command(once, workers):
+    """Run background jobs in this process (e.g. as a dedicated worker)."""
+    if once:
+        click.echo(f'Ran {drain_jobs()} jobs')
+        return
+    pool = JobWorkerPool(workers or max(1, app.config['JOB_WORKERS']), app.config['JOB_POLL_INTERVAL'])
+    pool.start()
+    click.echo(f'Running jobs with {pool.workers} workers (Ctrl+C to stop)')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+@app.cli.command('gc-content')
+def gc_content_command():
+    """Recount shared content references and delete unreferenced content."""
+    recounted, deleted = collect_content_blobs()
+    click.echo(f'Corrected {recounted} reference counts; deleted {deleted} unreferenced content blobs')
+
+
+@app.cli.command('rebuild-aggregates')
+@click.option('--user-id', type=int, default=None, help='Only rebuild topics owned by this user.')
+def rebuild_aggregates_command(user_id):
+    """Rebuild per-topic recall aggregates from recall history."""
+    count = rebuild_recall_aggregates(user_id)
+    click.echo(f'Rebuilt recall aggregates for {count} topics')
+
+
+@app.cli.command('rebuild-review-queue')
+@click.option('--user-id', type=int, default=None, help='Only reschedule topics owned by this user.')
+def rebuild_review_queue_command(user_id):
+    """Recompute topic review times and replay per-question memory state."""
+    count = rebuild_review_schedule(user_id)
+    questions = rebuild_question_schedule(user_id)
+    click.echo(f'Rescheduled {count} topics and {questions} questions')
+
+
+@app.cli.command('regrade-answers')
+@click.option('--user-id', type=int, default=None, help='Only re-grade answers from this user.')
+@click.option('--retokenize', is_flag=True, help='Recompute grading terms for every question first.')
+def regrade_answers_command(user_id, retokenize):
+    """Re-grade recorded answers with the current grading rules."""
+    tokenized = backfill_answer_tokens(retokenize)
+    checked, changed = regrade_recall_history(user_id)
+    click.echo(f'Tokenized {tokenized} questions; re-graded {checked} answers, {changed} changed')
+
+
 def init_database():
     """Initialize database with sample data"""
     with app.app_context():
         db.create_all()
         
+        # Existing databases predate the recall aggregate and grading columns
+        added = upgrade_database_schema()
+        if 'topic.total_attempts' in added:
+            rebuild_recall_aggregates()
+        if 'generated_question.answer_tokens' in added:
+            backfill_answer_tokens()
+        if 'topic.next_review_at' in added:
+            rebuild_review_schedule()
+        if 'generated_question.due_at' in added:
+            rebuild_question_schedule()
+        
         # Check if sample data exists
         user = User.query.filter_by(username='demo_user').first()
         if not user:
@@ -995,6 +4290,7 @@ def init_database():
                 }
             ]
             
+            topics = []
             for topic_data in sample_topics:
                 topic = Topic(
                     user_id=user.id,
@@ -1011,25 +4307,14 @@ def init_database():
                 db.session.add(topic)
                 db.session.commit()
                 
-                # Calculate and store FTI
-                fti_score, fti_category = calculate_forgettable_topic_index(topic)
-                topic.fti_score = fti_score
-                topic.fti_category = fti_category
-                db.session.commit()
-                
-                # Generate sample questions
-                questions = generate_questions_for_topic(topic.topic_name, topic.exam_type, count=8)
-                for q in questions:
-                    generated_q = GeneratedQuestion(
-                        topic_id=topic.id,
-                        question=q['question'],
-                        answer=q['answer'],
-                        question_type=q['type'],
-                        difficulty=q['difficulty']
-                    )
-                    db.session.add(generated_q)
-                
-                db.session.commit()
+                # Calculate and store FTI and the first review time
+                schedule_topic_review(topic)
+                update_topic_fti(topic)
+                topics.append(topic)
+            
+            # Generate sample questions for all topics in one bulk insert
+            generate_questions_for_topics(topics, count=8)
+            db.session.commit()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,95 @@
+"""
+Session user loading benchmark
+Times authenticated requests with load_user() served from the identity
+cache and with the cache emptied before every request (the old per-request
+User query), and reports the latency and SQL statements saved per request.
+
+Usage:
+    python benchmarks/bench_auth.py [--requests 2000] [--warmup 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def percentile(sorted_values, pct):
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def time_requests(app, call, count, before=None):
+    """Run call() count times; returns (sorted timings in s, SQL statements per request)"""
+    from app import QueryCounter
+
+    timings = []
+    statements = 0
+    for _ in range(count):
+        if before:
+            before()
+        with app.app_context(), QueryCounter() as counter:
+            start = time.perf_counter()
+            response = call()
+            response.get_data()
+            timings.append(time.perf_counter() - start)
+        assert response.status_code < 500, response.get_data(as_text=True)
+        statements += counter.count
+    return sorted(timings), statements / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Timed requests per endpoint and mode')
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app binds its engine at import, so point it at the scratch database first
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        os.environ['FTI_REFRESH_INTERVAL'] = '0'
+        from app import GeneratedQuestion, app, db, user_cache
+        from synthetic_data import generate
+
+        with app.app_context():
+            db.create_all()
+            generate(users=1, topics_per_user=5, recalls_per_topic=5, questions_per_topic=5)
+            question = db.session.query(GeneratedQuestion.id, GeneratedQuestion.answer).first()
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = '1'
+            sess['_fresh'] = True
+
+        endpoints = [
+            ('GET /api/jobs/<missing>', lambda: client.get('/api/jobs/missing')),
+            ('POST /api/stress-test', lambda: client.post('/api/stress-test', json={
+                'question_id': question.id, 'user_answer': question.answer, 'response_time': 3.0,
+                'stress_level': 40, 'confidence': 80})),
+        ]
+
+        print(f'{args.requests} requests per endpoint and mode')
+        for name, call in endpoints:
+            results = {}
+            for mode, before in [('uncached', user_cache.clear), ('cached', None)]:
+                time_requests(app, call, args.warmup, before)
+                results[mode] = time_requests(app, call, args.requests, before)
+            for mode, (timings, statements) in results.items():
+                print(f'  {name:<26} {mode:<9} p50 {percentile(timings, 50) * 1000:7.3f}  '
+                      f'p95 {percentile(timings, 95) * 1000:7.3f} ms  {statements:4.1f} SQL/request')
+            saved = (sum(results['uncached'][0]) - sum(results['cached'][0])) / args.requests
+            print(f'  {name:<26} saved     {saved * 1000:7.3f} ms and '
+                  f'{results["uncached"][1] - results["cached"][1]:.1f} SQL statements per request')
+        print(f'  user cache: {user_cache.stats()}')
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Endpoint latency benchmark
+Generates N users x M topics x K recalls in a scratch database, drives the
+Flask test client against the hot endpoints as randomly chosen users, and
+reports p50/p95/p99 latency and throughput per endpoint. Results are saved
+as JSON; pass a previous results file with --compare to flag regressions.
+
+Usage:
+    python benchmarks/bench_endpoints.py [--users 20] [--topics 50] [--recalls 20]
+                                         [--requests 200] [--output results.json]
+                                         [--compare previous.json] [--threshold 10]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+ENDPOINTS = ['/dashboard', '/api/forgettable-topics', '/api/report', '/api/review-queue', '/api/forgetting-curve/<id>',
+             '/api/stress-test']
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(timings):
+    """Latency percentiles (ms) and throughput for one endpoint's request timings (s)"""
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        'requests': len(ordered),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'mean_ms': round(total / len(ordered) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'throughput_rps': round(len(ordered) / total, 1) if total else 0.0
+    }
+
+
+class BenchClient:
+    """Per-user logged-in test clients and the ids their requests pick from"""
+
+    def __init__(self, app, db, Topic, GeneratedQuestion, user_ids, rng):
+        self.app = app
+        self.rng = rng
+        self.user_ids = user_ids
+        self.clients = {}
+        self.topic_ids = {}
+        self.questions = {}
+        with app.app_context():
+            for user_id, topic_id in db.session.query(Topic.user_id, Topic.id):
+                self.topic_ids.setdefault(user_id, []).append(topic_id)
+            for user_id, question_id, answer in db.session.query(
+                    Topic.user_id, GeneratedQuestion.id, GeneratedQuestion.answer).join(Topic):
+                self.questions.setdefault(user_id, []).append((question_id, answer))
+
+    def client_for(self, user_id):
+        client = self.clients.get(user_id)
+        if client is None:
+            client = self.clients[user_id] = self.app.test_client()
+            with client.session_transaction() as sess:
+                sess['_user_id'] = str(user_id)
+                sess['_fresh'] = True
+        return client
+
+    def request(self, endpoint):
+        """Issue one request to endpoint as a random user; returns (status, seconds)"""
+        user_id = self.rng.choice(self.user_ids)
+        client = self.client_for(user_id)
+        if endpoint == '/api/forgetting-curve/<id>':
+            call = lambda: client.get(f'/api/forgetting-curve/{self.rng.choice(self.topic_ids[user_id])}')
+        elif endpoint == '/api/stress-test':
+            question_id, answer = self.rng.choice(self.questions[user_id])
+            payload = {'question_id': question_id,
+                       'user_answer': answer if self.rng.random() < 0.7 else 'not sure',
+                       'response_time': round(self.rng.uniform(1, 30), 1),
+                       'stress_level': self.rng.randint(0, 100),
+                       'confidence': self.rng.randint(0, 100)}
+            call = lambda: client.post('/api/stress-test', json=payload)
+        else:
+            call = lambda: client.get(endpoint)
+
+        start = time.perf_counter()
+        response = call()
+        response.get_data()  # Include streamed bodies in the timing
+        return response.status_code, time.perf_counter() - start
+
+
+def compare(results, baseline, threshold):
+    """Print p95 changes against a baseline run; returns the endpoints that regressed"""
+    regressions = []
+    print(f'\nCompared with {baseline["timestamp"]} (p95, regression threshold {threshold}%)')
+    for endpoint, stats in results['endpoints'].items():
+        before = baseline['endpoints'].get(endpoint)
+        if not before:
+            continue
+        change = (stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        flag = '!!' if change > threshold else '  '
+        if change > threshold:
+            regressions.append(endpoint)
+        print(f'  {flag} {endpoint:<28} {before["p95_ms"]:9.2f} -> {stats["p95_ms"]:9.2f} ms  {change:+7.1f}%')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--topics', type=int, default=50, help='Topics per user')
+    parser.add_argument('--recalls', type=int, default=20, help='Recall attempts per topic')
+    parser.add_argument('--questions', type=int, default=5, help='Questions per topic')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per endpoint')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help='Results JSON path (default: benchmarks/results/, which git ignores)')
+    parser.add_argument('--compare', default=None, help='Previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='p95 increase (%%) that counts as a regression')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app binds its engine at import, so point it at the scratch database first
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(tmp, "bench.db")}'
+        os.environ['FTI_REFRESH_INTERVAL'] = '0'
+        from app import GeneratedQuestion, Topic, User, app, db
+        from synthetic_data import generate
+
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            counts = generate(args.users, args.topics, args.recalls, args.questions, args.seed)
+            print(f'Generated {counts} in {time.perf_counter() - start:.1f}s')
+            user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+
+        bench = BenchClient(app, db, Topic, GeneratedQuestion, user_ids, random.Random(args.seed))
+        results = {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'params': vars(args),
+            'environment': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                            'platform': platform.platform()},
+            'data': counts,
+            'endpoints': {}
+        }
+
+        print(f'{args.requests} requests per endpoint as {len(user_ids)} users')
+        # Reads first; stress-test submissions change the data the reads see
+        for endpoint in ENDPOINTS:
+            for _ in range(args.warmup):
+                bench.request(endpoint)
+            timings = []
+            errors = 0
+            for _ in range(args.requests):
+                status, elapsed = bench.request(endpoint)
+                timings.append(elapsed)
+                errors += status >= 400
+            stats = dict(summarize(timings), errors=errors)
+            results['endpoints'][endpoint] = stats
+            print(f'  {endpoint:<28} p50 {stats["p50_ms"]:8.2f}  p95 {stats["p95_ms"]:8.2f}  '
+                  f'p99 {stats["p99_ms"]:8.2f} ms  {stats["throughput_rps"]:8.1f} req/s'
+                  + (f'  ({errors} errors)' if errors else ''))
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results', f'endpoints-{datetime.utcnow().strftime("%Y%m%dT%H%M%S")}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Saved results to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f'p95 regressed for: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
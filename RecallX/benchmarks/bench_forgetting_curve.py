@@ -0,0 +1,67 @@
+"""
+Forgetting-curve throughput benchmark
+Compares the scalar calculate_ebbinghaus_forgetting_curve() loop with the
+NumPy path of batch_forgetting_curve(). Without NumPy the batch API falls
+back to the scalar loop, so there is no speed-up to measure.
+
+Usage:
+    python benchmarks/bench_forgetting_curve.py [--topics 10000] [--days 31] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import batch_forgetting_curve, calculate_ebbinghaus_forgetting_curve, np
+
+
+def scalar_loop(days_since, strengths, horizons):
+    """Baseline: one scalar call per topic and day"""
+    return [[calculate_ebbinghaus_forgetting_curve(d + h, s) for h in horizons]
+            for d, s in zip(days_since, strengths)]
+
+
+def best_time(func, repeat):
+    """Best wall-clock time of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--topics', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    days_since = [rng.randint(0, 60) for _ in range(args.topics)]
+    strengths = [rng.uniform(0.5, 5.0) for _ in range(args.topics)]
+    horizons = list(range(args.days))
+    cells = args.topics * args.days
+
+    cases = [('scalar loop', lambda: scalar_loop(days_since, strengths, horizons))]
+    if np is not None:
+        cases.append(('batch (NumPy)', lambda: batch_forgetting_curve(days_since, strengths, horizons, use_numpy=True)))
+    else:
+        print('NumPy not installed: batch_forgetting_curve() runs the scalar loop, so there is no gain')
+
+    print(f'{args.topics} topics x {args.days} days = {cells} retention values (best of {args.repeat})')
+    baseline = None
+    for name, func in cases:
+        elapsed = best_time(func, args.repeat)
+        baseline = baseline or elapsed
+        print(f'  {name:<22} {elapsed * 1000:9.1f} ms  {cells / elapsed / 1e6:8.2f} M values/s  '
+              f'{baseline / elapsed:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
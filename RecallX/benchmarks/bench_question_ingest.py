@@ -0,0 +1,91 @@
+"""
+Question ingest benchmark
+Imports N generated questions into a scratch SQLite database, once with the
+per-object session.add() loop and once with bulk_insert_questions().
+
+Usage:
+    python benchmarks/bench_question_ingest.py [--questions 10000] [--topics 100]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from app import GeneratedQuestion, Topic, User, bulk_insert_questions, db, generate_questions_for_topic
+
+
+def make_scratch_app(path):
+    """A bare Flask app bound to a scratch database, sharing the RecallX models"""
+    scratch_app = Flask(__name__)
+    scratch_app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(scratch_app)
+    return scratch_app
+
+
+def seed_topics(count):
+    user = User(username='bench_user', email='bench@recallx.app', password_hash='-')
+    db.session.add(user)
+    db.session.flush()
+    topics = [Topic(user_id=user.id, subject='Benchmark', topic_name=f'Topic {i}', exam_type='semester')
+              for i in range(count)]
+    db.session.add_all(topics)
+    db.session.commit()
+    return [(t.id, t.topic_name, t.exam_type) for t in topics]
+
+
+def question_rows(topics, per_topic):
+    rows = []
+    for topic_id, topic_name, exam_type in topics:
+        for q in generate_questions_for_topic(topic_name, exam_type, per_topic):
+            rows.append({'topic_id': topic_id, 'question': q['question'], 'answer': q['answer'],
+                         'question_type': q['type'], 'difficulty': q['difficulty']})
+    return rows
+
+
+def orm_loop(rows):
+    """Baseline: one GeneratedQuestion object per row, then re-query for ids"""
+    for row in rows:
+        db.session.add(GeneratedQuestion(**row))
+    db.session.commit()
+    return [q.id for q in GeneratedQuestion.query.filter(GeneratedQuestion.topic_id.in_({r['topic_id'] for r in rows}))]
+
+
+def bulk_ingest(rows):
+    created = bulk_insert_questions(rows)
+    db.session.commit()
+    return [row['id'] for row in created]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=10000)
+    parser.add_argument('--topics', type=int, default=100)
+    args = parser.parse_args()
+    per_topic = max(1, args.questions // args.topics)
+
+    print(f'Importing {per_topic * args.topics} questions across {args.topics} topics')
+    for name, ingest in [('session.add() loop', orm_loop), ('bulk insert', bulk_ingest)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            scratch_app = make_scratch_app(os.path.join(tmp, 'bench.db'))
+            with scratch_app.app_context():
+                db.create_all()
+                rows = question_rows(seed_topics(args.topics), per_topic)
+
+                start = time.perf_counter()
+                ids = ingest(rows)
+                elapsed = time.perf_counter() - start
+
+                assert len(ids) == len(rows)
+                print(f'  {name:<20} {elapsed * 1000:9.1f} ms  {len(rows) / elapsed:10.0f} rows/s')
+                db.session.remove()
+                db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Search provider benchmark
+Builds a synthetic corpus of N documents and times queries against a
+keyword scan of every document (the old mock search), the inverted index,
+and the cached index. A slow backend is simulated with --provider-latency
+to show what the cache saves on repeated queries.
+
+Usage:
+    python benchmarks/bench_search.py [--documents 5000] [--queries 2000]
+                                      [--distinct 200] [--provider-latency 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('FTI_REFRESH_INTERVAL', '0')
+
+from app import CachedSearchProvider, InvertedIndexSearchProvider, SearchProvider
+
+VOCABULARY = ['array', 'tree', 'graph', 'hash', 'heap', 'queue', 'stack', 'sort', 'search', 'network',
+              'neural', 'gradient', 'regression', 'cluster', 'database', 'index', 'query', 'transaction',
+              'cache', 'thread', 'process', 'memory', 'kernel', 'socket', 'protocol', 'router', 'compiler',
+              'parser', 'token', 'grammar', 'matrix', 'vector', 'probability', 'entropy', 'signal', 'filter']
+VOCABULARY += [f'term{i}' for i in range(20000)]
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]  # Zipf-like, as in real text
+
+
+def make_documents(count, rng):
+    documents = []
+    for i in range(count):
+        title_words = rng.sample(VOCABULARY[:2000], 2)
+        body = ' '.join(rng.choices(VOCABULARY, WORD_WEIGHTS, k=rng.randint(20, 80)))
+        documents.append({'title': ' '.join(word.title() for word in title_words) + f' {i}',
+                          'content': body, 'url': f'https://example.com/doc-{i}'})
+    return documents
+
+
+class ScanSearchProvider(SearchProvider):
+    """Baseline: substring test of every title word against the query, as the old mock did"""
+
+    name = 'scan'
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def search(self, query, limit=10):
+        found = [{'title': d['title'], 'snippet': d['content'][:300], 'url': d['url']}
+                 for d in self.documents
+                 if any(word.lower() in query.lower() for word in d['title'].split())]
+        return found[:limit]
+
+
+class SlowProvider(SearchProvider):
+    """Wraps a provider, adding a fixed delay per call to stand in for a remote API"""
+
+    def __init__(self, provider, latency):
+        self.provider = provider
+        self.latency = latency
+        self.name = provider.name
+
+    def search(self, query, limit=10):
+        time.sleep(self.latency)
+        return self.provider.search(query, limit)
+
+
+def run(provider, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        provider.search(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {'mean_ms': sum(timings) / len(timings) * 1000,
+            'p95_ms': timings[int(len(timings) * 0.95) - 1] * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=2000, help='Timed queries per provider')
+    parser.add_argument('--distinct', type=int, default=200, help='Distinct queries the timed ones are drawn from')
+    parser.add_argument('--provider-latency', type=float, default=0.0, help='Seconds added to each backend call')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    documents = make_documents(args.documents, rng)
+    start = time.perf_counter()
+    index = InvertedIndexSearchProvider(documents)
+    print(f'Indexed {args.documents} documents ({len(index.postings)} terms) in {time.perf_counter() - start:.2f}s')
+
+    distinct = [' '.join(rng.sample(VOCABULARY[:2000], rng.randint(1, 3))) for _ in range(args.distinct)]
+    queries = [rng.choice(distinct) for _ in range(args.queries)]
+
+    providers = [('keyword scan', ScanSearchProvider(documents)), ('inverted index', index)]
+    if args.provider_latency:
+        providers = [(name, SlowProvider(provider, args.provider_latency)) for name, provider in providers]
+    cached = CachedSearchProvider(providers[-1][1], maxsize=args.distinct * 2, ttl=3600)
+    providers.append(('cached index', cached))
+
+    print(f'{args.queries} queries drawn from {args.distinct} distinct')
+    for name, provider in providers:
+        stats = run(provider, queries)
+        print(f'  {name:<16} mean {stats["mean_ms"]:8.3f} ms  p95 {stats["p95_ms"]:8.3f} ms')
+    print(f'  cache hit ratio {cached.stats()["cache"]["hit_ratio"]:.2%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Synthetic data generator for benchmarks
+Bulk-creates users x topics x recalls (plus each topic's questions) in the
+database the RecallX app is bound to, then brings the stored recall
+aggregates, FTI scores and forgetting predictions up to date so the hot
+paths see realistic state.
+
+Import after DATABASE_URL points at a scratch database; see
+bench_endpoints.py.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from app import (HIGH_STRESS_THRESHOLD, RecallHistory, Topic, User, bulk_insert_questions, db,
+                 generate_questions_for_topic, rebuild_question_schedule, rebuild_recall_aggregates,
+                 rebuild_review_schedule, refresh_users)
+
+SUBJECTS = ['Data Structures', 'Algorithms', 'Machine Learning', 'Databases', 'Operating Systems',
+            'Networks', 'Web Development', 'Statistics']
+EXAM_TYPES = ['semester', 'competitive', 'interview']
+BENCH_PASSWORD = 'bench_password_123'
+INSERT_CHUNK = 5000  # rows per INSERT statement batch
+
+
+def insert_chunked(model, rows):
+    """Bulk INSERT rows in chunks, returning the new ids in row order"""
+    ids = []
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        ids.extend(db.session.scalars(statement, rows[start:start + INSERT_CHUNK]))
+    return ids
+
+
+def generate(users=20, topics_per_user=50, recalls_per_topic=20, questions_per_topic=5, seed=42, now=None):
+    """
+    Populate the database with synthetic users, topics, questions and recall history
+
+    The first user is 'demo_user', the account the app seeds for demos.
+    Every user's password is BENCH_PASSWORD.
+
+    Args:
+        users: Number of users
+        topics_per_user: Topics per user
+        recalls_per_topic: Recall attempts recorded per topic
+        questions_per_topic: Questions generated per topic
+        seed: Random seed; the same arguments and seed give the same data
+        now: Reference time for created/revised/attempted timestamps
+
+    Returns:
+        Dict of row counts per table
+    """
+    rng = random.Random(seed)
+    random.seed(seed)  # generate_questions_for_topic() draws from the global generator
+    now = now or datetime.utcnow()
+    password_hash = generate_password_hash(BENCH_PASSWORD)  # Hashing is deliberately slow; do it once
+
+    user_ids = insert_chunked(User, [{
+        'username': 'demo_user' if i == 0 else f'bench_user_{i}',
+        'email': f'bench{i}@recallx.app',
+        'password_hash': password_hash,
+        'created_at': now - timedelta(days=90)
+    } for i in range(users)])
+
+    topic_rows = []
+    for user_id in user_ids:
+        for i in range(topics_per_user):
+            created_at = now - timedelta(days=rng.randint(1, 90))
+            topic_rows.append({
+                'user_id': user_id,
+                'subject': rng.choice(SUBJECTS),
+                'topic_name': f'Topic {i}',
+                'exam_type': rng.choice(EXAM_TYPES),
+                'created_at': created_at,
+                'last_revised': created_at + timedelta(days=rng.randint(0, (now - created_at).days)),
+                'strength': round(rng.uniform(0.5, 5.0), 2),
+                'topic_complexity': round(rng.uniform(1, 10), 1),
+                'topic_length': round(rng.uniform(1, 10), 1),
+                'exam_frequency': round(rng.uniform(1, 10), 1),
+                'past_failures': rng.randint(0, 5)
+            })
+    topic_ids = insert_chunked(Topic, topic_rows)
+
+    question_rows = []
+    for topic_id, topic in zip(topic_ids, topic_rows):
+        for q in generate_questions_for_topic(topic['topic_name'], topic['exam_type'], questions_per_topic):
+            question_rows.append({'topic_id': topic_id, 'question': q['question'], 'answer': q['answer'],
+                                  'question_type': q['type'], 'difficulty': q['difficulty']})
+    questions = bulk_insert_questions(question_rows)
+
+    questions_by_topic = {}
+    for question in questions:
+        questions_by_topic.setdefault(question['topic_id'], []).append(question)
+
+    recall_rows = []
+    for topic_id, topic in zip(topic_ids, topic_rows):
+        for _ in range(recalls_per_topic):
+            question = rng.choice(questions_by_topic[topic_id])
+            stress_level = rng.randint(0, 100)
+            # Recall gets harder under stress, as in real sessions
+            is_correct = rng.random() < (0.5 if stress_level > HIGH_STRESS_THRESHOLD else 0.75)
+            recall_rows.append({
+                'user_id': topic['user_id'],
+                'question_id': question['id'],
+                'user_answer': question['answer'] if is_correct else 'not sure',
+                'is_correct': is_correct,
+                'response_time': round(rng.uniform(1, 30), 1),
+                'stress_level': stress_level,
+                'confidence': rng.randint(0, 100),
+                'attempted_at': now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+            })
+    for start in range(0, len(recall_rows), INSERT_CHUNK):
+        db.session.execute(insert(RecallHistory), recall_rows[start:start + INSERT_CHUNK])
+    db.session.commit()
+
+    rebuild_recall_aggregates()
+    rebuild_review_schedule()
+    rebuild_question_schedule()
+    refresh_users(user_ids, now)
+
+    return {'users': len(user_ids), 'topics': len(topic_ids), 'questions': len(questions),
+            'recalls': len(recall_rows)}
@@ -17,7 +17,8 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 function loadForgettingCurveData() {
-    fetch(`/api/forgetting-curve/${topicId}`)
+    // Revalidate with the server's ETag; unchanged curves come back as a 304
+    fetch(`/api/forgetting-curve/${topicId}`, { cache: 'no-cache' })
         .then(response => response.json())
         .then(data => {
             if (data.success) {
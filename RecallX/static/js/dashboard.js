@@ -9,13 +9,11 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 function loadTopics() {
-    fetch('/api/topics')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                // Dashboard already renders topics from backend
-                console.log('Topics loaded:', data.topics);
-            }
+    const topics = [];
+    streamNdjson('/api/topics?format=ndjson', topic => topics.push(topic))
+        .then(() => {
+            // Dashboard already renders topics from backend
+            console.log('Topics loaded:', topics);
         })
         .catch(error => console.error('Error loading topics:', error));
 }
@@ -0,0 +1,38 @@
+/**
+ * Background Job JavaScript
+ * Polls /api/jobs/<id> until a queued upload or search job finishes
+ */
+
+const JOB_POLL_INTERVAL = 1000;
+
+/**
+ * Poll a job until it succeeds or fails.
+ * Calls onProgress with the job's progress message while it runs;
+ * resolves with the job's result, or rejects with its error.
+ */
+function pollJob(jobId, onProgress) {
+    return new Promise((resolve, reject) => {
+        function check() {
+            fetch(`/api/jobs/${jobId}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        throw new Error(data.error || 'Failed to load job status');
+                    }
+                    const job = data.job;
+                    if (job.status === 'succeeded') {
+                        resolve(job.result);
+                    } else if (job.status === 'failed') {
+                        reject(new Error(job.error || 'Job failed'));
+                    } else {
+                        if (onProgress) {
+                            onProgress(job.progress || (job.status === 'queued' ? 'Waiting in queue...' : 'Processing...'));
+                        }
+                        setTimeout(check, JOB_POLL_INTERVAL);
+                    }
+                })
+                .catch(reject);
+        }
+        check();
+    });
+}
@@ -56,11 +56,14 @@ function handleAddTopic(e) {
     })
     .then(response => response.json())
     .then(data => {
-        if (data.success) {
-            showSuccess(`✅ Topic "${data.topic_id}" created successfully!\n\nInternet Search Results:\n${data.questions_generated} questions generated from ${data.search_results.length} sources`);
-        } else {
-            showError(data.error || 'Failed to search internet');
+        if (!data.success) {
+            throw new Error(data.error || 'Failed to search internet');
         }
+        // The search runs as a background job; poll until it finishes
+        return pollJob(data.job_id, message => showLoading(`Searching internet: ${message}`));
+    })
+    .then(result => {
+        showSuccess(`✅ Topic "${topic_name}" created successfully!\n\nInternet Search Results:\n${result.questions_generated} questions generated from ${result.search_results.length} sources`);
     })
     .catch(error => {
         console.error('Error:', error);
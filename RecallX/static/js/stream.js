@@ -0,0 +1,50 @@
+/**
+ * NDJSON Streaming JavaScript
+ * Reads newline-delimited JSON list endpoints incrementally
+ */
+
+/**
+ * Fetch an NDJSON endpoint and call onRow for each row as it arrives.
+ * Resolves once the stream is fully read.
+ */
+function streamNdjson(url, onRow) {
+    return fetch(url, { headers: { 'Accept': 'application/x-ndjson' } })
+        .then(response => {
+            if (!response.ok) {
+                return response.json().then(data => {
+                    throw new Error(data.error || `Request failed (${response.status})`);
+                });
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            function emitLines(text) {
+                text.split('\n').forEach(line => {
+                    if (line.trim()) {
+                        onRow(JSON.parse(line));
+                    }
+                });
+            }
+
+            function read() {
+                return reader.read().then(({ done, value }) => {
+                    if (done) {
+                        emitLines(buffer + decoder.decode());
+                        return;
+                    }
+                    buffer += decoder.decode(value, { stream: true });
+                    // Keep the trailing partial line for the next chunk
+                    const lastNewline = buffer.lastIndexOf('\n');
+                    if (lastNewline >= 0) {
+                        emitLines(buffer.slice(0, lastNewline));
+                        buffer = buffer.slice(lastNewline + 1);
+                    }
+                    return read();
+                });
+            }
+
+            return read();
+        });
+}
@@ -12,6 +12,14 @@ let timeRemaining = TEST_DURATION;
 let stressLevel = 30;
 const topicId = window.location.pathname.split('/').pop();
 
+// Answers are buffered and sent in batches; each carries a client id so a
+// retried flush is never counted twice by the server
+const FLUSH_SIZE = 5;
+const MAX_FLUSH_RETRIES = 3;
+let pendingAnswers = [];
+let flushInFlight = null;
+let testEnded = false;
+
 let testResults = {
     total_questions: 0,
     correct_answers: 0,
@@ -26,17 +34,26 @@ document.addEventListener('DOMContentLoaded', function() {
     startTest();
 });
 
+// Don't lose buffered answers if the page is closed mid-test
+window.addEventListener('pagehide', function() {
+    if (pendingAnswers.length > 0 && navigator.sendBeacon) {
+        const body = new Blob([JSON.stringify({ answers: pendingAnswers })], { type: 'application/json' });
+        navigator.sendBeacon('/api/stress-test/batch', body);
+    }
+});
+
 function loadQuestions() {
-    fetch(`/api/generate-questions/${topicId}`)
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                questions = data.questions;
-                testResults.total_questions = questions.length;
-                displayQuestion();
-            } else {
-                showError('Failed to load questions');
-            }
+    const loaded = [];
+    // Questions due for review come first, most overdue first; with nothing
+    // due, practise the whole topic instead
+    streamNdjson(`/api/generate-questions/${topicId}?format=ndjson`, question => loaded.push(question))
+        .then(() => loaded.length > 0 ? loaded :
+            streamNdjson(`/api/generate-questions/${topicId}?format=ndjson&all=1`, question => loaded.push(question))
+                .then(() => loaded))
+        .then(() => {
+            questions = loaded;
+            testResults.total_questions = questions.length;
+            displayQuestion();
         })
         .catch(error => {
             console.error('Error:', error);
@@ -137,59 +154,107 @@ function submitAnswer(questionId, correctAnswer) {
     
     const responseTime = (Date.now() - startTime) / 1000;
     const confidenceValue = confidence ? parseInt(confidence.dataset.confidence) : 50;
+    const clientId = newClientId();
+    
+    // Buffer the answer; it is graded when the batch is flushed
+    pendingAnswers.push({
+        client_id: clientId,
+        question_id: questionId,
+        user_answer: userAnswer,
+        response_time: responseTime,
+        stress_level: Math.round(stressLevel),
+        confidence: confidenceValue
+    });
+    
+    // Record result
+    testResults.responses.push({
+        client_id: clientId,
+        question_id: questionId,
+        is_correct: null,
+        response_time: responseTime,
+        stress_level: Math.round(stressLevel),
+        confidence: confidenceValue
+    });
     
-    // Submit to backend
-    fetch('/api/stress-test', {
+    showRecorded();
+    if (pendingAnswers.length >= FLUSH_SIZE) {
+        flushAnswers();
+    }
+    
+    // Move to next question
+    setTimeout(() => {
+        currentQuestionIndex++;
+        displayQuestion();
+    }, 500);
+}
+
+function newClientId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+function flushAnswers() {
+    // One flush at a time; answers buffered meanwhile go in the next one
+    if (flushInFlight) {
+        return flushInFlight.then(() => pendingAnswers.length > 0 ? flushAnswers() : null);
+    }
+    if (pendingAnswers.length === 0) {
+        return Promise.resolve();
+    }
+    
+    const batch = pendingAnswers.slice();
+    flushInFlight = postBatch(batch, 0)
+        .then(data => {
+            pendingAnswers = pendingAnswers.filter(answer => !batch.includes(answer));
+            applyBatchResults(data.results);
+        })
+        .catch(error => console.error('Error submitting answers:', error))
+        .finally(() => {
+            flushInFlight = null;
+        });
+    return flushInFlight;
+}
+
+function postBatch(batch, attempt) {
+    return fetch('/api/stress-test/batch', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
         },
-        body: JSON.stringify({
-            question_id: questionId,
-            user_answer: userAnswer,
-            response_time: responseTime,
-            stress_level: Math.round(stressLevel),
-            confidence: confidenceValue,
-            correct_answer: correctAnswer
-        })
+        body: JSON.stringify({ answers: batch })
     })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            // Record result
-            testResults.responses.push({
-                question_id: questionId,
-                is_correct: data.is_correct,
-                response_time: responseTime,
-                stress_level: Math.round(stressLevel),
-                confidence: confidenceValue
-            });
-            
-            if (data.is_correct) {
-                testResults.correct_answers++;
-                showCorrect();
-            } else {
-                showIncorrect(correctAnswer);
-            }
-            
-            // Move to next question after 1 second
-            setTimeout(() => {
-                currentQuestionIndex++;
-                displayQuestion();
-            }, 1000);
+    .then(response => response.json().then(data => {
+        if (!response.ok || !data.success) {
+            throw new Error(data.error || `Request failed (${response.status})`);
         }
-    })
-    .catch(error => console.error('Error submitting answer:', error));
+        return data;
+    }))
+    .catch(error => {
+        if (attempt + 1 >= MAX_FLUSH_RETRIES) {
+            throw error;
+        }
+        // Back off and resend the same answers (same client ids)
+        const delay = 500 * Math.pow(2, attempt);
+        return new Promise(resolve => setTimeout(resolve, delay))
+            .then(() => postBatch(batch, attempt + 1));
+    });
 }
 
-function showCorrect() {
-    document.querySelector('.question-display').style.background = 'rgba(16, 185, 129, 0.2)';
-    document.querySelector('.question-display').style.borderColor = '#10b981';
+function applyBatchResults(results) {
+    results.forEach(result => {
+        const response = testResults.responses.find(r => r.client_id === result.client_id);
+        if (response && typeof result.is_correct === 'boolean') {
+            response.is_correct = result.is_correct;
+        }
+    });
+    testResults.correct_answers = testResults.responses.filter(r => r.is_correct).length;
 }
 
-function showIncorrect(correctAnswer) {
-    document.querySelector('.question-display').style.background = 'rgba(239, 68, 68, 0.2)';
-    document.querySelector('.question-display').style.borderColor = '#ef4444';
+function showRecorded() {
+    document.querySelector('.question-display').style.background = 'rgba(96, 165, 250, 0.2)';
+    document.querySelector('.question-display').style.borderColor = '#60a5fa';
 }
 
 function updateStressIndicator() {
@@ -242,11 +307,17 @@ function flashWarning() {
 }
 
 function endTest() {
+    if (testEnded) {
+        return;
+    }
+    testEnded = true;
+    
     const totalTime = (Date.now() - testStartTime) / 1000;
     testResults.total_time = totalTime;
     testResults.avg_stress = Math.round(testResults.responses.reduce((a, r) => a + r.stress_level, 0) / testResults.responses.length);
     
-    displayResults();
+    // Send whatever is still buffered before showing graded results
+    flushAnswers().then(displayResults);
 }
 
 function displayResults() {
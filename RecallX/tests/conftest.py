@@ -0,0 +1,100 @@
+"""
+Shared pytest fixtures
+The app binds its engine when app.py is imported, so the scratch database
+and background-thread settings go into the environment before the import.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix='recallx-tests-')
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(TEST_DIR, "test.db")}'
+os.environ['FTI_REFRESH_INTERVAL'] = '0'  # No background sweeps
+os.environ['JOB_WORKERS'] = '0'  # Jobs run inline in the request
+os.environ['DASHBOARD_CACHE_PATH'] = ''  # Memory only
+os.environ['METRICS_ENABLED'] = '1'  # Request and SQL hooks are only installed at import
+os.environ['UPLOAD_FOLDER'] = os.path.join(TEST_DIR, 'uploads')
+os.environ['SEARCH_CORPUS_DIR'] = os.path.join(TEST_DIR, 'search_corpus')  # Missing: built-in documents
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (CACHES, GeneratedQuestion, Topic, User, app as flask_app, apply_topic_fti, db,  # noqa: E402
+                 generate_questions_for_topics, schedule_topic_review)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def scratch_directory():
+    yield TEST_DIR
+    with flask_app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def app():
+    """The app with freshly created tables and empty caches, inside an app context"""
+    flask_app.config['TESTING'] = True
+    for cache in CACHES.values():
+        cache.clear()
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='tester', email='tester@example.com')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def topics(app, user):
+    """Five of the user's topics with five questions each"""
+    topics = []
+    for i in range(5):
+        topic = Topic(user_id=user.id, subject='Computer Science', topic_name=f'Topic {i}',
+                      exam_type='interview', strength=1.0 + i / 2)
+        db.session.add(topic)
+        db.session.flush()
+        apply_topic_fti(topic)
+        schedule_topic_review(topic)
+        topics.append(topic)
+    generate_questions_for_topics(topics, count=5)
+    db.session.commit()
+    return topics
+
+
+@pytest.fixture
+def client(app, user):
+    """A test client logged in as `user`"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def recalls(client, topics):
+    """One stress-test answer per question, alternating right and wrong and high and low stress"""
+    questions = GeneratedQuestion.query.order_by(GeneratedQuestion.id).all()
+    answers = [{
+        'client_id': f'fixture-{question.id}',
+        'question_id': question.id,
+        'user_answer': question.answer if i % 2 == 0 else 'no idea',
+        'response_time': 4.0,
+        'stress_level': 80 if i % 3 == 0 else 20,
+        'confidence': 50
+    } for i, question in enumerate(questions)]
+    response = client.post('/api/stress-test/batch', json={'answers': answers})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return answers
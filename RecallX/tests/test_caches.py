@@ -0,0 +1,232 @@
+"""
+Caches: the TTLCache primitive and the views built on it
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+import app as app_module
+from app import (GeneratedQuestion, SnapshotCache, Topic, TTLCache, User, dashboard_snapshots, db, forgetting_curve_cache,
+                 load_user, refresh_users, report_cache, user_cache)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Shift time.monotonic() forward by clock['offset'] seconds"""
+    state = {'offset': 0}
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(time, 'monotonic', lambda: real_monotonic() + state['offset'])
+    return state
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache('test_lru', maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_cache_expires_entries(clock):
+    cache = TTLCache('test_ttl', ttl=60)
+    cache.set('default', 1)
+    cache.set('short', 2, ttl=5)
+    clock['offset'] = 10
+    assert cache.get('short') is None
+    assert cache.get('default') == 1
+    clock['offset'] = 61
+    assert cache.get('default') is None
+
+
+def test_ttl_cache_counts_hits_and_misses_but_not_peeks():
+    cache = TTLCache('test_stats')
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    assert cache.peek('a') == 1 and cache.peek('missing') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_ratio']) == (1, 1, 0.5)
+
+
+def test_ttl_cache_invalidation():
+    cache = TTLCache('test_invalidate')
+    for key in [(1, 'x'), (1, 'y'), (2, 'x')]:
+        cache.set(key, True)
+    assert cache.invalidate((2, 'x')) is True
+    assert cache.invalidate((2, 'x')) is False
+    assert cache.invalidate_matching(lambda key: key[0] == 1) == 2
+    assert cache.stats()['size'] == 0
+
+
+def test_forgetting_curve_is_shared_by_topics_with_one_strength(client, topics):
+    topics[1].strength = topics[0].strength
+    db.session.commit()
+    first = client.get(f'/api/forgetting-curve/{topics[0].id}').json
+    misses = forgetting_curve_cache.misses
+    second = client.get(f'/api/forgetting-curve/{topics[1].id}').json
+    assert forgetting_curve_cache.misses == misses
+    assert second['curve_data'] == first['curve_data']
+
+
+def test_forgetting_curve_revalidates_until_strength_changes(client, topics):
+    topic = topics[0]
+    url = f'/api/forgetting-curve/{topic.id}'
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    
+    question = GeneratedQuestion.query.filter_by(topic_id=topic.id).first()
+    client.post('/api/stress-test', json={'question_id': question.id, 'user_answer': question.answer,
+                                          'response_time': 3.0, 'stress_level': 20})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['topic_strength'] != first.json['topic_strength']
+
+
+def test_report_is_cached_until_recalls_change(client, topics):
+    first = client.get('/api/report').json
+    hits = report_cache.hits
+    assert client.get('/api/report').json == first
+    assert report_cache.hits == hits + 1
+    
+    question = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).first()
+    client.post('/api/stress-test', json={'question_id': question.id, 'user_answer': question.answer,
+                                          'response_time': 3.0, 'stress_level': 20})
+    report = client.get('/api/report').json['report']
+    attempts = {topic['id']: topic['attempts'] for topic in report['topics']}
+    assert attempts[topics[0].id] == 1
+
+
+def test_streamed_report_is_cached(client, topics):
+    first = client.get('/api/report?format=ndjson').get_data(as_text=True)
+    hits = report_cache.hits
+    assert client.get('/api/report?format=ndjson').get_data(as_text=True) == first
+    assert report_cache.hits == hits + 1
+    
+    client.post('/api/add-topic', json={'subject': 'Math', 'topic_name': 'Graphs', 'exam_type': 'interview'})
+    assert 'Graphs' in client.get('/api/report?format=ndjson').get_data(as_text=True)
+
+
+def test_report_from_before_another_process_invalidated_is_rebuilt(client, user, topics, tmp_path, monkeypatch):
+    path = str(tmp_path / 'snapshots.db')
+    monkeypatch.setattr(app_module, 'dashboard_snapshots', SnapshotCache('test_report_a', path=path))
+    other_process = SnapshotCache('test_report_b', path=path)
+    
+    first = client.get('/api/report').json
+    assert client.get('/api/report').json == first
+    
+    # The other process records a change; this process's listeners never hear of it
+    Topic.query.filter_by(id=topics[0].id).update({'total_attempts': 4, 'total_correct': 4})
+    db.session.commit()
+    other_process.invalidate(user.id)
+    
+    report = client.get('/api/report').json['report']
+    assert {topic['id']: topic['attempts'] for topic in report['topics']}[topics[0].id] == 4
+
+
+def test_dashboard_snapshot_is_kept_by_a_refresh_that_changes_nothing(client, user, topics):
+    assert client.get('/dashboard').status_code == 200
+    assert dashboard_snapshots.memory.peek(user.id) is not None
+    
+    assert refresh_users([user.id]) == 0
+    assert dashboard_snapshots.memory.peek(user.id) is not None
+
+
+def test_dashboard_snapshot_is_dropped_when_a_refresh_rescores_topics(client, user, topics):
+    other = User(username='other', email='other@example.com', password_hash='-')
+    db.session.add(other)
+    db.session.commit()
+    client.get('/dashboard')
+    dashboard_snapshots.get(other.id, lambda: ({'topics': []}, 3600))
+    
+    topics[0].fti_computed_at = None  # Stale
+    db.session.commit()
+    assert refresh_users([user.id, other.id]) == 1
+    assert dashboard_snapshots.memory.peek(user.id) is None
+    assert dashboard_snapshots.memory.peek(other.id) is not None
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / 'snapshots.db')
+
+
+def test_invalidation_reaches_every_process_sharing_the_file(snapshot_path):
+    # Two caches on one file stand in for two worker processes
+    worker_a = SnapshotCache('test_worker_a', path=snapshot_path)
+    worker_b = SnapshotCache('test_worker_b', path=snapshot_path)
+    builds = []
+    
+    def build():
+        builds.append(1)
+        return {'version': len(builds)}, 3600
+    
+    assert worker_a.get(1, build) == {'version': 1}
+    assert worker_b.get(1, build) == {'version': 1}  # From the file, not rebuilt
+    assert worker_a.get(1, build) == {'version': 1}  # From memory
+    assert len(builds) == 1
+    
+    worker_b.invalidate(1)
+    assert worker_a.get(1, build) == {'version': 2}
+    assert worker_b.get(1, build) == {'version': 2}
+    
+    worker_a.clear()
+    assert worker_b.get(1, build) == {'version': 3}
+
+
+def test_snapshot_built_across_an_invalidation_is_not_kept(snapshot_path):
+    worker_a = SnapshotCache('test_race_a', path=snapshot_path)
+    worker_b = SnapshotCache('test_race_b', path=snapshot_path)
+    
+    def slow_build():
+        worker_b.invalidate(1)  # The user's data changes while worker_a is reading it
+        return {'stale': True}, 3600
+    
+    assert worker_a.get(1, slow_build) == {'stale': True}
+    assert worker_a.get(1, lambda: ({'stale': False}, 3600)) == {'stale': False}
+    assert worker_b.get(1, lambda: ({'stale': None}, 3600)) == {'stale': False}
+
+
+def test_memory_only_snapshot_built_across_an_invalidation_is_not_kept():
+    cache = SnapshotCache('test_race_memory')
+    
+    def slow_build():
+        cache.invalidate(1)
+        return {'stale': True}, 3600
+    
+    cache.get(1, slow_build)
+    assert cache.get(1, lambda: ({'stale': False}, 3600)) == {'stale': False}
+
+
+def test_snapshot_file_from_before_generations_is_reset(snapshot_path):
+    conn = sqlite3.connect(snapshot_path)
+    conn.execute('CREATE TABLE snapshot (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)')
+    conn.execute("INSERT INTO snapshot VALUES ('1', 1e12, '{\"old\": true}')")
+    conn.commit()
+    conn.close()
+    
+    cache = SnapshotCache('test_old_file', path=snapshot_path)
+    assert cache.get(1, lambda: ({'old': False}, 3600)) == {'old': False}
+
+
+def test_session_user_is_cached_until_the_user_row_changes(app, user):
+    assert load_user(str(user.id)).username == 'tester'
+    assert user_cache.peek(user.id) is not None
+    
+    user.username = 'renamed'
+    db.session.commit()
+    assert user_cache.peek(user.id) is None
+    assert load_user(str(user.id)).username == 'renamed'
+
+
+def test_rolled_back_user_change_keeps_nothing_pending(app, user):
+    user.username = 'not-kept'
+    db.session.flush()
+    db.session.rollback()
+    assert 'changed_user_ids' not in db.session.info
+    assert load_user(str(user.id)).username == 'tester'
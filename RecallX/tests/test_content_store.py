@@ -0,0 +1,94 @@
+"""
+Shared, content-addressed PDF and search content
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import (ContentBlob, ContentChunk, InternetFetchedContent, PDFExtractedContent, acquire_content_blob,
+                 cached_internet_search, db, get_content_blob)
+
+
+def test_failed_build_leaves_nothing_behind(app):
+    def build(blob_id):
+        db.session.add(ContentChunk(blob_id=blob_id, chunk_index=0, content='partial'))
+        db.session.commit()  # Chunks are committed as they are extracted
+        raise RuntimeError('extraction failed')
+    
+    with pytest.raises(RuntimeError):
+        get_content_blob('pdf', 'a' * 64, build)
+    assert ContentBlob.query.count() == 0
+    assert ContentChunk.query.count() == 0
+
+
+def test_stale_claim_from_a_crashed_worker_is_rebuilt(app):
+    # A worker claimed the blob, wrote part of it and died long ago
+    crashed_at = datetime.utcnow() - timedelta(seconds=app.config['JOB_STALE_AFTER'] + 60)
+    stale = ContentBlob(kind='pdf', content_hash='c' * 64, is_complete=False, created_at=crashed_at)
+    db.session.add(stale)
+    db.session.flush()
+    db.session.add(ContentChunk(blob_id=stale.id, chunk_index=0, content='partial'))
+    db.session.commit()
+    
+    def build(blob_id):
+        db.session.add(ContentChunk(blob_id=blob_id, chunk_index=0, content='whole document'))
+        return {'chunks': 1}
+    
+    blob, created = get_content_blob('pdf', 'c' * 64, build, poll_interval=0)
+    assert created and blob.is_complete
+    assert [chunk.content for chunk in ContentChunk.query] == ['whole document']
+
+
+def test_live_claim_is_waited_for(app):
+    db.session.add(ContentBlob(kind='pdf', content_hash='d' * 64, is_complete=False))
+    db.session.commit()
+    
+    with pytest.raises(TimeoutError):
+        get_content_blob('pdf', 'd' * 64, lambda blob_id: pytest.fail('built twice'), timeout=0.05, poll_interval=0.01)
+    assert ContentBlob.query.one().is_complete is False
+
+
+def test_same_search_is_stored_once_and_shared(app, topics):
+    first, deduplicated = cached_internet_search(topics[0].id, 'Data Structures')
+    assert not deduplicated
+    second, deduplicated = cached_internet_search(topics[1].id, '  data   STRUCTURES ')
+    db.session.commit()
+    assert deduplicated and second == first
+    
+    blob = ContentBlob.query.one()
+    assert blob.ref_count == 2
+    assert InternetFetchedContent.query.filter_by(blob_id=blob.id).count() == 2
+
+
+def test_deleting_references_releases_the_blob(app, topics):
+    cached_internet_search(topics[0].id, 'Data Structures')
+    cached_internet_search(topics[1].id, 'Data Structures')
+    db.session.commit()
+    blob_id = ContentBlob.query.one().id
+    
+    db.session.delete(InternetFetchedContent.query.filter_by(topic_id=topics[0].id).one())
+    db.session.commit()
+    assert db.session.get(ContentBlob, blob_id).ref_count == 1
+    
+    # Deleting the topic cascades to its content rows, releasing the last reference
+    db.session.delete(topics[1])
+    db.session.commit()
+    assert ContentBlob.query.count() == 0
+    assert ContentChunk.query.count() == 0
+
+
+def test_deleting_a_user_releases_their_pdf(app, user, topics):
+    blob = ContentBlob(kind='pdf', content_hash='b' * 64, is_complete=True, summary='{}')
+    db.session.add(blob)
+    db.session.flush()
+    db.session.add(ContentChunk(blob_id=blob.id, chunk_index=0, content='page text'))
+    db.session.add(PDFExtractedContent(topic_id=topics[0].id, filename='notes.pdf', content='page text',
+                                       blob_id=blob.id))
+    acquire_content_blob(blob.id)
+    db.session.commit()
+    
+    db.session.delete(user)
+    db.session.commit()
+    assert ContentBlob.query.count() == 0
+    assert ContentChunk.query.count() == 0
@@ -0,0 +1,62 @@
+"""
+Database configuration: SQLite pragmas on every connection and server pool options
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+
+from app import SQLITE_PRAGMAS, GeneratedQuestion, app as flask_app, database_engine_options, db
+
+
+@pytest.fixture
+def fresh_connection(app):
+    """A connection from a new engine, so the pragmas come from the connect hook alone"""
+    uri = flask_app.config['SQLALCHEMY_DATABASE_URI']
+    engine = create_engine(uri, **database_engine_options(uri))
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def pragma(connection, name):
+    return connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+
+def test_sqlite_pragmas_are_applied_to_new_connections(fresh_connection):
+    assert pragma(fresh_connection, 'journal_mode') == 'wal'
+    assert pragma(fresh_connection, 'synchronous') == 1  # NORMAL
+    assert pragma(fresh_connection, 'busy_timeout') == SQLITE_PRAGMAS['busy_timeout']
+    assert pragma(fresh_connection, 'foreign_keys') == 1
+    assert pragma(fresh_connection, 'cache_size') == SQLITE_PRAGMAS['cache_size']
+
+
+def test_foreign_keys_are_enforced(app):
+    db.session.add(GeneratedQuestion(topic_id=10 ** 6, question='Orphan?', answer='yes', question_type='recall',
+                                     difficulty='easy'))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_sqlite_waits_on_locks_for_the_busy_timeout(monkeypatch):
+    monkeypatch.setenv('SQLITE_BUSY_TIMEOUT', '2500')
+    assert database_engine_options('sqlite:///recallx.db') == {'connect_args': {'timeout': 2.5}}
+
+
+def test_server_database_gets_a_sized_pool(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '4')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '6')
+    options = database_engine_options('postgresql://recallx@localhost/recallx')
+    assert options == {'pool_size': 4, 'max_overflow': 6, 'pool_timeout': 30, 'pool_recycle': 1800,
+                       'pool_pre_ping': True}
+
+
+def test_server_pool_options_reach_the_engine(monkeypatch):
+    pytest.importorskip('psycopg2')
+    monkeypatch.setenv('DB_POOL_SIZE', '4')
+    engine = create_engine('postgresql://recallx@localhost/recallx',
+                           **database_engine_options('postgresql://recallx@localhost/recallx'))
+    assert engine.pool.size() == 4
+    assert engine.pool._pre_ping
+    engine.dispose()
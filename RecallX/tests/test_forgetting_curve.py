@@ -0,0 +1,43 @@
+"""
+Vectorized forgetting curves agree with the scalar Ebbinghaus formula
+"""
+
+import random
+
+import pytest
+
+from app import batch_forgetting_curve, calculate_ebbinghaus_forgetting_curve
+
+HORIZONS = [-3, 0, 1, 3, 7, 14, 30, 365]
+
+
+def sample_topics(count=200, seed=7):
+    rng = random.Random(seed)
+    days_since = [rng.choice([0, 1, 2, 5, 30, 400]) + rng.random() for _ in range(count)]
+    strengths = [rng.uniform(0.05, 10.0) for _ in range(count)]
+    return days_since, strengths
+
+
+def test_python_path_matches_scalar_formula():
+    days_since, strengths = sample_topics()
+    retention = batch_forgetting_curve(days_since, strengths, HORIZONS, use_numpy=False)
+    for d, s, row in zip(days_since, strengths, retention):
+        assert row == [calculate_ebbinghaus_forgetting_curve(d + h, s) for h in HORIZONS]
+
+
+def test_numpy_path_matches_python_path():
+    pytest.importorskip('numpy')
+    days_since, strengths = sample_topics()
+    vectorized = batch_forgetting_curve(days_since, strengths, HORIZONS, use_numpy=True)
+    expected = batch_forgetting_curve(days_since, strengths, HORIZONS, use_numpy=False)
+    assert len(vectorized) == len(expected)
+    for row, expected_row in zip(vectorized, expected):
+        assert row == pytest.approx(expected_row, rel=1e-9, abs=1e-9)
+        assert all(0 <= value <= 100 for value in row)
+
+
+@pytest.mark.parametrize('use_numpy', [False, True])
+def test_no_topics_gives_no_rows(use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    assert batch_forgetting_curve([], [], HORIZONS, use_numpy=use_numpy) == []
@@ -0,0 +1,49 @@
+"""
+Bulk question generation: POST /api/generate-questions
+"""
+
+from app import MAX_BULK_TOPICS, MAX_PAGE_SIZE, GeneratedQuestion, Topic, User, db
+
+
+def question_count():
+    return db.session.query(GeneratedQuestion).count()
+
+
+def test_generates_count_questions_per_topic(client, topics):
+    before = question_count()
+    response = client.post('/api/generate-questions', json={'topic_ids': [t.id for t in topics[:2]], 'count': 3})
+    assert response.status_code == 201
+    assert response.json['count'] == 6
+    assert {q['topic_id'] for q in response.json['questions']} == {topics[0].id, topics[1].id}
+    assert question_count() == before + 6
+
+
+def test_count_is_clamped_to_one_page(client, topics):
+    topic_ids = [t.id for t in topics]
+    response = client.post('/api/generate-questions', json={'topic_ids': topic_ids, 'count': 10 ** 6})
+    assert response.status_code == 201
+    assert response.json['count'] == MAX_PAGE_SIZE // len(topic_ids) * len(topic_ids)
+
+
+def test_rejects_too_many_topics(client, topics):
+    response = client.post('/api/generate-questions', json={'topic_ids': list(range(1, MAX_BULK_TOPICS + 2))})
+    assert response.status_code == 400
+
+
+def test_rejects_malformed_topic_ids(client, topics):
+    before = question_count()
+    for topic_ids in ['1,2', [str(topics[0].id)], [1.5], [True], {'id': 1}]:
+        response = client.post('/api/generate-questions', json={'topic_ids': topic_ids})
+        assert response.status_code == 400, topic_ids
+    assert question_count() == before
+
+
+def test_other_users_topics_are_not_found(client, topics):
+    owner = User(username='other', email='other@example.com', password_hash='-')
+    db.session.add(owner)
+    db.session.flush()
+    other = Topic(user_id=owner.id, subject='Math', topic_name='Algebra', exam_type='semester')
+    db.session.add(other)
+    db.session.commit()
+    response = client.post('/api/generate-questions', json={'topic_ids': [topics[0].id, other.id]})
+    assert response.status_code == 404
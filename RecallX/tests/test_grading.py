@@ -0,0 +1,62 @@
+"""
+Answer grading against precomputed answer terms
+"""
+
+import pytest
+
+from app import (MAX_CACHED_ANSWER_LENGTH, answer_token_string, cached_answer_tokens, grade_many, normalize_answer_tokens,
+                 reference_tokens, stem_token)
+
+
+@pytest.mark.parametrize('forms', [
+    ('run', 'runs', 'running'), ('study', 'studies', 'studied'), ('index', 'indexes'), ('tree', 'trees'),
+    ('database', 'databases'), ('compare', 'compared', 'comparing'), ('class', 'classes'), ('match', 'matches'),
+    ('status', 'statuses'), ('process', 'processes'),
+])
+def test_inflected_forms_share_a_stem(forms):
+    assert len({stem_token(form) for form in forms}) == 1, [stem_token(form) for form in forms]
+
+
+def test_short_words_are_not_stemmed():
+    assert [stem_token(token) for token in ('is', 'use', 'bus')] == ['is', 'use', 'bus']
+
+
+def test_normalization_drops_case_punctuation_and_stop_words():
+    assert normalize_answer_tokens('The Trees, and the GRAPHS!') == {stem_token('tree'), 'graph'}
+
+
+def test_only_short_answers_are_cached():
+    cached_answer_tokens.cache_clear()
+    short = 'binary search tree'
+    long_answer = ' '.join(['balanced binary search trees'] * (MAX_CACHED_ANSWER_LENGTH // 10))
+    assert normalize_answer_tokens(short) == normalize_answer_tokens(short)
+    assert normalize_answer_tokens(long_answer) == normalize_answer_tokens(short) | {stem_token('balanced')}
+    assert cached_answer_tokens.cache_info().currsize == 1
+
+
+def test_stored_tokens_round_trip():
+    answer = 'A hash table maps keys to values'
+    assert reference_tokens(answer, answer_token_string(answer)) == reference_tokens(answer)
+
+
+def test_inflected_answer_grades_correct(app):
+    reference = reference_tokens('Sorting arrays by comparing elements')
+    [(is_correct, score)] = grade_many([('they sort the array, comparing each element', reference)])
+    assert is_correct and score == 1.0
+
+
+def test_threshold_is_share_of_reference_terms(app):
+    reference = reference_tokens('stack queue heap tree')  # four terms
+    grades = grade_many([('stack queue', reference), ('stack', reference)], threshold=0.5)
+    assert grades == [(True, 0.5), (False, 0.25)]
+
+
+def test_default_threshold_comes_from_config(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'GRADE_THRESHOLD', 1.0)
+    [(is_correct, _)] = grade_many([('stack queue', reference_tokens('stack queue heap'))])
+    assert not is_correct
+
+
+def test_stop_word_only_reference(app):
+    reference = reference_tokens('the and of')
+    assert grade_many([('', reference), ('something', reference)]) == [(True, 1.0), (False, 0.0)]
@@ -0,0 +1,88 @@
+"""
+Per-user isolation: one user's topics and recalls never reach another user's responses
+"""
+
+import io
+import json
+import os
+
+import pytest
+
+from app import GeneratedQuestion, Topic, User, apply_topic_fti, db, generate_questions_for_topics, schedule_topic_review
+
+
+@pytest.fixture
+def other_topics(app, user):
+    """A second user with three topics, each answered once, none of them visible to `user`"""
+    other = User(username='other', email='other@example.com')
+    other.password_hash = user.password_hash  # Hashing is slow and this user never logs in
+    db.session.add(other)
+    db.session.flush()
+    topics = []
+    for i in range(3):
+        topic = Topic(user_id=other.id, subject='Secret', topic_name=f'Other topic {i}',
+                      exam_type='interview', strength=0.5)
+        db.session.add(topic)
+        db.session.flush()
+        apply_topic_fti(topic)
+        schedule_topic_review(topic)
+        topics.append(topic)
+    generate_questions_for_topics(topics, count=2)
+    db.session.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(other.id)
+        sess['_fresh'] = True
+    questions = GeneratedQuestion.query.filter(GeneratedQuestion.topic_id.in_([t.id for t in topics])).all()
+    answers = [{
+        'client_id': f'other-{question.id}', 'question_id': question.id, 'user_answer': question.answer,
+        'response_time': 3.0, 'stress_level': 50, 'confidence': 50
+    } for question in questions]
+    with app.app_context():  # Its own g, so the logged-in user is not left behind for `client`
+        response = client.post('/api/stress-test/batch', json={'answers': answers})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return topics
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_topic_lists_hold_only_own_topics(client, topics, other_topics):
+    own_ids = {topic.id for topic in topics}
+    assert {t['id'] for t in client.get('/api/topics').json['topics']} == own_ids
+    assert {t['id'] for t in ndjson(client.get('/api/topics?format=ndjson'))} == own_ids
+
+    forgettable = client.get('/api/forgettable-topics').json
+    assert {t['id'] for t in forgettable['topics']} == own_ids
+    assert forgettable['statistics']['total'] == len(topics)
+
+
+def test_report_holds_only_own_topics_and_recalls(client, topics, recalls, other_topics):
+    own_ids = {topic.id for topic in topics}
+    report = client.get('/api/report').json['report']
+    assert {t['id'] for t in report['topics']} == own_ids
+    assert report['total_topics'] == len(topics)
+    assert sum(t['attempts'] for t in report['topics']) == len(recalls)
+    assert all(not alert['topic'].startswith('Other topic') for alert in report['alerts'])
+
+    events = ndjson(client.get('/api/report?format=ndjson'))
+    assert {e['id'] for e in events if e['type'] == 'topic'} == own_ids
+    assert events[0]['total_topics'] == len(topics)
+
+
+def test_report_without_own_topics_ignores_other_users(client, other_topics):
+    # The summary of an empty page is aggregated separately from the topic rows
+    report = client.get('/api/report').json['report']
+    assert report['topics'] == []
+    assert (report['total_topics'], report['average_accuracy']) == (0, 0)
+
+
+def test_pdf_cannot_be_uploaded_to_another_users_topic(client, other_topics):
+    response = client.post('/api/upload-pdf', data={
+        'topic_id': str(other_topics[0].id), 'file': (io.BytesIO(b'%PDF-1.4\n'), 'notes.pdf')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 404
+    folder = client.application.config['UPLOAD_FOLDER']
+    assert not os.path.isdir(folder) or os.listdir(folder) == []  # Nothing was spooled
@@ -0,0 +1,149 @@
+"""
+Background job queue: claiming, running, failure handling and recovery
+"""
+
+import io
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+import app as app_module
+from app import (JOB_HANDLERS, GeneratedQuestion, Job, Topic, User, claim_next_job, db, drain_jobs, enqueue_job,
+                 report_job_progress, requeue_stale_jobs, run_job)
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Register test job kinds: 'add-topic' writes a topic, 'explode' writes one then fails"""
+    def add_topic(job, payload):
+        topic = Topic(user_id=job.user_id, subject='Jobs', topic_name=payload['name'], exam_type='semester')
+        db.session.add(topic)
+        db.session.flush()
+        return {'topic_id': topic.id}
+    
+    def explode(job, payload):
+        add_topic(job, payload)
+        raise RuntimeError('boom')
+    
+    monkeypatch.setitem(JOB_HANDLERS, 'add-topic', add_topic)
+    monkeypatch.setitem(JOB_HANDLERS, 'explode', explode)
+
+
+def queue(user, kind, payload, created_at=None):
+    job = Job(id=f'{kind}-{payload.get("name", "")}', user_id=user.id, kind=kind, payload=json.dumps(payload),
+              created_at=created_at or datetime.utcnow())
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_claims_oldest_queued_job_once(user, handlers):
+    now = datetime.utcnow()
+    queue(user, 'add-topic', {'name': 'newer'}, now)
+    queue(user, 'add-topic', {'name': 'older'}, now - timedelta(minutes=1))
+    
+    assert claim_next_job() == 'add-topic-older'
+    assert claim_next_job() == 'add-topic-newer'
+    assert claim_next_job() is None
+    job = db.session.get(Job, 'add-topic-older')
+    db.session.refresh(job)
+    assert (job.status, job.attempts) == ('running', 1)
+    assert job.started_at is not None
+
+
+def test_successful_job_commits_writes_and_result(user, handlers):
+    queue(user, 'add-topic', {'name': 'ok'})
+    job = run_job(claim_next_job())
+    assert job.status == 'succeeded'
+    topic_id = json.loads(job.result)['topic_id']
+    db.session.expire_all()
+    assert db.session.get(Topic, topic_id).topic_name == 'ok'
+    assert job.finished_at is not None
+
+
+def test_failed_job_rolls_back_its_writes(user, handlers):
+    queue(user, 'explode', {'name': 'failing'})
+    job = run_job(claim_next_job())
+    assert (job.status, job.error) == ('failed', 'boom')
+    assert Topic.query.filter_by(topic_name='failing').count() == 0
+
+
+def test_unknown_kind_fails(user):
+    queue(user, 'no-such-kind', {})
+    job = run_job(claim_next_job())
+    assert job.status == 'failed'
+    assert 'Unknown job kind' in job.error
+
+
+def test_drain_runs_every_queued_job(user, handlers):
+    for name in ('a', 'b', 'c'):
+        queue(user, 'add-topic', {'name': name})
+    assert drain_jobs() == 3
+    assert {job.status for job in Job.query} == {'succeeded'}
+
+
+def test_stale_running_jobs_are_requeued(user, handlers):
+    for name in ('stale', 'fresh'):
+        queue(user, 'add-topic', {'name': name})
+    claim_next_job()
+    claim_next_job()
+    db.session.get(Job, 'add-topic-stale').started_at = datetime.utcnow() - timedelta(hours=2)
+    db.session.commit()
+    
+    assert requeue_stale_jobs(stale_after=3600) == 1
+    db.session.expire_all()
+    assert db.session.get(Job, 'add-topic-stale').status == 'queued'
+    assert db.session.get(Job, 'add-topic-fresh').status == 'running'
+    assert claim_next_job() == 'add-topic-stale'
+    assert db.session.get(Job, 'add-topic-stale').attempts == 2
+
+
+def test_search_topic_job_runs_inline_and_reports_status(client, user, topics):
+    # JOB_WORKERS=0 in the tests, so the job has finished when the request returns
+    before = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).count()
+    response = client.post('/api/search-topic', json={'topic_id': topics[0].id, 'search_query': 'data structures'})
+    assert response.status_code == 202
+    
+    status = client.get(response.json['status_url']).json['job']
+    assert status['status'] == 'succeeded', status['error']
+    assert status['result']['search_results']
+    assert GeneratedQuestion.query.filter_by(topic_id=topics[0].id).count() > before
+
+
+def test_jobs_are_private_to_their_user(client, user):
+    other = User(username='other', email='other@example.com', password_hash='-')
+    db.session.add(other)
+    db.session.commit()
+    job = enqueue_job('no-such-kind', other.id, {})
+    assert client.get(f'/api/jobs/{job.id}').status_code == 404
+
+
+def test_progress_is_visible_outside_the_running_session(user, monkeypatch):
+    seen = []
+    
+    def report(job, payload):
+        report_job_progress(job.id, 'halfway')
+        with db.engine.connect() as connection:  # What another process would read
+            seen.append(connection.execute(select(Job.progress).where(Job.id == job.id)).scalar())
+        return {}
+    
+    monkeypatch.setitem(JOB_HANDLERS, 'report', report)
+    queue(user, 'report', {})
+    job = run_job(claim_next_job())
+    assert seen == ['halfway']
+    assert (job.status, job.progress) == ('succeeded', None)
+
+
+def test_failed_enqueue_removes_the_spooled_upload(client, topics, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('queue unavailable')
+    
+    monkeypatch.setattr(app_module, 'enqueue_job', fail)
+    response = client.post('/api/upload-pdf', data={
+        'topic_id': str(topics[0].id), 'file': (io.BytesIO(b'%PDF-1.4'), 'notes.pdf')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert os.listdir(client.application.config['UPLOAD_FOLDER']) == []
@@ -0,0 +1,95 @@
+"""
+The /metrics endpoint: Prometheus text format, request instrumentation and access control
+"""
+
+import re
+
+import pytest
+
+from app import LATENCY_BUCKETS, metrics
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (-?[0-9.e+-]+|[+-]Inf|NaN)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """
+    Parse a Prometheus text body, failing on any malformed line
+
+    Returns:
+        (families: name -> type, samples: {(name, frozenset of labels): value})
+    """
+    families, samples = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            assert metric_type in ('counter', 'gauge', 'histogram'), line
+            families[name] = metric_type
+            continue
+        match = SAMPLE.match(line)
+        assert match, f'malformed sample: {line!r}'
+        name, labels, value = match.groups()
+        family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in families else name
+        assert family in families, f'sample without a TYPE: {line!r}'
+        samples[name, frozenset(LABEL.findall(labels or ''))] = float(value)
+    return families, samples
+
+
+def sample(samples, name, **labels):
+    return samples.get((name, frozenset((key, str(value)) for key, value in labels.items())), 0.0)
+
+
+@pytest.fixture
+def scrape(client):
+    def scrape():
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        return parse_metrics(response.get_data(as_text=True))
+    return scrape
+
+
+def test_body_is_valid_prometheus_text(client, topics, scrape):
+    client.get('/api/topics')
+    families, samples = scrape()
+    assert families['recallx_requests_total'] == 'counter'
+    assert families['recallx_request_duration_seconds'] == 'histogram'
+    assert families['recallx_cache_size'] == 'gauge'
+    assert samples
+
+
+def test_request_counter_and_latency_histogram_move(client, topics, scrape):
+    route = {'route': '/api/topics', 'method': 'GET'}
+    _, before = scrape()
+    client.get('/api/topics')
+    _, after = scrape()
+
+    assert sample(after, 'recallx_requests_total', status=200, **route) == \
+        sample(before, 'recallx_requests_total', status=200, **route) + 1
+    assert sample(after, 'recallx_request_duration_seconds_count', **route) == \
+        sample(before, 'recallx_request_duration_seconds_count', **route) + 1
+
+    buckets = [sample(after, 'recallx_request_duration_seconds_bucket', le=bound, **route)
+               for bound in LATENCY_BUCKETS + ('+Inf',)]
+    assert buckets == sorted(buckets)  # Cumulative
+    assert buckets[-1] == sample(after, 'recallx_request_duration_seconds_count', **route)
+    assert sample(after, 'recallx_request_sql_statements_count', route='/api/topics') > 0
+
+
+def test_metrics_are_hidden_when_disabled(client, monkeypatch):
+    monkeypatch.setattr(metrics, 'enabled', False)
+    assert client.get('/metrics').status_code == 404
+
+
+def test_metrics_need_no_login_without_a_token(app):
+    assert app.test_client().get('/metrics').status_code == 200
+
+
+def test_metrics_token_is_required_when_set(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 's3cret')
+    anonymous = app.test_client()
+    assert anonymous.get('/metrics').status_code == 401
+    assert anonymous.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert anonymous.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200
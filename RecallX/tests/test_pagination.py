@@ -0,0 +1,70 @@
+"""
+Keyset pagination and NDJSON streaming of the list endpoints
+"""
+
+import json
+
+from app import GeneratedQuestion
+
+
+def walk_pages(client, path, key, limit):
+    """Follow next_cursor from the first page to the last; returns every row in order"""
+    items = key if callable(key) else lambda page: page[key]
+    rows = []
+    cursor = None
+    while True:
+        url = f'{path}{"&" if "?" in path else "?"}limit={limit}' + (f'&after={cursor}' if cursor else '')
+        response = client.get(url)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        page = response.json
+        assert len(items(page)) <= limit
+        rows.extend(items(page))
+        cursor = page['next_cursor']
+        if cursor is None:
+            return rows
+
+
+def test_topic_pages_cover_every_topic_once(client, topics):
+    rows = walk_pages(client, '/api/topics', 'topics', limit=2)
+    assert [row['id'] for row in rows] == sorted(t.id for t in topics)
+
+
+def test_topic_stream_matches_pages(client, topics):
+    response = client.get('/api/topics?format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    streamed = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert streamed == walk_pages(client, '/api/topics', 'topics', limit=100)
+
+
+def test_stream_resumes_after_cursor(client, topics):
+    first = client.get('/api/topics?limit=2').json
+    response = client.get(f'/api/topics?format=ndjson&after={first["next_cursor"]}')
+    streamed = [json.loads(line)['id'] for line in response.get_data(as_text=True).splitlines()]
+    assert streamed == sorted(t.id for t in topics)[2:]
+
+
+def test_due_question_pages_follow_due_time_then_id(app, client, topics):
+    # Questions inserted together share a due time, so the id half of the cursor breaks the ties
+    topic = topics[0]
+    rows = walk_pages(client, f'/api/generate-questions/{topic.id}', 'questions', limit=2)
+    expected = [q.id for q in GeneratedQuestion.query.filter_by(topic_id=topic.id)
+                .order_by(GeneratedQuestion.due_at, GeneratedQuestion.id)]
+    assert [row['id'] for row in rows] == expected
+
+
+def test_all_question_pages_follow_id(client, topics):
+    topic = topics[1]
+    rows = walk_pages(client, f'/api/generate-questions/{topic.id}?all=1', 'questions', limit=3)
+    expected = [q.id for q in GeneratedQuestion.query.filter_by(topic_id=topic.id).order_by(GeneratedQuestion.id)]
+    assert [row['id'] for row in rows] == expected
+
+
+def test_report_pages_cover_every_topic_once(client, topics, recalls):
+    rows = walk_pages(client, '/api/report', lambda page: page['report']['topics'], limit=2)
+    assert [row['id'] for row in rows] == sorted(t.id for t in topics)
+
+
+def test_invalid_cursor_is_rejected(client, topics):
+    response = client.get('/api/topics?after=not-a-cursor')
+    assert response.status_code == 400
+    assert response.json['success'] is False
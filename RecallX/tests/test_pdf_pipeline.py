@@ -0,0 +1,111 @@
+"""
+PDF uploads: spooling, page extraction, chunking and storage
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app import (ContentBlob, ContentChunk, PDFExtractedContent, chunk_pdf_pages, db, get_pdf_pool, iter_pdf_pages,
+                 spool_upload, store_pdf_chunks)
+
+
+def make_pdf(page_count):
+    """A minimal PDF whose page i reads 'Page i binary trees and heaps'"""
+    font = 3 + 2 * page_count
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [%s] /Count %d >>' % (' '.join(f'{3 + 2 * i} 0 R' for i in range(page_count)),
+                                                    page_count),
+    ]
+    for i in range(page_count):
+        stream = f'BT /F1 12 Tf 72 720 Td (Page {i + 1} binary trees and heaps) Tj ET'
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R '
+                       f'/Resources << /Font << /F1 {font} 0 R >> >> >>')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    objects.append('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n{body}\nendobj\n'.encode()
+    xref = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    pdf += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return pdf
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    def write(page_count):
+        path = tmp_path / f'{page_count}-pages.pdf'
+        path.write_bytes(make_pdf(page_count))
+        return str(path)
+    return write
+
+
+def test_spool_upload_copies_and_hashes_in_blocks(app, tmp_path):
+    data = make_pdf(3)
+    upload = FileStorage(stream=io.BytesIO(data), filename='notes.pdf')
+    path, content_hash, size = spool_upload(upload, folder=str(tmp_path / 'spool'), block_size=64)
+    with open(path, 'rb') as spooled:
+        assert spooled.read() == data
+    assert (content_hash, size) == (hashlib.sha256(data).hexdigest(), len(data))
+
+
+def test_pages_are_extracted_in_order(app, pdf_path):
+    pages = list(iter_pdf_pages(pdf_path(3)))
+    assert [number for number, _ in pages] == [1, 2, 3]
+    assert all(text.startswith(f'Page {number} binary trees') for number, text in pages)
+
+
+def test_multi_range_extraction_reuses_the_shared_pool(app, pdf_path):
+    path = pdf_path(5)
+    inline = list(iter_pdf_pages(path, pages_per_task=10))
+    assert list(iter_pdf_pages(path, pages_per_task=2, max_workers=2)) == inline
+    pool = get_pdf_pool()
+    assert list(iter_pdf_pages(path, pages_per_task=1, max_workers=2)) == inline
+    assert get_pdf_pool() is pool
+
+
+def test_pages_are_grouped_into_chunks():
+    pages = [(1, 'a' * 6), (2, 'b' * 6), (3, 'c' * 6), (4, 'd' * 2)]
+    chunks = list(chunk_pdf_pages(pages, chunk_chars=10))
+    assert [(start, end) for start, end, _ in chunks] == [(1, 2), (3, 4)]
+    assert chunks[0][2] == 'aaaaaa\nbbbbbb'
+
+
+def test_stored_chunks_cover_every_page(app, pdf_path, monkeypatch):
+    blob = ContentBlob(kind='pdf', content_hash='test', is_complete=False)
+    db.session.add(blob)
+    db.session.commit()
+
+    progress = []
+    monkeypatch.setitem(app.config, 'PDF_CHUNK_CHARS', 1)  # One page per chunk
+    summary = store_pdf_chunks(blob.id, pdf_path(4), batch_size=3, progress=progress.append)
+    db.session.commit()
+
+    chunks = ContentChunk.query.filter_by(blob_id=blob.id).order_by(ContentChunk.chunk_index).all()
+    assert [(c.page_start, c.page_end) for c in chunks] == [(1, 1), (2, 2), (3, 3), (4, 4)]
+    assert summary == {'pages': 4, 'chunks': 4, 'preview': chunks[0].content.strip()}
+    assert progress == [3]  # One call per committed batch
+
+
+def test_upload_stores_text_and_removes_the_spool_file(client, topics):
+    response = client.post('/api/upload-pdf', data={
+        'topic_id': str(topics[0].id), 'file': (io.BytesIO(make_pdf(2)), 'notes.pdf')
+    }, content_type='multipart/form-data')
+    assert response.status_code == 202
+    job = client.get(response.json['status_url']).json['job']
+    assert job['status'] == 'succeeded', job
+
+    content = PDFExtractedContent.query.filter_by(topic_id=topics[0].id).one()
+    assert content.content.startswith('Page 1 binary trees')
+    text = '\n'.join(chunk.content for chunk in ContentChunk.query.filter_by(blob_id=content.blob_id))
+    assert 'Page 2 binary trees' in text
+    assert os.listdir(client.application.config['UPLOAD_FOLDER']) == []
@@ -0,0 +1,47 @@
+"""
+Read endpoints must run a fixed number of SQL statements, however many
+topics, questions and recalls the user has, so N+1 lazy loads fail here
+"""
+
+import pytest
+
+from app import (QUERY_BUDGETS, QueryCounter, Topic, apply_topic_fti, db, generate_questions_for_topics, user_cache,
+                 user_data_changed)
+
+
+def count_statements(app, client, path):
+    """Request path in a fresh app context (as a real request would get) and return (response, statements)"""
+    user_cache.clear()  # Count the session user lookup too
+    with app.app_context(), QueryCounter() as counter:
+        response = client.get(path)
+        response.get_data()  # Drain streamed responses inside the counter
+    return response, counter.statements
+
+
+def add_topics(user, count):
+    topics = []
+    for i in range(count):
+        topic = Topic(user_id=user.id, subject='Mathematics', topic_name=f'Extra {i}', exam_type='semester')
+        db.session.add(topic)
+        db.session.flush()
+        apply_topic_fti(topic)
+        topics.append(topic)
+    generate_questions_for_topics(topics, count=5)
+    db.session.commit()
+    user_data_changed(user.id, 'add-topic')
+
+
+@pytest.mark.parametrize('path, budget', QUERY_BUDGETS)
+def test_endpoint_within_query_budget(app, client, topics, recalls, path, budget):
+    response, statements = count_statements(app, client, path.format(topic_id=topics[0].id))
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert len(statements) <= budget, '\n'.join(statements)
+
+
+@pytest.mark.parametrize('path', [path for path, _ in QUERY_BUDGETS])
+def test_statement_count_does_not_grow_with_data(app, client, user, topics, recalls, path):
+    path = path.format(topic_id=topics[0].id)
+    _, before = count_statements(app, client, path)
+    add_topics(user, 10)
+    _, after = count_statements(app, client, path)
+    assert len(after) == len(before), '\n'.join(after)
@@ -0,0 +1,48 @@
+"""
+Queries run by read endpoints must be answered from an index, never a full table scan
+"""
+
+import pytest
+
+from app import db, hot_query_plans, is_full_table_scan
+
+# Hot query name -> the indexes its plan may use (any one of them)
+EXPECTED_INDEXES = {
+    'topics page by user': ('ix_topic_user_id',),
+    'report page by user': ('ix_topic_user_id',),
+    'review queue by user': ('ix_topic_user_next_review',),
+    # Both lead with topic_id; which one the planner picks depends on its statistics
+    'question lookup by topic': ('ix_generated_question_topic_id', 'ix_generated_question_topic_due'),
+    'questions page by topic': ('ix_generated_question_topic_id', 'ix_generated_question_topic_due'),
+    'due questions by topic': ('ix_generated_question_topic_due',),
+    'predictions by topic': ('ix_forgetting_prediction_topic_days',),
+}
+
+
+@pytest.fixture
+def plans(app):
+    return dict(hot_query_plans())
+
+
+def test_every_hot_query_has_an_expected_index(plans):
+    assert set(plans) == set(EXPECTED_INDEXES)
+
+
+@pytest.mark.parametrize('name', sorted(EXPECTED_INDEXES))
+def test_hot_query_uses_index(plans, name):
+    details = plans[name]
+    # Steps that read a table; scans of a subquery's result are not table reads
+    table_steps = [detail for detail in details
+                   if detail.startswith(('SCAN', 'SEARCH')) and detail.split()[1] in db.metadata.tables]
+    assert table_steps, details
+    for detail in table_steps:
+        assert not is_full_table_scan(detail), f'{name}: full table scan in {details}'
+    assert any(index in detail for index in EXPECTED_INDEXES[name] for detail in table_steps), details
+
+
+def test_full_table_scan_detection(app):
+    assert is_full_table_scan('SCAN topic')
+    assert not is_full_table_scan('SCAN topic USING COVERING INDEX ix_topic_user_id')
+    assert not is_full_table_scan('SEARCH topic USING INDEX ix_topic_user_id (user_id=?)')
+    assert not is_full_table_scan('SCAN (subquery-3)')
+    assert not is_full_table_scan('SCAN anon_1')
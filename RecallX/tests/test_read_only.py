@@ -0,0 +1,32 @@
+"""
+Read endpoints serve stored or in-memory FTI scores and never write
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import QueryCounter, Topic, db, user_cache
+
+READ_PATHS = ['/dashboard', '/api/forgettable-topics', '/api/forgetting-curve/{topic_id}']
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+@pytest.mark.parametrize('path', READ_PATHS)
+def test_get_endpoint_does_not_write(app, client, topics, path):
+    # Stale scores too: they are recomputed for the response, not persisted
+    for topic in topics:
+        topic.last_revised = datetime.utcnow() - timedelta(days=10)
+        topic.fti_computed_at = topic.last_revised
+    db.session.commit()
+    
+    user_cache.clear()
+    with app.app_context(), QueryCounter() as counter:
+        response = client.get(path.format(topic_id=topics[0].id))
+        response.get_data()
+    assert response.status_code == 200
+    writes = [s for s in counter.statements if s.lstrip().upper().startswith(WRITE_PREFIXES)]
+    assert writes == []
+    
+    db.session.expire_all()
+    assert all(t.fti_computed_at == t.last_revised for t in Topic.query)
@@ -0,0 +1,48 @@
+"""
+Stored per-topic recall aggregates must always equal a recount of RecallHistory
+"""
+
+from app import GeneratedQuestion, Topic, db, get_stress_recall_counts, rebuild_recall_aggregates
+
+
+def stored_aggregates():
+    db.session.expire_all()
+    return {t.id: (t.high_stress_correct, t.high_stress_total, t.low_stress_correct, t.low_stress_total,
+                   t.total_correct, t.total_attempts) for t in Topic.query}
+
+
+def recounted_aggregates():
+    counts = get_stress_recall_counts()
+    aggregates = {}
+    for (topic_id,) in db.session.query(Topic.id):
+        high_correct, high_total, low_correct, low_total = counts.get(topic_id, (0, 0, 0, 0))
+        aggregates[topic_id] = (high_correct, high_total, low_correct, low_total,
+                                high_correct + low_correct, high_total + low_total)
+    return aggregates
+
+
+def test_single_submissions_keep_aggregates_exact(client, topics):
+    for i, question in enumerate(GeneratedQuestion.query.order_by(GeneratedQuestion.id).limit(8)):
+        client.post('/api/stress-test', json={'question_id': question.id,
+                                              'user_answer': question.answer if i % 3 else 'wrong',
+                                              'response_time': 2.0, 'stress_level': 90 if i % 2 else 10})
+    assert stored_aggregates() == recounted_aggregates()
+    assert sum(row[-1] for row in stored_aggregates().values()) == 8
+
+
+def test_batch_submissions_and_retries_keep_aggregates_exact(client, topics, recalls):
+    client.post('/api/stress-test/batch', json={'answers': recalls})  # A retry adds nothing
+    assert stored_aggregates() == recounted_aggregates()
+    assert sum(row[-1] for row in stored_aggregates().values()) == len(recalls)
+
+
+def test_rebuild_repairs_drifted_aggregates(app, user, topics, recalls):
+    expected = recounted_aggregates()
+    topic = db.session.get(Topic, topics[0].id)
+    topic.total_attempts += 7
+    topic.high_stress_correct = 0
+    db.session.commit()
+    assert stored_aggregates() != expected
+    
+    assert rebuild_recall_aggregates(user.id) == len(topics)
+    assert stored_aggregates() == expected
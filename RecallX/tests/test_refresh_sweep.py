@@ -0,0 +1,117 @@
+"""
+Background refresh sweeps: batching, checkpoint resume, leases and prediction rewrites
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from app import (PREDICTION_HORIZONS, ForgettingPrediction, RefreshCheckpoint, Topic, User, db,
+                 run_refresh_sweep)
+
+
+@pytest.fixture
+def users(app, user):
+    """The fixture user plus six more, each with one stale topic"""
+    users = [user]
+    for i in range(6):
+        extra = User(username=f'user{i}', email=f'user{i}@example.com')
+        extra.password_hash = user.password_hash  # Hashing is slow and these users never log in
+        db.session.add(extra)
+        users.append(extra)
+    db.session.flush()
+    last_revised = datetime.utcnow() - timedelta(days=5)
+    for member in users:
+        db.session.add(Topic(user_id=member.id, subject='Math', topic_name=f'Topic of {member.username}',
+                             exam_type='interview', strength=2.0, last_revised=last_revised))
+    db.session.commit()
+    return users
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Records the user ids of every batch the sweep refreshes"""
+    seen = []
+    refresh_users = app_module.refresh_users
+
+    def recording_refresh(user_ids, now=None):
+        seen.append(list(user_ids))
+        return refresh_users(user_ids, now)
+
+    monkeypatch.setattr(app_module, 'refresh_users', recording_refresh)
+    return seen
+
+
+def checkpoint():
+    db.session.expire_all()
+    return db.session.get(RefreshCheckpoint, 'fti-refresh')
+
+
+def test_sweep_walks_users_in_batches(users, batches):
+    assert run_refresh_sweep(batch_size=2, max_workers=2) == len(users)
+
+    user_ids = sorted(member.id for member in users)
+    assert sorted(batches) == [user_ids[i:i + 2] for i in range(0, len(user_ids), 2)]
+    state = checkpoint()
+    assert state.last_user_id == user_ids[-1]
+    assert state.completed_at is not None
+    assert state.lease_owner is None
+
+
+def test_interrupted_sweep_resumes_after_checkpoint(users, batches):
+    user_ids = sorted(member.id for member in users)
+    db.session.add(RefreshCheckpoint(name='fti-refresh', last_user_id=user_ids[2],
+                                     started_at=datetime.utcnow()))
+    db.session.commit()
+
+    assert run_refresh_sweep(batch_size=10, max_workers=1) == len(users) - 3
+    assert batches == [user_ids[3:]]
+
+    # A completed sweep starts over from the first user
+    batches.clear()
+    assert run_refresh_sweep(batch_size=10, max_workers=1) == len(users)
+    assert batches == [user_ids]
+
+
+def test_sweep_skips_while_another_process_holds_the_lease(users, batches):
+    db.session.add(RefreshCheckpoint(name='fti-refresh', lease_owner='other',
+                                     lease_expires_at=datetime.utcnow() + timedelta(minutes=5)))
+    db.session.commit()
+
+    assert run_refresh_sweep(batch_size=10, max_workers=1) == 0
+    assert batches == []
+    assert checkpoint().lease_owner == 'other'
+
+    # An expired lease belongs to a sweep that died; it is taken over
+    checkpoint().lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert run_refresh_sweep(batch_size=10, max_workers=1) == len(users)
+    assert checkpoint().lease_owner is None
+
+
+def test_sweep_stops_when_its_lease_is_taken(users, monkeypatch):
+    refresh_users = app_module.refresh_users
+
+    def refresh_then_lose_lease(user_ids, now=None):
+        result = refresh_users(user_ids, now)
+        db.session.execute(db.update(RefreshCheckpoint).values(lease_owner='other'))
+        db.session.commit()
+        return result
+
+    monkeypatch.setattr(app_module, 'refresh_users', refresh_then_lose_lease)
+    assert run_refresh_sweep(batch_size=2, max_workers=1) == 2
+
+    state = checkpoint()
+    assert state.lease_owner == 'other'
+    assert state.last_user_id == 0  # Progress is only recorded by the lease holder
+
+
+def test_repeated_sweeps_replace_predictions(users):
+    for _ in range(3):
+        run_refresh_sweep(batch_size=3, max_workers=2)
+
+    for topic in Topic.query:
+        horizons = [p.days_ahead for p in ForgettingPrediction.query.filter_by(topic_id=topic.id)
+                    .order_by(ForgettingPrediction.days_ahead)]
+        assert horizons == PREDICTION_HORIZONS
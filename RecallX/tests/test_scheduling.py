@@ -0,0 +1,121 @@
+"""
+Review scheduling: the topic review queue and the per-question memory model
+"""
+
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import (INITIAL_STABILITY, MAX_STABILITY, MIN_STABILITY, GeneratedQuestion, db,
+                 question_interval_days, question_memory_state, question_retrievability, rebuild_question_schedule,
+                 review_interval_days, review_question)
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+def new_state(difficulty='medium'):
+    return {'difficulty': difficulty, 'stability': None, 'recall_difficulty': None, 'last_reviewed_at': None}
+
+
+def after(state, is_correct, when):
+    return dict(state, **review_question(state, is_correct, when))
+
+
+def test_interval_ends_where_recall_probability_hits_target(app):
+    for stability in (0.5, 2.0, 40.0):
+        days = question_interval_days(stability, target=80)
+        assert question_retrievability(stability, days) == pytest.approx(0.8)
+    assert question_interval_days(7.0, target=90) == pytest.approx(7.0)  # stability is the 90% interval
+
+
+def test_topic_interval_inverts_the_forgetting_curve(app):
+    days = review_interval_days(2.0, target=50)
+    assert math.exp(-days / (2.0 * 2.5)) == pytest.approx(0.5)
+
+
+def test_first_recall_sets_initial_stability(app):
+    for is_correct in (True, False):
+        state = after(new_state(), is_correct, NOW)
+        assert state['stability'] == INITIAL_STABILITY[is_correct]
+        assert state['last_reviewed_at'] == NOW
+        assert state['due_at'] == NOW + timedelta(days=question_interval_days(state['stability']))
+
+
+def test_correct_recall_grows_stability_more_when_nearly_forgotten(app):
+    state = after(new_state(), True, NOW)
+    immediate = after(state, True, NOW + timedelta(minutes=1))
+    on_time = after(state, True, state['due_at'])
+    late = after(state, True, state['due_at'] + timedelta(days=10))
+    assert state['stability'] <= immediate['stability'] < on_time['stability'] < late['stability']
+
+
+def test_easy_questions_grow_faster_than_hard_ones(app):
+    grown = {}
+    for difficulty in ('easy', 'hard'):
+        state = after(new_state(difficulty), True, NOW)
+        grown[difficulty] = after(state, True, state['due_at'])['stability']
+    assert grown['easy'] > grown['hard']
+
+
+def test_wrong_recall_shrinks_stability_and_raises_difficulty(app):
+    state = after(new_state(), True, NOW)
+    state = after(state, True, state['due_at'])
+    lapsed = after(state, False, state['due_at'])
+    assert lapsed['stability'] < state['stability']
+    assert lapsed['recall_difficulty'] > state['recall_difficulty']
+
+
+def test_state_stays_within_bounds(app):
+    state = new_state('hard')
+    when = NOW
+    for _ in range(30):
+        state = after(state, False, when)
+        when += timedelta(hours=1)
+    assert state['stability'] >= MIN_STABILITY and state['recall_difficulty'] <= 10.0
+    for _ in range(30):
+        when = state['due_at'] + timedelta(days=365)
+        state = after(state, True, when)
+    assert state['stability'] <= MAX_STABILITY and state['recall_difficulty'] >= 1.0
+
+
+def test_answered_question_leaves_the_due_list(client, topics):
+    url = f'/api/generate-questions/{topics[0].id}'
+    due = client.get(url).json['questions']
+    question = db.session.get(GeneratedQuestion, due[0]['id'])
+    client.post('/api/stress-test', json={'question_id': question.id, 'user_answer': question.answer,
+                                          'response_time': 2.0, 'stress_level': 10})
+    remaining = [q['id'] for q in client.get(url).json['questions']]
+    assert question.id not in remaining
+    assert len(remaining) == len(due) - 1
+
+
+def test_rebuild_replays_history_to_the_same_state(app, user, topics, recalls):
+    questions = GeneratedQuestion.query.order_by(GeneratedQuestion.id).all()
+    before = {q.id: question_memory_state(q) | {'due_at': q.due_at} for q in questions}
+    for question in questions:
+        question.stability = question.recall_difficulty = question.last_reviewed_at = None
+    db.session.commit()
+    
+    assert rebuild_question_schedule(user.id) == len(questions)
+    db.session.expire_all()
+    for question in GeneratedQuestion.query:
+        rebuilt = question_memory_state(question) | {'due_at': question.due_at}
+        assert rebuilt['stability'] == pytest.approx(before[question.id]['stability'])
+        assert rebuilt['due_at'] == before[question.id]['due_at']
+
+
+def test_review_queue_lists_overdue_topics_first(client, topics):
+    overdue, later = topics[3], topics[1]
+    overdue.next_review_at = datetime.utcnow() - timedelta(days=3)
+    later.next_review_at = datetime.utcnow() - timedelta(days=1)
+    for topic in topics:
+        if topic not in (overdue, later):
+            topic.next_review_at = datetime.utcnow() + timedelta(days=30)
+    db.session.commit()
+    
+    response = client.get('/api/review-queue')
+    assert response.status_code == 200
+    items = response.json['items']
+    assert [item['topic_id'] for item in items] == [overdue.id, later.id]
+    assert items[0]['overdue_hours'] > items[1]['overdue_hours'] > 0
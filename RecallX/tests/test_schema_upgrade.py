@@ -0,0 +1,33 @@
+"""
+Upgrading an existing database to the current models
+"""
+
+from sqlalchemy import inspect
+
+from app import PDFExtractedContent, RETIRED_COLUMNS, RETIRED_INDEXES, db, upgrade_database_schema
+
+
+def test_retired_pdf_chunk_columns_are_dropped(app, topics):
+    # The table as it was when uploads were stored as inline page chunks
+    with db.engine.begin() as conn:
+        for column, column_type in [('upload_id', 'VARCHAR(32)'), ('chunk_index', 'INTEGER'),
+                                    ('page_start', 'INTEGER'), ('page_end', 'INTEGER')]:
+            conn.exec_driver_sql(f'ALTER TABLE pdf_extracted_content ADD COLUMN {column} {column_type}')
+        conn.exec_driver_sql('CREATE INDEX ix_pdf_extracted_content_upload_chunk '
+                             'ON pdf_extracted_content (upload_id, chunk_index)')
+        conn.exec_driver_sql("INSERT INTO pdf_extracted_content (topic_id, filename, content, upload_id, chunk_index) "
+                             f"VALUES ({topics[0].id}, 'old.pdf', 'inline page text', 'abc', 0)")
+    
+    changes = upgrade_database_schema()
+    assert set(changes) == {f'pdf_extracted_content.{column}' for column in RETIRED_COLUMNS['pdf_extracted_content']} \
+        | set(RETIRED_INDEXES['pdf_extracted_content'])
+    
+    inspector = inspect(db.engine)
+    assert {c['name'] for c in inspector.get_columns('pdf_extracted_content')} == \
+        {c.name for c in PDFExtractedContent.__table__.columns}
+    assert PDFExtractedContent.query.one().content == 'inline page text'
+    assert upgrade_database_schema() == []
+
+
+def test_current_database_needs_no_changes(app):
+    assert upgrade_database_schema() == []
@@ -0,0 +1,147 @@
+"""
+Search providers: inverted-index ranking and the query cache in front of it
+"""
+
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from app import CachedSearchProvider, InvertedIndexSearchProvider
+
+DOCUMENTS = [
+    {'title': 'Sorting algorithms', 'content': 'Quicksort and mergesort are comparison sorts.', 'url': 'doc://0'},
+    {'title': 'Graph traversal', 'content': 'Breadth first search visits a graph level by level.', 'url': 'doc://1'},
+    {'title': 'Binary search', 'content': 'Binary search halves a sorted array; it needs sorting first.',
+     'url': 'doc://2'},
+    {'title': 'Hash tables', 'content': 'Hashing maps keys to buckets. ' + 'x ' * 500, 'url': 'doc://3'},
+]
+
+
+@pytest.fixture
+def index():
+    return InvertedIndexSearchProvider(DOCUMENTS)
+
+
+class CountingProvider:
+    """Wraps a provider, counting calls and optionally blocking them until released"""
+
+    name = 'counting'
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def search(self, query, limit=10):
+        self.calls += 1
+        self.entered.set()
+        self.release.wait(5)
+        return self.provider.search(query, limit)
+
+    def stats(self):
+        return {'provider': self.name}
+
+
+@pytest.fixture
+def backend(index, monkeypatch):
+    # CachedSearchProvider registers its cache as 'search'; keep the app's own entry afterwards
+    monkeypatch.setitem(app_module.CACHES, 'search', app_module.CACHES['search'])
+    return CountingProvider(index)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Shift time.monotonic() forward by clock['offset'] seconds"""
+    state = {'offset': 0}
+    real_monotonic = time.monotonic
+    monkeypatch.setattr(time, 'monotonic', lambda: real_monotonic() + state['offset'])
+    return state
+
+
+def urls(results):
+    return [result['url'] for result in results]
+
+
+def test_title_matches_rank_above_body_matches(index):
+    # 'sorting' is in doc 0's title but only in doc 2's body
+    assert urls(index.search('sorting')) == ['doc://0', 'doc://2']
+
+
+def test_documents_matching_more_terms_rank_first(index):
+    assert urls(index.search('binary search graph'))[:2] == ['doc://2', 'doc://1']
+
+
+def test_unknown_and_stop_words_match_nothing(index):
+    assert index.search('the of and') == []
+    assert index.search('zebra') == []
+
+
+def test_results_are_limited(index):
+    assert len(index.search('search sorting graph hash', limit=2)) == 2
+    assert len(index.search('search sorting graph hash')) == 4
+
+
+def test_snippets_are_truncated_and_results_are_copies(index):
+    result = index.search('hash')[0]
+    assert len(result['snippet']) == app_module.SEARCH_SNIPPET_CHARS
+    result['title'] = 'changed'
+    assert index.search('hash')[0]['title'] == 'Hash tables'
+
+
+def test_index_stats(index):
+    stats = index.stats()
+    assert stats['provider'] == 'inverted-index'
+    assert stats['documents'] == len(DOCUMENTS)
+
+
+def test_cache_serves_repeat_queries(backend):
+    cached = CachedSearchProvider(backend, maxsize=10, ttl=60)
+    first = cached.search('Binary  Search')
+    assert cached.search('binary search') == first  # Normalized to the same key
+    assert backend.calls == 1
+    assert cached.search('binary search', limit=1) == first[:1]  # The limit is part of the key
+    assert backend.calls == 2
+
+    latency = cached.stats()['latency']
+    assert (latency['miss']['count'], latency['hit']['count']) == (2, 1)
+
+
+def test_cached_entries_expire(backend, clock):
+    cached = CachedSearchProvider(backend, maxsize=10, ttl=60)
+    cached.search('graph')
+    clock['offset'] = 30
+    cached.search('graph')
+    assert backend.calls == 1
+    clock['offset'] = 61
+    cached.search('graph')
+    assert backend.calls == 2
+
+
+def test_concurrent_identical_queries_call_the_backend_once(backend):
+    cached = CachedSearchProvider(backend, maxsize=10, ttl=60)
+    backend.release.clear()
+    results = []
+
+    def search():
+        results.append(urls(cached.search('sorting')))
+
+    first = threading.Thread(target=search)
+    first.start()
+    assert backend.entered.wait(5)
+    waiters = [threading.Thread(target=search) for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    time.sleep(0.05)  # Let the waiters queue up behind the first call
+    backend.release.set()
+    for thread in [first] + waiters:
+        thread.join(5)
+
+    assert backend.calls == 1
+    assert results == [['doc://0', 'doc://2']] * 5
+    latency = cached.stats()['latency']
+    assert latency['miss']['count'] == 1
+    assert latency['coalesced']['count'] + latency['hit']['count'] == 4
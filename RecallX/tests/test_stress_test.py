@@ -0,0 +1,99 @@
+"""
+Stress-test answer submission, single and batched
+"""
+
+import pytest
+
+from app import MAX_BATCH_ANSWERS, GeneratedQuestion, RecallHistory, Topic, db
+
+
+def batch(questions, prefix='a', correct=True):
+    return [{'client_id': f'{prefix}-{q.id}', 'question_id': q.id,
+             'user_answer': q.answer if correct else 'no idea', 'response_time': 2.0,
+             'stress_level': 80, 'confidence': 60} for q in questions]
+
+
+def topic_attempts(topic_id):
+    db.session.expire_all()
+    return db.session.get(Topic, topic_id).total_attempts
+
+
+def test_batch_records_every_answer(client, topics):
+    questions = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).all()
+    response = client.post('/api/stress-test/batch', json={'answers': batch(questions)})
+    assert response.status_code == 200
+    assert (response.json['recorded'], response.json['duplicates']) == (len(questions), 0)
+    assert all(result['is_correct'] for result in response.json['results'])
+    assert RecallHistory.query.count() == len(questions)
+    assert topic_attempts(topics[0].id) == len(questions)
+
+
+def test_retried_batch_is_not_counted_twice(client, topics):
+    questions = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).all()
+    answers = batch(questions)
+    first = client.post('/api/stress-test/batch', json={'answers': answers}).json
+    strength = db.session.get(Topic, topics[0].id).strength
+    
+    retry = client.post('/api/stress-test/batch', json={'answers': answers}).json
+    assert (retry['recorded'], retry['duplicates']) == (0, len(questions))
+    assert [r['is_correct'] for r in retry['results']] == [r['is_correct'] for r in first['results']]
+    assert RecallHistory.query.count() == len(questions)
+    assert topic_attempts(topics[0].id) == len(questions)
+    assert db.session.get(Topic, topics[0].id).strength == strength
+
+
+def test_partly_recorded_batch_records_only_new_answers(client, topics):
+    questions = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).all()
+    answers = batch(questions)
+    client.post('/api/stress-test/batch', json={'answers': answers[:2]})
+    response = client.post('/api/stress-test/batch', json={'answers': answers}).json
+    assert (response['recorded'], response['duplicates']) == (len(questions) - 2, 2)
+    assert RecallHistory.query.count() == len(questions)
+
+
+def test_repeated_client_id_in_one_batch_counts_once(client, topics):
+    question = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).first()
+    answers = batch([question]) * 3
+    response = client.post('/api/stress-test/batch', json={'answers': answers}).json
+    assert response['recorded'] == 1
+    assert RecallHistory.query.count() == 1
+
+
+def test_batch_requires_client_ids(client, topics):
+    question = GeneratedQuestion.query.first()
+    answers = batch([question])
+    del answers[0]['client_id']
+    assert client.post('/api/stress-test/batch', json={'answers': answers}).status_code == 400
+    assert RecallHistory.query.count() == 0
+
+
+@pytest.mark.parametrize('answers', [{'client_id': 'x'}, 'answers', [1, 2], [['x', 1]]])
+def test_batch_rejects_answers_that_are_not_a_list_of_objects(client, topics, answers):
+    response = client.post('/api/stress-test/batch', json={'answers': answers})
+    assert response.status_code == 400
+    assert response.json['error'] == 'answers must be a list of objects'
+
+
+def test_batch_rejects_too_many_answers(client, topics):
+    question = GeneratedQuestion.query.first()
+    answers = batch([question]) * (MAX_BATCH_ANSWERS + 1)
+    assert client.post('/api/stress-test/batch', json={'answers': answers}).status_code == 400
+    assert RecallHistory.query.count() == 0
+
+
+def test_batch_skips_unknown_questions(client, topics):
+    response = client.post('/api/stress-test/batch', json={'answers': [
+        {'client_id': 'x', 'question_id': 10 ** 6, 'user_answer': 'anything'}]}).json
+    assert response['results'] == [{'client_id': 'x', 'error': 'Question not found'}]
+    assert response['recorded'] == 0
+
+
+def test_single_answer_updates_topic_and_question(client, topics):
+    question = GeneratedQuestion.query.filter_by(topic_id=topics[0].id).first()
+    response = client.post('/api/stress-test', json={'question_id': question.id, 'user_answer': question.answer,
+                                                     'response_time': 3.0, 'stress_level': 80})
+    assert response.status_code == 200
+    assert response.json['is_correct'] is True
+    assert topic_attempts(topics[0].id) == 1
+    question = db.session.get(GeneratedQuestion, question.id)
+    assert question.last_reviewed_at is not None and question.stability is not None